@@ -86,7 +86,7 @@ class OntologyQuery(BaseModel):
         json_schema_extra = {
             "example": {
                 "type": "Product",
-                "properties": {"category": "Electronics", "price_lt": 1000},
+                "properties": {"category": "Electronics", "price": {"$lt": 1000}},
                 "relations": [{"type": "BELONGS_TO", "target_type": "Category"}],
             }
         }
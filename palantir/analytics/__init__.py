@@ -0,0 +1,5 @@
+"""Analytics helpers for the dashboard pages."""
+
+from typing import List
+
+__all__: List[str] = []
@@ -0,0 +1,83 @@
+"""Graph metrics for the insight and ontology viewer pages.
+
+Pages read scores from ``OntologyRepository.graph_metrics()``, which is
+computed on sparse matrices once per graph version, instead of building a
+NetworkX graph and running centrality algorithms on every rerun.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..ontology.analytics import GraphMetrics
+from ..ontology.repository import OntologyRepository, get_repository
+
+METRICS = ("pagerank", "betweenness", "degree")
+
+
+def calculate_graph_metrics(
+    repo: Optional[OntologyRepository] = None,
+    top_k: int = 10,
+    obj_type: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Summarise the ontology graph and list its most central objects.
+
+    Args:
+        repo: Repository to analyse; defaults to the shared repository.
+        top_k: Number of objects listed per metric.
+        obj_type: Only list objects of this type.
+
+    Returns:
+        Graph-level figures (nodes, edges, density, average degree,
+        components) plus ``top``: metric -> list of ``{"id", "type",
+        "score"}`` rows.
+    """
+    repo = repo or get_repository()
+    metrics = repo.graph_metrics()
+    result = metrics.summary()
+    result["top"] = {
+        name: [
+            {
+                "id": str(node_id),
+                "type": repo.get_object_type(node_id),
+                "score": score,
+            }
+            for node_id, score in metrics.top(name, top_k, obj_type)
+        ]
+        for name in METRICS
+    }
+    return result
+
+
+def type_pair_metrics(
+    metrics: GraphMetrics, source_type: str, target_type: str
+) -> Dict[str, Any]:
+    """Relationship figures between objects of two types.
+
+    Args:
+        metrics: Precomputed graph metrics.
+        source_type: Type of the link sources.
+        target_type: Type of the link targets.
+
+    Returns:
+        ``relationships`` (linked source/target pairs), ``links`` (all links
+        between them), ``average_degree``, ``density`` and the per-object
+        ``degrees`` of the objects taking part.
+    """
+    types = np.asarray(metrics.types)
+    rows = np.flatnonzero(types == source_type)
+    cols = np.flatnonzero(types == target_type)
+    pairs = metrics.adjacency[rows][:, cols].tocoo()
+    degrees = np.bincount(rows[pairs.row], minlength=len(types)) + np.bincount(
+        cols[pairs.col], minlength=len(types)
+    )
+    degrees = degrees[degrees > 0]
+    n = len(degrees)
+    return {
+        "relationships": int(pairs.nnz),
+        "links": int(pairs.data.sum()),
+        "average_degree": float(degrees.mean()) if n else 0.0,
+        "density": pairs.nnz / (n * (n - 1)) if n > 1 else 0.0,
+        "degrees": degrees.tolist(),
+    }
+
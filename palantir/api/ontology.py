@@ -1,16 +1,23 @@
-from typing import Any, Dict, List
+import json
+import os
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from palantir.ontology.changes import ChangeGap
 from palantir.ontology.objects import (Customer, Delivery, Event, Order,
                                        Payment, Product)
-from palantir.ontology.repository import (OntologyRepository, embedding_node,
-                                          expand_related_nodes,
+from palantir.ontology.repository import (embedding_node, get_repository,
                                           query_similar_nodes)
+from palantir.ontology.subgraph import RANKS, extract_subgraph
+from palantir.ontology.traversal import TraversalQuery
+from palantir.ontology.vector_search import SimilarityQuery
 
 router = APIRouter()
-repo = OntologyRepository()
+repo = get_repository()
 
 
 class OntologyConfig(BaseModel):
@@ -19,9 +26,38 @@ class OntologyConfig(BaseModel):
     concepts: List[Dict[str, Any]] = []
 
 
+def _neo4j_settings():
+    return (
+        os.getenv("NEO4J_URL", "bolt://localhost:7687"),
+        os.getenv("NEO4J_USER", "neo4j"),
+        os.getenv("NEO4J_PASSWORD", "test"),
+    )
+
+
+# Neo4j 증분 동기화 (마지막 동기화 seq 이후 변경분만 전송)
 @router.post("/ontology/sync")
-async def sync_ontology():
-    return {"status": "success", "message": "Ontology synchronized"}
+def sync_ontology(full: bool = False):
+    from palantir.core.ontology_sync import sync_ontology_to_neo4j
+
+    url, user, password = _neo4j_settings()
+    try:
+        summary = sync_ontology_to_neo4j(url, user, password, repo=repo, full=full)
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller
+        raise HTTPException(status_code=503, detail=f"Neo4j sync failed: {exc}")
+    return {
+        "status": "success",
+        "message": "Ontology synchronized",
+        "synced": True,
+        **summary,
+    }
+
+
+@router.get("/ontology/sync")
+def sync_ontology_status():
+    from palantir.core.ontology_sync import sync_status
+
+    url, user, _ = _neo4j_settings()
+    return sync_status(url, user) or {"synced_seq": None, "head_seq": repo.seq}
 
 
 @router.post("/ontology/create")
@@ -67,54 +103,20 @@ def ontology_graph():
 
 @router.get("/ontology/recommend_products/{customer_id}")
 def recommend_products(customer_id: str):
-    # 고객의 주문 이력 기반 추천 상품 반환
-    customer = repo.get_object(customer_id)
-    orders = repo.search_objects(obj_type="Order")
-    products = repo.search_objects(obj_type="Product")
-    purchased = set()
-    for order in orders:
-        if order["properties"].get("customer_id") == customer_id:
-            for item in order["properties"].get("items", []):
-                purchased.add(item.get("product_id"))
-    recommendations = []
-    for p in products:
-        if p["id"] not in purchased:
-            recommendations.append(p)
-    return {"recommendations": recommendations[:5]}
+    # 주문 등록 시 갱신되는 동시 구매 인덱스로 추천 (희소 행 조회)
+    return {"recommendations": repo.recommend_products(customer_id, k=5)}
 
 
 @router.get("/ontology/order_timeline/{order_id}")
 def order_timeline(order_id: str):
-    # 주문별 이벤트 타임라인 반환
-    events = repo.search_objects(obj_type="Event")
-    timeline = [e for e in events if e["properties"].get("related_id") == order_id]
-    timeline = sorted(timeline, key=lambda e: e["properties"].get("timestamp", ""))
-    return {"timeline": timeline}
+    # 주문별 이벤트 타임라인 반환 (시간순 정렬된 이벤트 인덱스 조회)
+    return {"timeline": repo.event_timeline(related_id=order_id)}
 
 
 @router.get("/ontology/similar_products/{product_id}")
-def similar_products(product_id: str):
-    # 상품별 유사 상품 추천
-    products = repo.search_objects(obj_type="Product")
-    target = next((p for p in products if p["id"] == product_id), None)
-    if not target:
-        return {"similar": []}
-    sims = []
-    for p in products:
-        if p["id"] != product_id:
-            score = 0
-            if target["properties"].get("category") and p["properties"].get(
-                "category"
-            ) == target["properties"].get("category"):
-                score += 1
-            score += len(
-                set(target["properties"].get("tags", []))
-                & set(p["properties"].get("tags", []))
-            )
-            if score > 0:
-                sims.append((p, score))
-    sims.sort(key=lambda x: -x[1])
-    return {"similar": [p for p, _ in sims[:5]]}
+def similar_products(product_id: str, tfidf: bool = False):
+    # 상품별 유사 상품 추천 (태그/카테고리 역색인 후보만 채점)
+    return {"similar": repo.similar_products(product_id, k=5, tfidf=tfidf)}
 
 
 @router.get("/ontology/alerts")
@@ -139,6 +141,16 @@ def embed_ontology_node(node: dict = Body(...)):
     return {"status": "embedded", "node_id": node.get("id")}
 
 
+# 텍스트가 바뀐 객체만 재임베딩 (워커가 돌고 있으면 워커에 맡김)
+@router.post("/ontology/embeddings/refresh")
+def refresh_ontology_embeddings(limit: int = Query(1000, ge=1, le=100_000)):
+    worker = repo.embedding_worker
+    if worker is not None and worker.trigger():
+        return {"status": "scheduled", "pending": len(repo.embeddings)}
+    counts = repo.refresh_embeddings(limit=limit)
+    return {"status": "refreshed", **counts, "pending": len(repo.embeddings)}
+
+
 # 유사 노드 검색
 @router.get("/ontology/similar")
 def get_similar_nodes(q: str, n: int = 5):
@@ -146,14 +158,83 @@ def get_similar_nodes(q: str, n: int = 5):
     return {"query": q, "results": results}
 
 
+# 그래프/속성 필터 + 벡터 유사도 결합 검색
+@router.post("/ontology/similar_search")
+def similar_search(query: SimilarityQuery):
+    try:
+        result = repo.similar_objects(query)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    results = []
+    for node_id, distance in result.hits:
+        node = repo.store.get_node(node_id)
+        results.append({
+            "id": str(node_id),
+            "distance": distance,
+            "object": node["data"] if node else None,
+        })
+    return {
+        "strategy": result.strategy,
+        "candidates": result.candidates,
+        "fetched": result.fetched,
+        "results": jsonable_encoder(results),
+    }
+
+
 # 관계 확장(직접 연결된 노드 반환)
 @router.get("/ontology/expand")
 def expand_node(node_id: str):
-    # 실제 운영에서는 온톨로지 전체 노드 dict를 DB/메모리에서 불러와야 함
-    # 여기서는 예시로 빈 dict 사용
-    ontology_nodes = {}  # TODO: 실제 노드 dict로 교체
-    node = ontology_nodes.get(node_id)
-    if not node:
+    query = TraversalQuery(start_ids=[node_id], direction="both", min_depth=0)
+    results = list(repo.traverse(query))
+    if not results:
         return {"error": "node not found"}
-    related = expand_related_nodes(node, ontology_nodes)
-    return {"node_id": node_id, "related": [getattr(n, "id", None) for n in related]}
+    return {"node_id": node_id, "related": [str(r["id"]) for r in results[1:]]}
+
+
+# 뷰어용 부분 그래프 (이웃 또는 상위 노드 샘플, 타입별 클러스터 집계)
+@router.get("/ontology/subgraph")
+def ontology_subgraph(
+    seeds: Optional[List[str]] = Query(None),
+    radius: int = Query(1, ge=0, le=5),
+    max_nodes: int = Query(300, ge=1, le=5000),
+    rank: str = "degree",
+    types: Optional[List[str]] = Query(None),
+    aggregate: bool = True,
+):
+    if rank not in RANKS:
+        raise HTTPException(status_code=400, detail=f"rank must be one of {RANKS}")
+    result = extract_subgraph(
+        repo,
+        seeds=seeds,
+        radius=radius,
+        max_nodes=max_nodes,
+        rank=rank,
+        types=types,
+        aggregate=aggregate,
+    )
+    return result.to_dict()
+
+
+# 변경 피드: since 이후 변경분만 조회
+@router.get("/ontology/changes")
+def ontology_changes(since: int = Query(0, ge=0), limit: int = Query(1000, ge=1)):
+    try:
+        changes = repo.changes.since(since)
+    except ChangeGap as exc:
+        raise HTTPException(status_code=410, detail=str(exc))
+    return {
+        "head": repo.changes.head,
+        "changes": [c.to_dict() for c in changes[:limit]],
+    }
+
+
+# 다중 홉 탐색 (서버 측 BFS)
+@router.post("/ontology/traverse")
+def traverse_ontology(query: TraversalQuery, stream: bool = False):
+    results = repo.traverse(query)
+    if stream:
+        # NDJSON으로 결과를 찾는 즉시 전송
+        lines = (json.dumps(jsonable_encoder(r)) + "\n" for r in results)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    items = jsonable_encoder(list(results))
+    return {"results": items, "count": len(items)}
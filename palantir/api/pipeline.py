@@ -1,9 +1,11 @@
 from typing import Any, Dict
 
+import duckdb
 import yaml
 from fastapi import APIRouter, File, HTTPException, UploadFile
 from pydantic import BaseModel
 
+from palantir.process.db import read_table
 from palantir.process.flows import add_ontology_from_etl_flow
 
 router = APIRouter()
@@ -62,3 +64,15 @@ def pipeline():
 def run_etl_ontology_pipeline():
     result = add_ontology_from_etl_flow()
     return {"status": "completed", "result": result}
+
+
+@router.get("/pipeline/tables/{table_name}")
+def preview_table(table_name: str, limit: int = 100):
+    # 조회 전용 엔드포인트는 읽기 전용 커넥션으로 공유 인스턴스를 사용
+    try:
+        df = read_table(table_name, limit=min(max(limit, 0), 1000))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except duckdb.CatalogException:
+        raise HTTPException(status_code=404, detail="table not found")
+    return {"table": table_name, "rows": df.to_dicts()}
@@ -1,14 +1,437 @@
-# mypy: ignore-errors
-import os
-
-import yaml
-
-
-def sync_ontology_to_neo4j(
-    url: str, user: str, password: str, ontology_dir: str = "ontology"
-):
-    for fname in os.listdir(ontology_dir):
-        if not fname.endswith(".yaml"):
-            continue
-        with open(os.path.join(ontology_dir, fname), "r", encoding="utf-8") as f:
-            yaml.safe_load(f)
+# mypy: ignore-errors
+"""Incremental, batched synchronisation of the ontology into Neo4j.
+
+``Neo4jSync`` remembers the last repository sequence number it pushed, with
+the repository ``epoch`` it belongs to, and reads only the newer changes
+from the repository change feed. Objects and
+links are written with ``UNWIND $rows ... MERGE`` statements, many rows per
+statement and many statements per transaction, over one pooled driver. When
+the feed no longer holds the needed changes (first run, long outage) it
+falls back to a full resync that streams the graph in the same batches and
+removes nodes that were not touched. A checkpoint from another epoch (an
+in-memory repository after a restart, or a different data directory) also
+forces a full resync, since its sequence numbers mean nothing here.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from palantir.ontology.changes import ChangeGap
+
+logger = logging.getLogger(__name__)
+
+BASE_LABEL = "OntologyObject"
+STATE_FILE = ".neo4j_sync.json"
+
+_drivers: Dict[Tuple[str, str], Any] = {}
+_syncers: Dict[Tuple[str, str], "Neo4jSync"] = {}
+_drivers_lock = threading.Lock()
+
+
+def get_driver(url: str, user: str, password: str) -> Any:
+    """Return one shared (connection pooled) driver per URL and user."""
+    key = (url, user)
+    with _drivers_lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            from neo4j import GraphDatabase
+
+            driver = _drivers[key] = GraphDatabase.driver(url, auth=(user, password))
+        return driver
+
+
+def _quote(name: str) -> str:
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def _value(value: Any) -> Any:
+    """Convert a value to something Neo4j can store as a property."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return _value(value.value)
+    if isinstance(value, (list, tuple, set)):
+        items = [_value(v) for v in value]
+        if all(isinstance(v, (bool, int, float, str)) for v in items):
+            return items
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def neo4j_properties(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a stored object/link dict into Neo4j properties.
+
+    Entries of the generic ``properties`` dict are lifted to the top level;
+    nested structures are stored as JSON strings.
+    """
+    props = {k: _value(v) for k, v in data.items() if k != "properties"}
+    extra = data.get("properties")
+    if isinstance(extra, dict):
+        for key, value in extra.items():
+            props.setdefault(key, _value(value))
+    return props
+
+
+def _batches(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Neo4jSync:
+    """Push repository changes to Neo4j in batches."""
+
+    def __init__(
+        self,
+        driver: Any,
+        repo: Any = None,
+        batch_size: int = 5_000,
+        tx_size: int = 50_000,
+        database: Optional[str] = None,
+        state_path: Optional[str] = None,
+    ):
+        """Bind a driver to a repository.
+
+        Args:
+            driver: Neo4j driver (shared; not closed by this object).
+            repo: Ontology repository; defaults to the shared repository.
+            batch_size: Rows per ``UNWIND`` statement.
+            tx_size: Rows per write transaction.
+            database: Neo4j database name.
+            state_path: JSON file keeping the last synced sequence number
+                and repository epoch.
+        """
+        if repo is None:
+            from palantir.ontology.repository import get_repository
+
+            repo = get_repository()
+        self.driver = driver
+        self.repo = repo
+        self.batch_size = batch_size
+        self.tx_size = max(tx_size, batch_size)
+        self.database = database
+        self.state_path = state_path
+        self.synced_seq, self.synced_epoch = self._load_state()
+        self.last_run: Dict[str, Any] = {}
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _load_state(self) -> Tuple[int, Optional[str]]:
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return int(state.get("seq", 0)), state.get("epoch")
+        return 0, None
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"seq": self.synced_seq, "epoch": self.synced_epoch, "time": time.time()},
+                f,
+            )
+        os.replace(tmp, self.state_path)
+
+    def _same_epoch(self) -> bool:
+        """Whether ``synced_seq`` counts in the repository's current numbering."""
+        epoch = getattr(self.repo, "epoch", None)
+        if self.synced_epoch is None:
+            # 체크포인트가 전혀 없으면 처음부터 증분 동기화 가능
+            return self.synced_seq == 0
+        return self.synced_epoch == epoch
+
+    def lag(self) -> Dict[str, Any]:
+        """How far Neo4j is behind the repository."""
+        head = self.repo.seq
+        seconds = 0.0
+        if head > self.synced_seq:
+            try:
+                pending = self.repo.changes.since(self.synced_seq)
+            except ChangeGap:
+                pending = []
+            if pending:
+                seconds = max(0.0, time.time() - pending[0].timestamp)
+        return {
+            "synced_seq": self.synced_seq,
+            "head_seq": head,
+            "pending_changes": head - self.synced_seq,
+            "lag_seconds": seconds,
+        }
+
+    # Cypher 실행 -----------------------------------------------------------
+
+    def _run(self, statements: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> int:
+        """Run ``(cypher, rows)`` batches, ``tx_size`` rows per transaction."""
+        written = 0
+        pending: List[Tuple[str, List[Dict[str, Any]]]] = []
+        pending_rows = 0
+
+        def flush() -> None:
+            if not pending:
+                return
+            work = list(pending)
+
+            def write(tx):
+                for cypher, rows in work:
+                    tx.run(cypher, rows=rows)
+
+            with self.driver.session(database=self.database) as session:
+                session.execute_write(write)
+            pending.clear()
+
+        for cypher, rows in statements:
+            self._ensure_schema()
+            pending.append((cypher, rows))
+            pending_rows += len(rows)
+            written += len(rows)
+            if pending_rows >= self.tx_size:
+                flush()
+                pending_rows = 0
+        flush()
+        return written
+
+    def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        with self.driver.session(database=self.database) as session:
+            session.run(
+                f"CREATE CONSTRAINT ontology_object_id IF NOT EXISTS "
+                f"FOR (n:{BASE_LABEL}) REQUIRE n.id IS UNIQUE"
+            )
+        self._schema_ready = True
+
+    def _node_statements(
+        self, node_ids: Iterable[Any], run: Optional[str] = None
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        store = self.repo.store
+        for node_id in node_ids:
+            node = store.get_node(node_id)
+            if node is None or "data" not in node:
+                continue
+            props = neo4j_properties(node["data"])
+            props["id"] = str(node_id)
+            if run is not None:
+                props["_sync_run"] = run
+            rows = by_type.setdefault(node["type"], [])
+            rows.append({"id": str(node_id), "props": props})
+            if len(rows) >= self.batch_size:
+                yield self._merge_nodes(node["type"]), rows
+                by_type[node["type"]] = []
+        for obj_type, rows in by_type.items():
+            if rows:
+                yield self._merge_nodes(obj_type), rows
+
+    @staticmethod
+    def _merge_nodes(obj_type: str) -> str:
+        return (
+            f"UNWIND $rows AS row MERGE (n:{BASE_LABEL} {{id: row.id}}) "
+            f"SET n = row.props SET n:{_quote(obj_type)}"
+        )
+
+    def _edge_statements(
+        self, edges: Iterable[Tuple[Any, Any, Any, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        by_rel: Dict[str, List[Dict[str, Any]]] = {}
+        for source, target, key, attrs in edges:
+            rel = attrs.get("type") or "RELATED_TO"
+            rows = by_rel.setdefault(rel, [])
+            rows.append(
+                {
+                    "id": str(key),
+                    "source": str(source),
+                    "target": str(target),
+                    "props": {**neo4j_properties(attrs.get("data", {})), "id": str(key)},
+                }
+            )
+            if len(rows) >= self.batch_size:
+                yield self._merge_edges(rel), rows
+                by_rel[rel] = []
+        for rel, rows in by_rel.items():
+            if rows:
+                yield self._merge_edges(rel), rows
+
+    @staticmethod
+    def _merge_edges(rel: str) -> str:
+        return (
+            f"UNWIND $rows AS row "
+            f"MATCH (a:{BASE_LABEL} {{id: row.source}}) "
+            f"MATCH (b:{BASE_LABEL} {{id: row.target}}) "
+            f"MERGE (a)-[r:{_quote(rel)} {{id: row.id}}]->(b) SET r = row.props"
+        )
+
+    def _delete_statements(
+        self, node_ids: Iterable[Any]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        cypher = (
+            f"UNWIND $rows AS row MATCH (n:{BASE_LABEL} {{id: row.id}}) "
+            f"DETACH DELETE n"
+        )
+        for batch in _batches(({"id": str(i)} for i in node_ids), self.batch_size):
+            yield cypher, batch
+
+    # 동기화 -----------------------------------------------------------------
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """Push everything after the last synced sequence number.
+
+        Args:
+            full: Force a full resync.
+
+        Returns:
+            Summary with the mode, rows written, duration and resulting lag.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            changes = None
+            if not full and not self._same_epoch():
+                logger.info("Checkpoint is from another repository epoch; full resync")
+            elif not full and self.synced_seq <= self.repo.seq:
+                try:
+                    changes = self.repo.changes.since(self.synced_seq)
+                except ChangeGap:
+                    logger.info("Change feed gap after seq %s; full resync", self.synced_seq)
+            if changes is None:
+                mode, target, written = "full", *self._full_sync()
+            elif changes:
+                mode, target, written = "incremental", changes[-1].seq, self._apply(changes)
+            else:
+                mode, target, written = "noop", self.synced_seq, 0
+            self.synced_seq = target
+            self.synced_epoch = getattr(self.repo, "epoch", None)
+            self._save_state()
+            self.last_run = {
+                "mode": mode,
+                "rows": written,
+                "seconds": time.perf_counter() - started,
+                **self.lag(),
+            }
+            return self.last_run
+
+    def _apply(self, changes) -> int:
+        latest: Dict[Any, bool] = {}  # 노드 id -> 최종 상태가 삭제인지 여부
+        links: Dict[Any, Tuple[Any, ...]] = {}
+        for change in changes:
+            if change.op in ("add_node", "add_nodes", "update_node"):
+                for node_id in change.objects:
+                    latest.pop(node_id, None)
+                    latest[node_id] = False
+            elif change.op == "remove_node":
+                for node_id in change.objects:
+                    latest.pop(node_id, None)
+                    latest[node_id] = True
+            elif change.links:
+                for key in change.links:
+                    links[key] = change.objects
+        deleted = [n for n, gone in latest.items() if gone]
+        upserted = [n for n, gone in latest.items() if not gone]
+        written = self._run(self._delete_statements(deleted))
+        written += self._run(self._node_statements(upserted))
+        written += self._run(self._edge_statements(self._changed_edges(links)))
+        return written
+
+    def _changed_edges(self, links: Dict[Any, Tuple[Any, ...]]):
+        """Current attributes of the changed links, found from their endpoints."""
+        wanted = set(links)
+        seen = set()
+        store = self.repo.store
+        for endpoints in links.values():
+            for source in endpoints:
+                if source in seen or not store.has_node(source):
+                    continue
+                seen.add(source)
+                for target, key, attrs in store.out_edges(source):
+                    if key in wanted:
+                        wanted.discard(key)
+                        yield source, target, key, attrs
+            if not wanted:
+                break
+
+    def _full_sync(self) -> Tuple[int, int]:
+        with self.repo._lock:
+            target = self.repo.seq
+            node_ids = list(self.repo.store.node_ids())
+            edges = list(self.repo.store.edges())
+        # seq는 저장소가 바뀌면 다시 작아질 수 있으므로 실행마다 고유한 토큰으로 표시
+        run = uuid.uuid4().hex
+        written = self._run(self._node_statements(node_ids, run=run))
+        written += self._run(self._edge_statements(edges))
+        # 이번 전체 동기화에서 갱신되지 않은 노드는 저장소에서 삭제된 노드
+        self._ensure_schema()
+        with self.driver.session(database=self.database) as session:
+            session.run(
+                f"MATCH (n:{BASE_LABEL}) "
+                f"WHERE n._sync_run IS NULL OR n._sync_run <> $run "
+                f"CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS",
+                run=run,
+            )
+        return target, written
+
+
+def sync_ontology_to_neo4j(
+    url: str,
+    user: str,
+    password: str,
+    ontology_dir: str = "ontology",
+    repo: Any = None,
+    full: bool = False,
+    batch_size: int = 5_000,
+) -> Dict[str, Any]:
+    """Synchronise the ontology repository into Neo4j.
+
+    Reuses one driver and one ``Neo4jSync`` per URL and user, so repeated
+    calls only push changes made since the previous call.
+
+    Args:
+        url: Neo4j bolt URL.
+        user: Neo4j user name.
+        password: Neo4j password.
+        ontology_dir: Directory where the sync checkpoint is kept.
+        repo: Repository to sync; defaults to the shared repository.
+        full: Force a full resync.
+        batch_size: Rows per ``UNWIND`` statement.
+
+    Returns:
+        Summary of the run, including the remaining lag.
+    """
+    key = (url, user)
+    with _drivers_lock:
+        syncer = _syncers.get(key)
+    if syncer is None or (repo is not None and syncer.repo is not repo):
+        os.makedirs(ontology_dir, exist_ok=True)
+        syncer = Neo4jSync(
+            get_driver(url, user, password),
+            repo=repo,
+            batch_size=batch_size,
+            state_path=os.path.join(ontology_dir, STATE_FILE),
+        )
+        with _drivers_lock:
+            _syncers[key] = syncer
+    return syncer.sync(full=full)
+
+
+def sync_status(url: str, user: str) -> Optional[Dict[str, Any]]:
+    """Last run and current lag of the sync for a URL and user, if any."""
+    with _drivers_lock:
+        syncer = _syncers.get((url, user))
+    if syncer is None:
+        return None
+    return {"last_run": syncer.last_run, **syncer.lag()}
@@ -9,10 +9,17 @@ from palantir.api.status import router as status_router
 from palantir.api.upload import router as upload_router
 from palantir.api.auth import router as auth_router
 from palantir.core.user_api import router as user_router
+from palantir.ontology.vector_index import get_vector_index
 
 app = FastAPI()
 
 
+@app.on_event("startup")
+def start_vector_index():
+    # ONTOLOGY_VECTOR_WARMUP=1 이면 임베딩 모델을 백그라운드에서 미리 로드
+    get_vector_index()
+
+
 @app.get("/")
 def read_root():
     return {"message": "AI Agent API is running"}
@@ -0,0 +1,292 @@
+"""Sparse-matrix views of the ontology graph for ranking and analytics.
+
+The graph is exported once per repository version (``repo.seq``) as a
+``scipy.sparse`` CSR adjacency matrix. PageRank, degrees, connected
+components and sampled betweenness are then computed with vectorised
+sparse operations, and ``GraphAnalytics`` keeps the results until the
+repository changes again.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components as _components
+
+# 배치당 (노드 x 소스) 작업 배열: sigma, delta, coef, 희소곱 결과(각 8바이트),
+# level(4바이트), 불리언 마스크 2개
+_BYTES_PER_CELL = 38
+BETWEENNESS_MEMORY = 256 * 1024 * 1024
+
+
+def adjacency_matrix(store) -> Tuple[List[Any], sp.csr_matrix]:
+    """Export a graph store as ``(node_ids, A)``.
+
+    ``A[i, j]`` is the number of edges from ``node_ids[i]`` to
+    ``node_ids[j]``.
+    """
+    node_ids, src, dst, _, _ = store.edge_index()
+    n = len(node_ids)
+    matrix = sp.csr_matrix(
+        (np.ones(len(src)), (src, dst)), shape=(n, n), dtype=np.float64
+    )
+    matrix.sum_duplicates()
+    return node_ids, matrix
+
+
+def pagerank(
+    matrix: sp.csr_matrix,
+    damping: float = 0.85,
+    tol: float = 1e-8,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """PageRank by power iteration over a weighted adjacency matrix.
+
+    Dangling nodes spread their rank uniformly, as in NetworkX.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inv = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition = sp.diags(inv) @ matrix  # 행 정규화
+    transposed = transition.T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = rank
+        rank = damping * (transposed @ rank + previous[dangling].sum() / n)
+        rank += (1.0 - damping) / n
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+    return rank
+
+
+def undirected(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """Symmetric 0/1 adjacency without self-loops."""
+    sym = (matrix + matrix.T).tocsr()
+    sym.setdiag(0)
+    sym.eliminate_zeros()
+    sym.data[:] = 1.0
+    return sym
+
+
+def connected_components(matrix: sp.csr_matrix) -> Tuple[int, np.ndarray]:
+    """Weakly connected components as ``(count, label per node)``."""
+    if matrix.shape[0] == 0:
+        return 0, np.zeros(0, dtype=np.int32)
+    return _components(matrix, directed=True, connection="weak")
+
+
+def betweenness(
+    matrix: sp.csr_matrix,
+    samples: Optional[int] = None,
+    seed: int = 0,
+    batch: int = 64,
+    max_bytes: int = BETWEENNESS_MEMORY,
+) -> np.ndarray:
+    """Normalised betweenness centrality, exact or from sampled sources.
+
+    Brandes' algorithm run level-synchronously: every BFS level is one
+    sparse-times-dense product for a whole batch of sources, and the
+    dependency accumulation walks the levels back the same way. Paths are
+    unweighted; multi-edges count once. With ``samples`` the scores are
+    estimated from that many random sources and scaled like NetworkX's
+    ``betweenness_centrality(k=samples)``.
+
+    Args:
+        matrix: Adjacency matrix; pass ``undirected(A)`` for undirected paths.
+        samples: Number of source nodes, or ``None`` for all of them.
+        seed: Random seed for source sampling.
+        batch: Sources processed together per sparse product.
+        max_bytes: Bound on the dense ``(n, batch)`` working arrays; large
+            graphs get smaller batches.
+    """
+    n = matrix.shape[0]
+    if n <= 2:
+        return np.zeros(n)
+    adjacency = matrix.tocsr(copy=True)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1.0
+    forward = adjacency.T.tocsr()  # forward @ x: 선행 노드 값을 후속 노드로 전파
+
+    if samples is None or samples >= n:
+        sources = np.arange(n)
+    else:
+        sources = np.random.default_rng(seed).choice(n, size=samples, replace=False)
+
+    batch = max(1, min(batch, max_bytes // (_BYTES_PER_CELL * n)))
+    scores = np.zeros(n)
+    for start in range(0, len(sources), batch):
+        chunk = sources[start:start + batch]
+        cols = np.arange(len(chunk))
+        sigma = np.zeros((n, len(chunk)))
+        sigma[chunk, cols] = 1.0
+        level = np.full((n, len(chunk)), -1, dtype=np.int32)
+        level[chunk, cols] = 0
+        frontier = sigma
+        depth = 0
+        while True:
+            reached = forward @ frontier
+            reached[level >= 0] = 0.0
+            if not reached.any():
+                break
+            depth += 1
+            level[reached > 0] = depth
+            sigma += reached
+            frontier = reached
+        del frontier, reached
+
+        # 역방향 누적: 버퍼를 재사용해 단계마다 새 (n, batch) 배열을 만들지 않음
+        delta = np.zeros_like(sigma)
+        coef = np.empty_like(sigma)
+        for d in range(depth, 0, -1):
+            at_depth = level == d
+            coef.fill(0.0)
+            np.add(delta, 1.0, out=coef, where=at_depth)
+            np.divide(coef, sigma, out=coef, where=at_depth)
+            spread = adjacency @ coef
+            spread *= sigma
+            np.add(delta, spread, out=delta, where=level == d - 1)
+        delta[chunk, cols] = 0.0
+        scores += delta.sum(axis=1)
+
+    scale = 1.0 / ((n - 1) * (n - 2))
+    return scores * scale * (n / len(sources))
+
+
+@dataclass
+class GraphMetrics:
+    """Per-node scores aligned with ``node_ids`` plus graph-level figures."""
+
+    seq: int
+    node_ids: List[Any]
+    types: List[str]
+    in_degree: np.ndarray
+    out_degree: np.ndarray
+    pagerank: np.ndarray
+    betweenness: np.ndarray
+    components: np.ndarray
+    n_components: int
+    n_edges: int
+    adjacency: sp.csr_matrix
+    _positions: Dict[Any, int] = field(default_factory=dict, repr=False)
+
+    @property
+    def degree(self) -> np.ndarray:
+        return self.in_degree + self.out_degree
+
+    def score(self, node_id: Any, metric: str = "pagerank") -> float:
+        if not self._positions:
+            self._positions = {n: i for i, n in enumerate(self.node_ids)}
+        pos = self._positions.get(node_id)
+        return 0.0 if pos is None else float(getattr(self, metric)[pos])
+
+    def top(
+        self, metric: str = "pagerank", k: int = 10, obj_type: Optional[str] = None
+    ) -> List[Tuple[Any, float]]:
+        """Highest-scoring nodes for a metric, optionally of one type."""
+        values = np.asarray(getattr(self, metric), dtype=np.float64)
+        candidates = np.arange(len(values))
+        if obj_type is not None:
+            candidates = candidates[np.asarray(self.types) == obj_type]
+        if len(candidates) > k:
+            part = np.argpartition(-values[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        best = candidates[np.argsort(-values[candidates], kind="stable")]
+        return [(self.node_ids[i], float(values[i])) for i in best]
+
+    def summary(self) -> Dict[str, Any]:
+        n = len(self.node_ids)
+        sizes = np.bincount(self.components) if n else np.zeros(0, dtype=np.int64)
+        return {
+            "nodes": n,
+            "edges": self.n_edges,
+            "density": self.n_edges / (n * (n - 1)) if n > 1 else 0.0,
+            "average_degree": float(self.degree.mean()) if n else 0.0,
+            "components": self.n_components,
+            "largest_component": int(sizes.max()) if n else 0,
+        }
+
+
+class GraphAnalytics:
+    """Graph metrics of a repository, recomputed only when it changes."""
+
+    def __init__(self, repo, betweenness_samples: Optional[int] = 256, seed: int = 0):
+        """Bind to a repository.
+
+        Args:
+            repo: Ontology repository; its ``seq`` is the graph version.
+            betweenness_samples: Sources sampled for betweenness (``None``
+                for the exact value).
+            seed: Random seed for the sampling.
+        """
+        self.repo = repo
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+        self._metrics: Optional[GraphMetrics] = None
+        self._pagerank: Optional[Tuple[int, Dict[Any, float]]] = None
+        self._lock = threading.Lock()
+
+    def metrics(self) -> GraphMetrics:
+        """Metrics for the current graph version."""
+        metrics = self._metrics
+        if metrics is not None and metrics.seq == self.repo.seq:
+            return metrics
+        with self._lock:
+            if self._metrics is None or self._metrics.seq != self.repo.seq:
+                self._metrics = self._compute()
+            return self._metrics
+
+    def pagerank_scores(self) -> Dict[Any, float]:
+        """PageRank by node id for the current graph version.
+
+        Reuses the full metrics when they are current; otherwise computes
+        only PageRank, which is much cheaper than ``metrics``.
+        """
+        cached = self._pagerank
+        if cached is not None and cached[0] == self.repo.seq:
+            return cached[1]
+        with self._lock:
+            metrics = self._metrics
+            if metrics is not None and metrics.seq == self.repo.seq:
+                self._pagerank = (
+                    metrics.seq, dict(zip(metrics.node_ids, metrics.pagerank.tolist()))
+                )
+            elif self._pagerank is None or self._pagerank[0] != self.repo.seq:
+                with self.repo._lock:
+                    seq = self.repo.seq
+                    node_ids, matrix = adjacency_matrix(self.repo.store)
+                self._pagerank = (seq, dict(zip(node_ids, pagerank(matrix).tolist())))
+            return self._pagerank[1]
+
+    def _compute(self) -> GraphMetrics:
+        store = self.repo.store
+        with self.repo._lock:
+            seq = self.repo.seq
+            node_ids, matrix = adjacency_matrix(store)
+            types = [store.node_type(n) for n in node_ids]
+        n_components, labels = connected_components(matrix)
+        return GraphMetrics(
+            seq=seq,
+            node_ids=node_ids,
+            types=types,
+            in_degree=np.asarray(matrix.sum(axis=0)).ravel().astype(np.int64),
+            out_degree=np.asarray(matrix.sum(axis=1)).ravel().astype(np.int64),
+            pagerank=pagerank(matrix),
+            betweenness=betweenness(
+                undirected(matrix), self.betweenness_samples, self.seed
+            ),
+            components=labels,
+            n_components=n_components,
+            n_edges=int(matrix.sum()),
+            adjacency=matrix,
+        )
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._metrics = None
+            self._pagerank = None
@@ -4,14 +4,16 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from .base import OntologyLink, OntologyObject
-from .objects import Customer, Delivery, Event, Order, Payment, Product
-from .repository import OntologyRepository
+from .base import OntologyLink
+from .registry import MODEL_REGISTRY
+from .repository import get_repository
 
 router = APIRouter(prefix="/ontology", tags=["ontology"])
-repo = OntologyRepository()
+repo = get_repository()
+
+model_map = {k: v for k, v in MODEL_REGISTRY.items() if k != "OntologyObject"}
 
 
 class SearchQuery(BaseModel):
@@ -21,18 +23,22 @@ class SearchQuery(BaseModel):
     properties: Optional[Dict[str, Any]] = None
 
 
+class ObjectQuery(BaseModel):
+    """Query with operators, relation joins and cursor pagination."""
+
+    type: Optional[str] = None
+    properties: Dict[str, Any] = {}
+    relations: List[Dict[str, Any]] = []
+    limit: int = Field(10, ge=1, le=1000)
+    offset: int = Field(0, ge=0)
+    order_by: Optional[str] = None
+    descending: bool = False
+    cursor: Optional[str] = None
+
+
 @router.post("/objects/{obj_type}")
 async def create_object(obj_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new ontology object."""
-    model_map = {
-        "Customer": Customer,
-        "Order": Order,
-        "Product": Product,
-        "Payment": Payment,
-        "Delivery": Delivery,
-        "Event": Event,
-    }
-
     if obj_type not in model_map:
         raise HTTPException(status_code=400, detail=f"Unknown object type: {obj_type}")
 
@@ -43,14 +49,22 @@ async def create_object(obj_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
     return obj.dict()
 
 
+@router.post("/objects/{obj_type}/bulk")
+async def create_objects(obj_type: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many ontology objects; invalid rows are reported, not fatal."""
+    if obj_type not in model_map:
+        raise HTTPException(status_code=400, detail=f"Unknown object type: {obj_type}")
+
+    result = repo.add_objects(rows, model_map[obj_type])
+    return {"inserted": [str(i) for i in result.inserted], "errors": result.errors}
+
+
 @router.get("/objects/{obj_id}")
 async def get_object(obj_id: UUID) -> Dict[str, Any]:
     """Get an object by ID."""
-    # Try each model type
-    for model_cls in model_map.values():
-        obj = repo.get_object(obj_id, model_cls)
-        if obj:
-            return obj.dict()
+    obj = repo.get_object(obj_id)
+    if obj is not None:
+        return obj.dict()
 
     raise HTTPException(status_code=404, detail=f"Object not found: {obj_id}")
 
@@ -58,12 +72,11 @@ async def get_object(obj_id: UUID) -> Dict[str, Any]:
 @router.put("/objects/{obj_id}")
 async def update_object(obj_id: UUID, data: Dict[str, Any]) -> Dict[str, Any]:
     """Update an existing object."""
-    # Get existing object to determine its type
-    existing = await get_object(obj_id)
-    if not existing:
+    # Stored model class determines the type; no need to hydrate the old object
+    model_cls = repo.get_model_class(obj_id)
+    if model_cls is None:
         raise HTTPException(status_code=404, detail=f"Object not found: {obj_id}")
 
-    model_cls = model_map[existing["type"]]
     obj = model_cls(**{**data, "id": obj_id})
     repo.update_object(obj)
 
@@ -84,10 +97,7 @@ async def delete_object(obj_id: UUID) -> Dict[str, str]:
 async def create_link(link: OntologyLink) -> Dict[str, Any]:
     """Create a new relationship between objects."""
     # Verify both objects exist
-    source = await get_object(link.source_id)
-    target = await get_object(link.target_id)
-
-    if not source or not target:
+    if not repo.has_object(link.source_id) or not repo.has_object(link.target_id):
         raise HTTPException(
             status_code=400, detail="Both source and target objects must exist"
         )
@@ -96,6 +106,13 @@ async def create_link(link: OntologyLink) -> Dict[str, Any]:
     return link.dict()
 
 
+@router.post("/links/bulk")
+async def create_links(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many relationships; rows with missing endpoints are reported."""
+    result = repo.add_links(rows)
+    return {"inserted": [str(i) for i in result.inserted], "errors": result.errors}
+
+
 @router.get("/objects/{obj_id}/links")
 async def get_links(
     obj_id: UUID, relationship_type: Optional[str] = None, direction: str = "out"
@@ -113,3 +130,18 @@ async def get_links(
 async def search_objects(query: SearchQuery) -> List[Dict[str, Any]]:
     """Search for objects matching criteria."""
     return repo.search_objects(obj_type=query.obj_type, properties=query.properties)
+
+
+@router.post("/query")
+async def query_objects(query: ObjectQuery) -> Dict[str, Any]:
+    """Run a query; pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        page = repo.query(
+            query,
+            order_by=query.order_by,
+            descending=query.descending,
+            cursor=query.cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": page.items, "next_cursor": page.next_cursor, "plan": page.plan}
@@ -0,0 +1,369 @@
+"""Bulk export/import of the ontology as Arrow IPC (Feather v2) files.
+
+A snapshot directory holds one table per object type, one edge table and a
+``manifest.json``::
+
+    objects/<n>.arrow   one row per object; ``_id``, ``_model`` and the
+                        object's fields as columns
+    links.arrow         ``_key``, ``_source``, ``_target``, ``_type`` and
+                        the link's fields
+    manifest.json       type -> file, row counts and column encodings
+
+Type and model names are dictionary encoded. Scalar fields, including
+``Decimal`` and ``datetime``, keep their Arrow types, so the files can be
+queried directly with Polars (``pl.read_ipc``) or DuckDB. UUID columns are
+stored as strings, and nested fields (dicts, lists of dicts) as JSON text;
+the manifest records both so ``read_snapshot`` restores them. Inside JSON
+text, UUIDs, decimals, dates and sets are written as one-key objects such as
+``{"$decimal": "19.90"}``, so nested values also come back with their types.
+"""
+
+import json
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+LINKS_FILE = "links.arrow"
+META_NODE = ("_id", "_model")
+META_EDGE = ("_key", "_source", "_target", "_type")
+
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_NIBBLE = np.zeros(256, dtype=np.uint8)
+_NIBBLE[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+_NIBBLE[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+_HEX_POS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+_ZERO = bytes(16)
+
+
+def _uuid_array(values: List[Any]):
+    """UUIDs (or None) as a canonical 36-character string column."""
+    import pyarrow as pa
+
+    # str(UUID)를 행마다 부르는 대신 16바이트를 한 번에 16진수로 변환
+    n = len(values)
+    valid = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+    raw = np.frombuffer(
+        b"".join(_ZERO if v is None else v.bytes for v in values), dtype=np.uint8
+    ).reshape(n, 16)
+    text = np.full((n, 36), ord("-"), dtype=np.uint8)
+    text[:, _HEX_POS[0::2]] = _HEX[raw >> 4]
+    text[:, _HEX_POS[1::2]] = _HEX[raw & 15]
+    offsets = np.arange(0, 36 * (n + 1), 36, dtype=np.int64)
+    nulls = n - int(valid.sum())
+    mask = pa.py_buffer(np.packbits(valid, bitorder="little")) if nulls else None
+    return pa.LargeStringArray.from_buffers(
+        n, pa.py_buffer(offsets), pa.py_buffer(text.tobytes()), mask, nulls
+    )
+
+
+def _uuid_values(column, cache: Optional[Dict[int, UUID]] = None) -> List[Optional[UUID]]:
+    """Decode a column written by ``_uuid_array`` (or any UUID strings).
+
+    ``cache`` shares one ``UUID`` per value across columns (edge endpoints
+    repeat node ids), which saves both construction time and memory.
+    """
+    import pyarrow as pa
+
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    n = len(array)
+    if n == 0:
+        return []
+    if not pa.types.is_large_string(array.type):
+        return [None if v is None else UUID(v) for v in array.to_pylist()]
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)[array.offset:array.offset + n + 1]
+    if not (np.diff(offsets) == 36).all():
+        return [None if v is None else UUID(v) for v in array.to_pylist()]
+    text = np.frombuffer(array.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+    nibbles = _NIBBLE[text.reshape(n, 36)[:, _HEX_POS]].astype(np.uint64)
+    weights = np.uint64(1) << (np.arange(60, -1, -4, dtype=np.uint64))
+    high = (nibbles[:, :16] * weights).sum(axis=1, dtype=np.uint64).tolist()
+    low = (nibbles[:, 16:] * weights).sum(axis=1, dtype=np.uint64).tolist()
+    cache = {} if cache is None else cache
+    uuids = []
+    for h, l in zip(high, low):
+        value = (h << 64) | l
+        uuid = cache.get(value)
+        if uuid is None:
+            uuid = cache[value] = UUID(int=value)
+        uuids.append(uuid)
+    if array.null_count:
+        valid = array.is_valid().to_numpy(zero_copy_only=False)
+        uuids = [u if ok else None for u, ok in zip(uuids, valid.tolist())]
+    return uuids
+
+
+def _file_name(position: int, obj_type: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "_", obj_type)[:64]
+    return f"objects/{position:03d}_{slug}.arrow"
+
+
+def _encode_column(values: List[Any]) -> Tuple[Any, Optional[str]]:
+    """Arrow array for a column and how it was encoded (None, uuid or json)."""
+    import pyarrow as pa
+
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, UUID) for v in present):
+        return _uuid_array(values), "uuid"
+    if any(isinstance(v, dict) or (isinstance(v, (list, tuple)) and any(
+            isinstance(x, (dict, list, tuple)) for x in v)) for v in present):
+        return _json_column(values), "json"
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+        return _json_column(values), "json"
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    return array, None
+
+
+# JSON에 없는 타입은 태그를 단 객체로 써서 읽을 때 원래 타입으로 복원
+_TAGGED = {
+    "$uuid": UUID,
+    "$decimal": Decimal,
+    "$datetime": datetime.fromisoformat,
+    "$date": date.fromisoformat,
+    "$time": time.fromisoformat,
+    "$set": set,
+}
+
+
+def _tag(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, time):
+        return {"$time": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"$set": list(value)}
+    return str(value)
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        decode = _TAGGED.get(key)
+        if decode is not None:
+            try:
+                return decode(value)
+            except (TypeError, ValueError, ArithmeticError):
+                pass  # 태그처럼 보이는 일반 dict
+    return obj
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_tag)
+
+
+def _loads(text: str) -> Any:
+    return json.loads(text, object_hook=_untag)
+
+
+def _loads_many(values: List[Optional[str]]) -> List[Any]:
+    """Decode a JSON text column with one parser call instead of one per row."""
+    return _loads("[" + ",".join("null" if v is None else v for v in values) + "]")
+
+
+def _json_column(values: List[Any]):
+    import pyarrow as pa
+
+    return pa.array([None if v is None else _dumps(v) for v in values], pa.string())
+
+
+def _id_column(ids: List[Any]) -> Tuple[Any, Optional[str]]:
+    import pyarrow as pa
+
+    if all(isinstance(i, UUID) for i in ids):
+        return _uuid_array(ids), "uuid"
+    if all(isinstance(i, str) for i in ids):
+        return pa.array(ids, pa.large_string()), None
+    return pa.array([_dumps(i) for i in ids], pa.large_string()), "json"
+
+
+def _table(meta: Dict[str, Any], records: List[Dict[str, Any]]):
+    """Table of meta columns plus one column per data field."""
+    import pyarrow as pa
+
+    columns: Dict[str, Any] = dict(meta)
+    encodings: Dict[str, str] = {}
+    fields: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            fields[key] = None
+    for key in fields:
+        if key in columns:
+            continue
+        array, encoding = _encode_column([record.get(key) for record in records])
+        columns[key] = array
+        if encoding:
+            encodings[key] = encoding
+    return pa.table(columns), encodings
+
+
+def write_snapshot(
+    repo,
+    directory: str,
+    node_ids: Optional[Iterable[Any]] = None,
+    types: Optional[Iterable[str]] = None,
+    compression: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Write the repository, or part of it, as Arrow IPC files.
+
+    Args:
+        repo: Ontology repository.
+        directory: Output directory (created if needed).
+        node_ids: Only export these objects, e.g. the ids of a subgraph.
+        types: Only export objects of these types.
+        compression: ``"lz4"`` or ``"zstd"``; uncompressed files can be
+            memory-mapped by readers.
+
+    Returns:
+        The manifest, also written to ``manifest.json``.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    out = Path(directory)
+    (out / "objects").mkdir(parents=True, exist_ok=True)
+    wanted = set(types) if types else None
+    with repo._lock:
+        seq = repo.seq
+        if node_ids is None:
+            nodes = list(repo.store.nodes())
+        else:
+            nodes = []
+            for node_id in dict.fromkeys(node_ids):
+                attrs = repo.store.get_node(node_id)
+                if attrs is not None:
+                    nodes.append((node_id, attrs))
+        if wanted is not None:
+            nodes = [(i, a) for i, a in nodes if a["type"] in wanted]
+        edges = list(repo.store.edges())
+        if node_ids is not None or wanted is not None:
+            # 부분 그래프: 양 끝이 모두 내보내는 객체인 간선만
+            kept = {node_id for node_id, _ in nodes}
+            edges = [edge for edge in edges if edge[0] in kept and edge[1] in kept]
+
+    by_type: Dict[str, List[Tuple[Any, Dict[str, Any]]]] = {}
+    for node_id, attrs in nodes:
+        by_type.setdefault(attrs["type"], []).append((node_id, attrs))
+
+    manifest: Dict[str, Any] = {"version": FORMAT_VERSION, "seq": seq, "types": {}}
+    for position, (obj_type, group) in enumerate(by_type.items()):
+        ids, id_encoding = _id_column([node_id for node_id, _ in group])
+        models = pa.array(
+            [attrs.get("model", obj_type) for _, attrs in group], pa.string()
+        ).dictionary_encode()
+        table, encodings = _table(
+            {"_id": ids, "_model": models}, [attrs.get("data", {}) for _, attrs in group]
+        )
+        name = _file_name(position, obj_type)
+        feather.write_feather(table, str(out / name), compression=compression or "uncompressed")
+        manifest["types"][obj_type] = {
+            "file": name, "rows": len(group), "id": id_encoding, "columns": encodings,
+        }
+
+    keys, key_encoding = _id_column([key for _, _, key, _ in edges])
+    sources, node_encoding = _id_column([s for s, _, _, _ in edges] + [t for _, t, _, _ in edges])
+    n = len(edges)
+    table, encodings = _table(
+        {
+            "_key": keys,
+            "_source": sources.slice(0, n),
+            "_target": sources.slice(n),
+            "_type": pa.array([a["type"] for _, _, _, a in edges], pa.string()).dictionary_encode(),
+        },
+        [attrs.get("data", {}) for _, _, _, attrs in edges],
+    )
+    feather.write_feather(table, str(out / LINKS_FILE), compression=compression or "uncompressed")
+    manifest["links"] = {
+        "file": LINKS_FILE, "rows": n, "key": key_encoding, "id": node_encoding,
+        "columns": encodings,
+    }
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _decode_ids(column, encoding: Optional[str], cache: Dict[int, UUID]) -> List[Any]:
+    if encoding == "uuid":
+        return _uuid_values(column, cache)
+    values = column.to_pylist()
+    if encoding == "json":
+        return _loads_many(values)
+    return values
+
+
+def _records(
+    table, meta: Iterable[str], encodings: Dict[str, str], cache: Dict[int, UUID]
+) -> List[Dict[str, Any]]:
+    data = table.drop_columns(list(meta))
+    columns = {
+        name: _uuid_values(data.column(name), cache) if encodings.get(name) == "uuid"
+        else data.column(name).to_pylist()
+        for name in data.column_names
+    }
+    for name, encoding in encodings.items():
+        values = columns[name]
+        if encoding == "json":
+            columns[name] = _loads_many(values)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())] if names else [
+        {} for _ in range(table.num_rows)
+    ]
+
+
+def read_snapshot(directory: str) -> Dict[str, Any]:
+    """Read an Arrow snapshot into the ``nodes``/``edges`` state the repository restores.
+
+    Raises:
+        ValueError: The directory was written by an unknown format version.
+    """
+    import pyarrow.feather as feather
+
+    root = Path(directory)
+    manifest = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+
+    cache: Dict[int, UUID] = {}
+    nodes: List[Tuple[Any, Dict[str, Any]]] = []
+    for obj_type, info in manifest["types"].items():
+        table = feather.read_table(str(root / info["file"]), memory_map=True)
+        ids = _decode_ids(table.column("_id"), info["id"], cache)
+        models = table.column("_model").to_pylist()
+        for node_id, model, data in zip(
+            ids, models, _records(table, META_NODE, info["columns"], cache)
+        ):
+            nodes.append((node_id, {
+                "type": obj_type,
+                "model": model,
+                "data": data,
+                "created_at": data.get("created_at"),
+                "updated_at": data.get("updated_at"),
+            }))
+
+    info = manifest["links"]
+    table = feather.read_table(str(root / info["file"]), memory_map=True)
+    keys = _decode_ids(table.column("_key"), info["key"], cache)
+    sources = _decode_ids(table.column("_source"), info["id"], cache)
+    targets = _decode_ids(table.column("_target"), info["id"], cache)
+    rel_types = table.column("_type").to_pylist()
+    edges = [
+        (source, target, key, {"type": rel, "data": data, "created_at": data.get("created_at")})
+        for source, target, key, rel, data in zip(
+            sources, targets, keys, rel_types, _records(table, META_EDGE, info["columns"], cache)
+        )
+    ]
+    return {"nodes": nodes, "edges": edges, "seq": manifest["seq"]}
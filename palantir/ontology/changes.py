@@ -0,0 +1,362 @@
+"""Change feed (change data capture) for the ontology repository.
+
+Every mutation applied through ``OntologyRepository._apply`` is published as
+a ``Change`` carrying the repository sequence number, so consumers such as
+the embedding writer, the Neo4j sync or the UI can update incrementally
+instead of re-reading the whole ontology.
+
+* ``ChangeFeed`` keeps a bounded history for catch-up (``since``) and fans
+  changes out to subscribers, each with its own bounded ring buffer. A slow
+  subscriber loses its oldest changes instead of blocking writers; the loss
+  is counted so it knows to resynchronise.
+* ``RedisStreamBridge`` optionally mirrors the feed into a Redis stream for
+  consumers in other processes. It reads a buffered subscription from its
+  own thread, so writers never wait on Redis.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeGap(LookupError):
+    """Requested changes are no longer retained; a full resync is needed."""
+
+
+@dataclass(frozen=True)
+class Change:
+    """One repository mutation.
+
+    ``objects`` and ``links`` are the ids of the nodes and edges touched;
+    ``types`` lists the object types involved. Payloads are not copied:
+    consumers read current state from the repository.
+    """
+
+    seq: int
+    op: str
+    objects: Tuple[Any, ...] = ()
+    links: Tuple[Any, ...] = ()
+    types: Tuple[str, ...] = ()
+    timestamp: float = 0.0
+
+    @property
+    def deleted(self) -> bool:
+        return self.op == "remove_node"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["objects"] = [str(i) for i in self.objects]
+        data["links"] = [str(i) for i in self.links]
+        data["types"] = list(self.types)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Change":
+        return cls(
+            seq=int(data["seq"]),
+            op=data["op"],
+            objects=tuple(data.get("objects", ())),
+            links=tuple(data.get("links", ())),
+            types=tuple(data.get("types", ())),
+            timestamp=float(data.get("timestamp", 0.0)),
+        )
+
+
+def describe(seq: int, op: str, payload: Dict[str, Any], store) -> Change:
+    """Build the ``Change`` for a mutation (call before applying removals)."""
+    objects: Tuple[Any, ...] = ()
+    links: Tuple[Any, ...] = ()
+    types: Tuple[str, ...] = ()
+    if op in ("add_node", "update_node"):
+        objects = (payload["id"],)
+        types = (payload["attrs"]["type"],)
+    elif op == "add_nodes":
+        objects = tuple(node_id for node_id, _ in payload["items"])
+        types = tuple(dict.fromkeys(attrs["type"] for _, attrs in payload["items"]))
+    elif op == "remove_node":
+        objects = (payload["id"],)
+        obj_type = store.node_type(payload["id"])
+        types = (obj_type,) if obj_type else ()
+    elif op == "add_edge":
+        objects = (payload["source"], payload["target"])
+        links = (payload["key"],)
+    elif op == "add_edges":
+        objects = tuple(
+            dict.fromkeys(n for s, t, _, _ in payload["items"] for n in (s, t))
+        )
+        links = tuple(key for _, _, key, _ in payload["items"])
+    return Change(seq, op, objects, links, types, time.time())
+
+
+class Subscription:
+    """Bounded buffer of changes for one consumer."""
+
+    def __init__(
+        self,
+        feed: "ChangeFeed",
+        capacity: int,
+        types: Optional[Iterable[str]] = None,
+        callback: Optional[Callable[[Change], None]] = None,
+    ) -> None:
+        self.feed = feed
+        self.types = frozenset(types) if types else None
+        self.callback = callback
+        self.dropped = 0
+        self.received = 0
+        self._buffer: Deque[Change] = deque(maxlen=capacity)
+        self._ready = threading.Condition()
+
+    def wants(self, change: Change) -> bool:
+        if self.types is None or not change.types:
+            return True
+        return not self.types.isdisjoint(change.types)
+
+    def _push(self, change: Change) -> None:
+        if self.callback is not None:
+            try:
+                self.callback(change)
+            except Exception:  # noqa: BLE001 - a consumer must not break writes
+                logger.exception("Change subscriber failed at seq %s", change.seq)
+            return
+        with self._ready:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1  # 가장 오래된 변경이 밀려남
+            self.received += 1
+            self._buffer.append(change)
+            self._ready.notify_all()
+
+    def poll(self, max_items: Optional[int] = None) -> List[Change]:
+        """Take buffered changes without waiting."""
+        with self._ready:
+            count = len(self._buffer) if max_items is None else min(max_items, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Change]:
+        """Wait for the next change; ``None`` on timeout."""
+        with self._ready:
+            if not self._buffer and not self._ready.wait_for(
+                lambda: self._buffer, timeout
+            ):
+                return None
+            return self._buffer.popleft()
+
+    def close(self) -> None:
+        self.feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """In-process publisher of repository changes."""
+
+    def __init__(self, history: int = 10_000) -> None:
+        """Create an empty feed.
+
+        Args:
+            history: Number of recent changes kept for ``since``.
+        """
+        self.head = 0
+        self._history: Deque[Change] = deque(maxlen=history)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def reset(self, seq: int) -> None:
+        """Start a new history at ``seq`` (after loading a snapshot)."""
+        with self._lock:
+            self.head = seq
+            self._history.clear()
+
+    def subscribe(
+        self,
+        callback: Optional[Callable[[Change], None]] = None,
+        capacity: int = 1024,
+        types: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        """Register a consumer.
+
+        Args:
+            callback: Called synchronously for each change; without it the
+                changes are buffered for ``poll``/``get``.
+            capacity: Ring buffer size for buffered subscribers.
+            types: Only deliver changes involving these object types.
+        """
+        subscription = Subscription(self, capacity, types, callback)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    def publish(self, change: Change) -> None:
+        with self._lock:
+            self.head = change.seq
+            self._history.append(change)
+            subscribers = self._subscribers
+        for subscription in subscribers:
+            if subscription.wants(change):
+                subscription._push(change)
+
+    def since(self, seq: int) -> List[Change]:
+        """Retained changes after ``seq``.
+
+        Raises:
+            ChangeGap: Some changes after ``seq`` are no longer retained.
+        """
+        with self._lock:
+            if seq >= self.head:
+                return []
+            oldest = self._history[0].seq if self._history else self.head + 1
+            if seq < oldest - 1:
+                raise ChangeGap(f"changes after {seq} are not retained (oldest {oldest})")
+            return [c for c in self._history if c.seq > seq]
+
+
+class RedisStreamBridge:
+    """Mirror a ``ChangeFeed`` into a Redis stream and read it back.
+
+    ``redis`` is imported only when no client is passed in.
+    """
+
+    def __init__(
+        self,
+        feed: Optional[ChangeFeed] = None,
+        client: Any = None,
+        url: str = "redis://localhost:6379/0",
+        stream: str = "ontology:changes",
+        maxlen: int = 100_000,
+        capacity: int = 100_000,
+        batch_size: int = 500,
+    ) -> None:
+        """Connect the bridge; with ``feed`` every change is appended to the stream.
+
+        Changes are buffered and written by a background thread, in
+        pipelined batches when the client supports it. If Redis falls
+        behind by more than ``capacity`` changes the oldest are dropped
+        (``subscription.dropped``) and stream consumers see a gap in ``seq``.
+
+        Args:
+            feed: Feed to mirror, or ``None`` for a read-only consumer.
+            client: Redis client; created from ``url`` when omitted.
+            url: Redis connection URL.
+            stream: Stream key.
+            maxlen: Approximate stream length kept by ``XADD``.
+            capacity: Changes buffered while Redis is slow or unavailable.
+            batch_size: Changes written per round trip.
+        """
+        if client is None:
+            import redis
+
+            client = redis.from_url(url)
+        self.client = client
+        self.stream = stream
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.feed = feed
+        self.forwarded = 0  # 마지막으로 스트림에 쓴 seq
+        self.failed = 0  # 쓰기에 실패해 스트림에 없는 변경 수
+        self._handled = 0  # 처리(전송 또는 실패)한 변경 수
+        self._sent = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.subscription: Optional[Subscription] = None
+        if feed is not None:
+            self.subscription = feed.subscribe(capacity=capacity)
+            self._thread = threading.Thread(
+                target=self._run, name="change-stream", daemon=True
+            )
+            self._thread.start()
+
+    def forward(self, change: Change) -> None:
+        self._xadd(self.client, change)
+
+    def _xadd(self, target: Any, change: Change) -> None:
+        target.xadd(
+            self.stream,
+            {"change": json.dumps(change.to_dict())},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+
+    def _send(self, changes: List[Change]) -> None:
+        written = 0
+        try:
+            pipeline = getattr(self.client, "pipeline", None)
+            if pipeline is None:
+                for change in changes:
+                    self.forward(change)
+                    written += 1
+            else:
+                pipe = pipeline(transaction=False)
+                for change in changes:
+                    self._xadd(pipe, change)
+                pipe.execute()
+                written = len(changes)
+        except Exception:  # noqa: BLE001 - keep forwarding later changes
+            logger.exception(
+                "Could not write changes %s-%s to Redis",
+                changes[written].seq, changes[-1].seq,
+            )
+        with self._sent:
+            if written:
+                self.forwarded = changes[written - 1].seq
+            self.failed += len(changes) - written
+            self._handled += len(changes)
+            self._sent.notify_all()
+
+    def _run(self) -> None:
+        subscription = self.subscription
+        while not self._stop.is_set():
+            first = subscription.get(timeout=0.5)
+            if first is not None:
+                self._send([first] + subscription.poll(self.batch_size - 1))
+        # 종료 시 남은 변경까지 전송
+        while True:
+            batch = subscription.poll(self.batch_size)
+            if not batch:
+                break
+            self._send(batch)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until changes published so far have been written."""
+        subscription = self.subscription
+        if subscription is None:
+            return True
+        target = subscription.received
+        with self._sent:
+            return self._sent.wait_for(
+                lambda: self._handled + subscription.dropped >= target, timeout
+            )
+
+    def read(
+        self, last_id: str = "0-0", count: int = 100, block: Optional[int] = None
+    ) -> List[Tuple[str, Change]]:
+        """Read changes after stream id ``last_id``.
+
+        Returns:
+            ``(stream_id, change)`` pairs; pass the last id to the next call.
+        """
+        response = self.client.xread({self.stream: last_id}, count=count, block=block)
+        entries = []
+        for _, messages in response or ():
+            for entry_id, fields in messages:
+                raw = fields.get(b"change", fields.get("change"))
+                if isinstance(entry_id, bytes):
+                    entry_id = entry_id.decode()
+                entries.append((entry_id, Change.from_dict(json.loads(raw))))
+        return entries
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop forwarding after writing the buffered changes."""
+        if self.subscription is not None:
+            self.subscription.close()
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+            self.subscription = None
@@ -0,0 +1,311 @@
+"""Incremental re-embedding of ontology objects.
+
+``EmbeddingTracker`` is attached to the repository indexes and keeps a dirty
+set: objects whose embedding text changed since they were last embedded, and
+objects that were deleted. Updates that leave the text alone do not mark an
+object dirty. Only ids and text hashes are kept; the text is read back from
+the repository when the object is embedded. ``EmbeddingRefreshWorker``
+drains that set in large batches, on a timer or as soon as enough objects
+are pending, and writes vectors back with bulk upserts. Re-embedding cost is
+therefore proportional to edits.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from palantir.utils.chroma_writer import ChromaBatchWriter
+
+from .indexes import index_key
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("name", "description")
+DELETED = None
+
+
+def embedding_text(data: Dict[str, Any], fields: Sequence[str] = TEXT_FIELDS) -> Optional[str]:
+    """Text an object is embedded from, or ``None`` if it has none.
+
+    Fields are looked up on the object first, then in its ``properties``.
+    """
+    properties = data.get("properties")
+    parts = []
+    for field in fields:
+        value = data.get(field)
+        if value in (None, "") and isinstance(properties, dict):
+            value = properties.get(field)
+        if value not in (None, ""):
+            parts.append(str(value))
+    return "\n".join(parts) if parts else None
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingTracker:
+    """Dirty set of objects whose embedding is missing or stale."""
+
+    def __init__(
+        self,
+        lookup: Callable[[Any], Optional[Dict[str, Any]]],
+        fields: Sequence[str] = TEXT_FIELDS,
+    ) -> None:
+        """Create an empty tracker.
+
+        Args:
+            lookup: Returns the stored data of an object id, or ``None``.
+            fields: Fields the embedding text is built from.
+        """
+        self.lookup = lookup
+        self.fields = tuple(fields)
+        self._embedded: Dict[Any, str] = {}  # 마지막으로 임베딩된 텍스트 해시
+        self._dirty: Dict[Any, Optional[Tuple[Any, str, Optional[str]]]] = {}
+        self._changed = threading.Condition(threading.Lock())
+        self._wake_at: Optional[int] = None  # 대기 중인 워커의 임계값
+        self._woken = False
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def add(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        text = embedding_text(data, self.fields)
+        key = index_key(node_id)
+        with self._changed:
+            if text is None:
+                # 텍스트가 사라졌으면 기존 벡터 삭제 대상
+                if key in self._embedded:
+                    self._dirty[key] = DELETED
+                else:
+                    self._dirty.pop(key, None)
+                return
+            digest = text_hash(text)
+            if self._embedded.get(key) == digest:
+                self._dirty.pop(key, None)
+                return
+            self._dirty[key] = (node_id, digest, obj_type)
+            if self._wake_at is not None and len(self._dirty) >= self._wake_at:
+                self._changed.notify_all()
+
+    def remove(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        key = index_key(node_id)
+        with self._changed:
+            # update는 remove 후 add로 오므로 여기서는 삭제로 표시만 해 둔다
+            if key in self._embedded or key in self._dirty:
+                self._dirty[key] = DELETED
+
+    def clear(self) -> None:
+        with self._changed:
+            self._embedded.clear()
+            self._dirty.clear()
+
+    def pending(self, limit: Optional[int] = None) -> List[Tuple[Any, Any]]:
+        """Snapshot of up to ``limit`` dirty entries as ``(key, entry)``."""
+        with self._changed:
+            items = iter(self._dirty.items())
+            if limit is None:
+                return list(items)
+            return [item for _, item in zip(range(limit), items)]
+
+    def mark_embedded(self, key: Any, digest: Optional[str]) -> None:
+        """Record a finished write unless the object changed meanwhile."""
+        with self._changed:
+            entry = self._dirty.get(key, DELETED)
+            current = None if entry is DELETED else entry[1]
+            if key in self._dirty and current != digest:
+                return
+            self._dirty.pop(key, None)
+            if digest is None:
+                self._embedded.pop(key, None)
+            else:
+                self._embedded[key] = digest
+
+    def text(self, node_id: Any) -> Optional[str]:
+        """Current embedding text of an object, ``None`` if it has none."""
+        data = self.lookup(node_id)
+        return None if data is None else embedding_text(data, self.fields)
+
+    def wait(self, threshold: int, timeout: Optional[float]) -> bool:
+        """Block until ``threshold`` objects are dirty or ``timeout`` passes."""
+        with self._changed:
+            self._wake_at = threshold
+            try:
+                return self._changed.wait_for(
+                    lambda: self._woken or len(self._dirty) >= threshold, timeout
+                )
+            finally:
+                self._wake_at = None
+                self._woken = False
+
+    def wake(self) -> None:
+        """Release a waiting ``wait`` call early."""
+        with self._changed:
+            self._woken = True
+            self._changed.notify_all()
+
+
+class EmbeddingRefreshWorker:
+    """Embed dirty objects in batches and write them back in bulk."""
+
+    def __init__(
+        self,
+        tracker: EmbeddingTracker,
+        embed: Optional[Callable[[List[str]], Any]] = None,
+        collection: Any = None,
+        batch_size: int = 512,
+        threshold: int = 1000,
+        interval: float = 60.0,
+        verify_existing: bool = True,
+    ):
+        """Configure the worker.
+
+        Args:
+            tracker: The repository's ``EmbeddingTracker``.
+            embed: Maps a list of texts to vectors; defaults to the vector
+                index embedding function.
+            collection: Chroma collection; defaults to the vector index one.
+            batch_size: Texts per embedding call and records per upsert.
+            threshold: Refresh as soon as this many objects are dirty.
+            interval: Otherwise refresh every ``interval`` seconds.
+            verify_existing: Before embedding, skip objects whose stored
+                vector already has the same text hash (e.g. after a restart).
+        """
+        self.tracker = tracker
+        self._embed = embed
+        self._collection = collection
+        self.batch_size = batch_size
+        self.threshold = threshold
+        self.interval = interval
+        self.verify_existing = verify_existing
+        self.stats = {"embedded": 0, "deleted": 0, "skipped": 0, "runs": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+
+    @property
+    def collection(self) -> Any:
+        if self._collection is None:
+            from .vector_index import get_vector_index
+
+            self._collection = get_vector_index().collection
+        return self._collection
+
+    def embed(self, texts: List[str]) -> Any:
+        if self._embed is None:
+            from .vector_index import get_vector_index
+
+            self._embed = get_vector_index().embedding_function
+        return self._embed(texts)
+
+    def run_once(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Refresh up to ``limit`` dirty objects now.
+
+        Returns:
+            Counts of embedded, deleted and skipped (already current) objects.
+        """
+        with self._run_lock:
+            counts = {"embedded": 0, "deleted": 0, "skipped": 0}
+            pending = self.tracker.pending(limit)
+            deleted = [key for key, entry in pending if entry is DELETED]
+            upserts = [(key, entry) for key, entry in pending if entry is not DELETED]
+
+            for start in range(0, len(deleted), self.batch_size):
+                batch = deleted[start:start + self.batch_size]
+                self.collection.delete(ids=[str(key) for key in batch])
+                for key in batch:
+                    self.tracker.mark_embedded(key, None)
+                counts["deleted"] += len(batch)
+
+            with ChromaBatchWriter(self.collection, self.batch_size) as writer:
+                for start in range(0, len(upserts), self.batch_size):
+                    batch = upserts[start:start + self.batch_size]
+                    if self.verify_existing:
+                        batch, current = self._split_current(batch)
+                        for key, digest in current:
+                            self.tracker.mark_embedded(key, digest)
+                        counts["skipped"] += len(current)
+                    # 텍스트는 저장소에서 지금 읽음 (그 사이 바뀌었으면 새 해시로 기록)
+                    texts = []
+                    for key, (node_id, _, obj_type) in batch:
+                        text = self.tracker.text(node_id)
+                        if text is not None:
+                            texts.append((key, node_id, obj_type, text, text_hash(text)))
+                    if not texts:
+                        continue
+                    vectors = self.embed([text for _, _, _, text, _ in texts])
+                    for (key, node_id, obj_type, text, digest), vector in zip(texts, vectors):
+                        writer.add(
+                            node_id,
+                            embedding=vector,
+                            document=text,
+                            metadata={"name": str(node_id), "type": obj_type,
+                                      "text_hash": digest},
+                        )
+                    writer.flush()
+                    for key, _, _, _, digest in texts:
+                        self.tracker.mark_embedded(key, digest)
+                    counts["embedded"] += len(texts)
+
+            for name, value in counts.items():
+                self.stats[name] += value
+            self.stats["runs"] += 1
+            return counts
+
+    def _split_current(self, batch):
+        """Separate entries whose stored vector already matches their text."""
+        try:
+            stored = self.collection.get(
+                ids=[str(entry[0]) for _, entry in batch], include=["metadatas"]
+            )
+        except Exception:  # noqa: BLE001 - verification is an optimisation
+            logger.debug("Could not read stored embedding hashes", exc_info=True)
+            return batch, []
+        hashes = {
+            record_id: (meta or {}).get("text_hash")
+            for record_id, meta in zip(stored.get("ids", []), stored.get("metadatas") or [])
+        }
+        todo, current = [], []
+        for key, entry in batch:
+            if hashes.get(str(entry[0])) == entry[1]:
+                current.append((key, entry[1]))
+            else:
+                todo.append((key, entry))
+        return todo, current
+
+    def start(self) -> threading.Thread:
+        """Refresh in a daemon thread until ``stop`` is called."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="embedding-refresh", daemon=True
+            )
+            self._thread.start()
+        return self._thread
+
+    def trigger(self) -> bool:
+        """Ask the background thread to refresh now; ``False`` if it is not running."""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        self.tracker.wake()
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self.tracker.wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.tracker.wait(self.threshold, self.interval)
+            if self._stop.is_set():
+                break
+            if len(self.tracker):
+                try:
+                    self.run_once()
+                except Exception:  # noqa: BLE001 - keep the worker alive
+                    logger.exception("Embedding refresh failed")
+                    self._stop.wait(self.interval)
@@ -0,0 +1,225 @@
+"""Time-ordered event index.
+
+Events are kept in timestamp-sorted lists per related object, per event
+type, per (related object, type) and globally. Every lookup ("events of X
+between t1 and t2", "last N events of type T") is a binary search into one
+of those lists followed by a slice, so its cost does not depend on how many
+events exist elsewhere.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .indexes import MISSING, index_key, property_value
+
+_MAX_ID = "\uffff"
+
+Entry = Tuple[float, str]
+
+
+def event_time(value: Any) -> Optional[float]:
+    """Timestamp as UTC epoch seconds (naive datetimes are taken as UTC)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def event_kind(data: Dict[str, Any]) -> Optional[str]:
+    """Kind of a stored event.
+
+    ``Event`` models keep it in ``type``; generic objects of type ``Event``
+    keep it in an ``event_type`` property.
+    """
+    kind = property_value(data, "event_type")
+    if kind is MISSING:
+        kind = data.get("type")
+    return kind if isinstance(kind, str) else None
+
+
+class _Timeline:
+    """Entries sorted by ``(time, id)``."""
+
+    __slots__ = ("entries",)
+
+    def __init__(self) -> None:
+        self.entries: List[Entry] = []
+
+    def add(self, entry: Entry) -> None:
+        entries = self.entries
+        if not entries or entries[-1] <= entry:
+            entries.append(entry)  # 대부분의 이벤트는 시간순으로 들어옴
+        else:
+            insort(entries, entry)
+
+    def remove(self, entry: Entry) -> None:
+        pos = bisect_left(self.entries, entry)
+        if pos < len(self.entries) and self.entries[pos] == entry:
+            del self.entries[pos]
+
+    def span(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.entries, (start, ""))
+        hi = (
+            len(self.entries)
+            if end is None
+            else bisect_right(self.entries, (end, _MAX_ID))
+        )
+        return lo, max(lo, hi)
+
+
+class EventIndex:
+    """Per-object and global time indexes over stored events."""
+
+    def __init__(self, obj_type: str = "Event") -> None:
+        self.obj_type = obj_type
+        self._global = _Timeline()
+        self._by_related: Dict[Hashable, _Timeline] = {}
+        self._by_kind: Dict[str, _Timeline] = {}
+        self._by_related_kind: Dict[Tuple[Hashable, str], _Timeline] = {}
+        self._ids: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._global.entries)
+
+    def _timelines(self, data: Dict[str, Any]) -> Iterator[Tuple[Optional[Dict], Hashable]]:
+        yield None, None
+        related = index_key(property_value(data, "related_id", None))
+        kind = event_kind(data)
+        if related is not None:
+            yield self._by_related, related
+        if kind is not None:
+            yield self._by_kind, kind
+        if related is not None and kind is not None:
+            yield self._by_related_kind, (related, kind)
+
+    def add(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type != self.obj_type:
+            return
+        ts = event_time(property_value(data, "timestamp", None))
+        if ts is None:
+            return
+        entry = (ts, str(node_id))
+        with self._lock:
+            self._ids[entry[1]] = node_id
+            for mapping, key in self._timelines(data):
+                if mapping is None:
+                    self._global.add(entry)
+                else:
+                    mapping.setdefault(key, _Timeline()).add(entry)
+
+    def load(self, items: Iterable[Tuple[Any, Dict[str, Any], Optional[str]]]) -> None:
+        """Replace the contents with ``(node_id, data, obj_type)`` items.
+
+        Entries are appended unsorted and each timeline is sorted once.
+        """
+        with self._lock:
+            self.clear()
+            for node_id, data, obj_type in items:
+                if (obj_type or data.get("type")) != self.obj_type:
+                    continue
+                ts = event_time(property_value(data, "timestamp", None))
+                if ts is None:
+                    continue
+                entry = (ts, str(node_id))
+                self._ids[entry[1]] = node_id
+                for mapping, key in self._timelines(data):
+                    timeline = (
+                        self._global if mapping is None
+                        else mapping.setdefault(key, _Timeline())
+                    )
+                    timeline.entries.append(entry)
+            for timeline in self._all_timelines():
+                timeline.entries.sort()
+
+    def _all_timelines(self) -> Iterator[_Timeline]:
+        yield self._global
+        for mapping in (self._by_related, self._by_kind, self._by_related_kind):
+            yield from mapping.values()
+
+    def remove(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type != self.obj_type:
+            return
+        ts = event_time(property_value(data, "timestamp", None))
+        if ts is None:
+            return
+        entry = (ts, str(node_id))
+        with self._lock:
+            self._ids.pop(entry[1], None)
+            for mapping, key in self._timelines(data):
+                if mapping is None:
+                    self._global.remove(entry)
+                    continue
+                timeline = mapping.get(key)
+                if timeline is not None:
+                    timeline.remove(entry)
+                    if not timeline.entries:
+                        del mapping[key]
+
+    def clear(self) -> None:
+        # 락은 그대로 두고 내용만 비운다 (다른 스레드가 잡고 있을 수 있음)
+        with self._lock:
+            self._global = _Timeline()
+            self._by_related.clear()
+            self._by_kind.clear()
+            self._by_related_kind.clear()
+            self._ids.clear()
+
+    def scan(
+        self,
+        related_id: Any = None,
+        event_type: Optional[str] = None,
+        start: Any = None,
+        end: Any = None,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+    ) -> List[Any]:
+        """Event ids in time order, optionally bounded.
+
+        Args:
+            related_id: Only events of this object.
+            event_type: Only events of this kind.
+            start: Earliest timestamp (inclusive; datetime, ISO string or epoch).
+            end: Latest timestamp (inclusive).
+            limit: Maximum number of ids.
+            reverse: Newest first; with ``limit`` this gives the last N events.
+        """
+        with self._lock:
+            if related_id is not None and event_type is not None:
+                timeline = self._by_related_kind.get((index_key(related_id), event_type))
+            elif related_id is not None:
+                timeline = self._by_related.get(index_key(related_id))
+            elif event_type is not None:
+                timeline = self._by_kind.get(event_type)
+            else:
+                timeline = self._global
+            if timeline is None:
+                return []
+            lo, hi = timeline.span(
+                None if start is None else event_time(start),
+                None if end is None else event_time(end),
+            )
+            if limit is not None:
+                if reverse:
+                    lo = max(lo, hi - limit)
+                else:
+                    hi = min(hi, lo + limit)
+            entries = timeline.entries[lo:hi]
+            if reverse:
+                entries.reverse()
+            return [self._ids[node_key] for _, node_key in entries]
+
+    def recent(self, days: float = 7, now: Optional[datetime] = None, **kwargs) -> List[Any]:
+        """Event ids from the last ``days`` days (see ``scan`` for filters)."""
+        now = now or datetime.now(timezone.utc)
+        return self.scan(start=now - timedelta(days=days), **kwargs)
@@ -0,0 +1,494 @@
+"""Graph storage backends for the ontology repository.
+
+Both backends expose the same small interface. Node attributes are dicts
+with ``type``, ``model``, ``data``, ``created_at`` and ``updated_at``. Edge
+attributes are dicts with ``type``, ``data`` and ``created_at``.
+
+``NetworkXStore`` keeps everything in a ``nx.MultiDiGraph``.
+``CompactStore`` is built for large ontologies:
+
+* UUIDs map to dense integer node ids;
+* type, model and relationship names are interned to small integer codes;
+* node properties are kept per column, and a node's ``data`` dict is only
+  built when it is read;
+* adjacency is held as CSR arrays (``indptr``/``indices``) for out- and
+  in-edges, plus a small delta list for edges added since the last rebuild.
+
+NetworkX remains available from either backend through ``to_networkx``; it
+is imported on first use, so the compact backend never loads it.
+"""
+
+import threading
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+EdgeTuple = Tuple[Any, Any, Any, Dict[str, Any]]
+# (node_ids, source positions, target positions, relationship codes, names)
+EdgeIndex = Tuple[List[Any], np.ndarray, np.ndarray, np.ndarray, List[str]]
+
+_ABSENT = object()
+_LINK_FIELDS = ("id", "source_id", "target_id", "relationship_type")
+
+
+class NetworkXStore:
+    """Graph store backed by a NetworkX multigraph."""
+
+    def __init__(self) -> None:
+        import networkx as nx
+
+        self.graph = nx.MultiDiGraph()
+
+    def has_node(self, node_id: Any) -> bool:
+        return self.graph.has_node(node_id)
+
+    def get_node(self, node_id: Any) -> Optional[Dict[str, Any]]:
+        return self.graph.nodes.get(node_id)
+
+    def add_node(self, node_id: Any, attrs: Dict[str, Any]) -> None:
+        self.graph.add_node(node_id, **attrs)
+
+    def update_node(self, node_id: Any, attrs: Dict[str, Any]) -> None:
+        self.graph.nodes[node_id].update(attrs)
+
+    def remove_node(self, node_id: Any) -> None:
+        self.graph.remove_node(node_id)
+
+    def add_edge(self, source: Any, target: Any, key: Any, attrs: Dict[str, Any]):
+        self.graph.add_edge(source, target, key=key, **attrs)
+
+    def out_edges(self, node_id: Any) -> Iterator[Tuple[Any, Any, Dict[str, Any]]]:
+        """Yield ``(target, key, attrs)`` for outgoing edges."""
+        for _, target, key, attrs in self.graph.out_edges(
+            node_id, keys=True, data=True
+        ):
+            yield target, key, attrs
+
+    def in_edges(self, node_id: Any) -> Iterator[Tuple[Any, Any, Dict[str, Any]]]:
+        """Yield ``(source, key, attrs)`` for incoming edges."""
+        for source, _, key, attrs in self.graph.in_edges(
+            node_id, keys=True, data=True
+        ):
+            yield source, key, attrs
+
+    def neighbors(self, node_id: Any, direction: str = "out") -> Iterator[Tuple[Any, str]]:
+        """Yield ``(neighbour, relationship_type)`` without copying edge data."""
+        adjacency = self.graph.succ if direction == "out" else self.graph.pred
+        for other, edges in adjacency.get(node_id, {}).items():
+            for attrs in edges.values():
+                yield other, attrs["type"]
+
+    def node_type(self, node_id: Any) -> Optional[str]:
+        node = self.graph.nodes.get(node_id)
+        return None if node is None else node["type"]
+
+    def edge_index(self) -> EdgeIndex:
+        """Return all edges as node positions plus relationship codes."""
+        node_ids = list(self.graph.nodes())
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+        rels = Interner()
+        src, dst, codes = [], [], []
+        for u, nbrs in self.graph.adj.items():
+            i = position[u]
+            for v, keyed in nbrs.items():
+                j = position[v]
+                for attrs in keyed.values():
+                    src.append(i)
+                    dst.append(j)
+                    codes.append(rels.code(attrs["type"]))
+        return (
+            node_ids,
+            np.asarray(src, dtype=np.int64),
+            np.asarray(dst, dtype=np.int64),
+            np.asarray(codes, dtype=np.int64),
+            rels.values,
+        )
+
+    def node_ids(self) -> Iterator[Any]:
+        return iter(self.graph.nodes())
+
+    def nodes(self) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        return iter(self.graph.nodes(data=True))
+
+    def edges(self) -> Iterator[EdgeTuple]:
+        return iter(self.graph.edges(keys=True, data=True))
+
+    def number_of_nodes(self) -> int:
+        return self.graph.number_of_nodes()
+
+    def number_of_edges(self) -> int:
+        return self.graph.number_of_edges()
+
+    def to_networkx(self) -> "nx.MultiDiGraph":
+        return self.graph
+
+
+class Interner:
+    """Two-way mapping between strings and small integer codes."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> Any:
+        return self.values[code]
+
+
+class ColumnTable:
+    """Row-addressed table that stores each field as its own column."""
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, List[Any]] = {}
+        self.order: List[str] = []
+        self.rows = 0
+
+    def append(self, row: Dict[str, Any]) -> int:
+        index = self.rows
+        self.rows += 1
+        for column in self.columns.values():
+            column.append(_ABSENT)
+        self.set(index, row)
+        return index
+
+    def set(self, index: int, row: Dict[str, Any]) -> None:
+        for name, column in self.columns.items():
+            column[index] = _ABSENT
+        for name, value in row.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [_ABSENT] * self.rows
+                self.order.append(name)
+            column[index] = value
+
+    def get(self, index: int) -> Dict[str, Any]:
+        row = {}
+        for name in self.order:
+            value = self.columns[name][index]
+            if value is not _ABSENT:
+                row[name] = value
+        return row
+
+    def value(self, index: int, name: str, default: Any = None) -> Any:
+        column = self.columns.get(name)
+        if column is None:
+            return default
+        value = column[index]
+        return default if value is _ABSENT else value
+
+    def clear(self, index: int) -> None:
+        for column in self.columns.values():
+            column[index] = _ABSENT
+
+
+class _CSR:
+    """Compressed sparse row adjacency with an append-only delta.
+
+    ``indptr``, ``indices`` and the delta are replaced together as one
+    tuple, so a reader that takes ``state`` once sees a consistent view
+    even while another thread rebuilds.
+    """
+
+    def __init__(self) -> None:
+        self.state: Tuple[np.ndarray, np.ndarray, Dict[int, List[int]]] = (
+            np.zeros(1, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            {},
+        )
+        self.delta_size = 0
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self.state[0]
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.state[1]
+
+    def rebuild(self, owners: np.ndarray, alive: np.ndarray, n_nodes: int) -> None:
+        edge_ids = np.flatnonzero(alive)
+        owner = owners[edge_ids]
+        order = np.argsort(owner, kind="stable")
+        counts = np.bincount(owner, minlength=n_nodes)
+        indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.state = (indptr, edge_ids[order], {})
+        self.delta_size = 0
+
+    def add(self, node: int, edge: int) -> None:
+        self.state[2].setdefault(node, []).append(edge)
+        self.delta_size += 1
+
+    def edges_of(self, node: int) -> List[int]:
+        indptr, indices, delta = self.state
+        edges: List[int] = []
+        if node + 1 < len(indptr):
+            edges = indices[indptr[node] : indptr[node + 1]].tolist()
+        extra = delta.get(node)
+        return edges + extra if extra else edges
+
+
+class CompactStore:
+    """Array-backed graph store with interned codes and CSR adjacency."""
+
+    def __init__(self, rebuild_ratio: float = 0.125, min_rebuild: int = 1024):
+        """Initialize an empty store.
+
+        Args:
+            rebuild_ratio: Rebuild CSR arrays once the delta of new edges
+                exceeds this fraction of all edges.
+            min_rebuild: Never rebuild for fewer pending edges than this.
+        """
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+        # nodes
+        self._index: Dict[Any, int] = {}
+        self._ids: List[Any] = []
+        self._alive = bytearray()
+        self._type = array("i")
+        self._model = array("i")
+        self._types = Interner()
+        self._models = Interner()
+        self._props = ColumnTable()
+        # edges
+        self._src = array("q")
+        self._dst = array("q")
+        self._rel = array("i")
+        self._ealive = bytearray()
+        self._ekeys: List[Any] = []
+        self._rels = Interner()
+        self._eprops = ColumnTable()
+        self._out = _CSR()
+        self._in = _CSR()
+        self._edge_count = 0
+        # 읽기 경로에서도 재구성이 일어나므로 간선 배열 변경과 재구성을 직렬화
+        self._lock = threading.Lock()
+
+    # -- nodes --------------------------------------------------------------
+
+    def has_node(self, node_id: Any) -> bool:
+        return node_id in self._index
+
+    def _node_attrs(self, i: int) -> Dict[str, Any]:
+        data = self._props.get(i)
+        return {
+            "type": self._types[self._type[i]],
+            "model": self._models[self._model[i]],
+            "data": data,
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+        }
+
+    def get_node(self, node_id: Any) -> Optional[Dict[str, Any]]:
+        i = self._index.get(node_id)
+        return None if i is None else self._node_attrs(i)
+
+    def node_type(self, node_id: Any) -> Optional[str]:
+        """Return a node's type without materialising its properties."""
+        i = self._index.get(node_id)
+        return None if i is None else self._types[self._type[i]]
+
+    def add_node(self, node_id: Any, attrs: Dict[str, Any]) -> None:
+        i = self._index.get(node_id)
+        if i is not None:
+            self.update_node(node_id, attrs)
+            return
+        i = len(self._ids)
+        self._index[node_id] = i
+        self._ids.append(node_id)
+        self._alive.append(1)
+        self._type.append(self._types.code(attrs["type"]))
+        self._model.append(self._models.code(attrs.get("model", attrs["type"])))
+        self._props.append(attrs.get("data", {}))
+
+    def update_node(self, node_id: Any, attrs: Dict[str, Any]) -> None:
+        i = self._index[node_id]
+        if "type" in attrs:
+            self._type[i] = self._types.code(attrs["type"])
+        if "model" in attrs:
+            self._model[i] = self._models.code(attrs["model"])
+        if "data" in attrs:
+            self._props.set(i, attrs["data"])
+
+    def remove_node(self, node_id: Any) -> None:
+        i = self._index.pop(node_id)
+        for e in self._out_edge_ids(i) + self._in_edge_ids(i):
+            if self._ealive[e]:
+                self._ealive[e] = 0
+                self._eprops.clear(e)
+                self._edge_count -= 1
+        self._alive[i] = 0
+        self._ids[i] = None
+        self._props.clear(i)
+
+    def node_ids(self) -> Iterator[Any]:
+        return (node_id for node_id in self._ids if node_id is not None)
+
+    def nodes(self) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        for i, node_id in enumerate(self._ids):
+            if node_id is not None:
+                yield node_id, self._node_attrs(i)
+
+    def number_of_nodes(self) -> int:
+        return len(self._index)
+
+    # -- edges --------------------------------------------------------------
+
+    def add_edge(self, source: Any, target: Any, key: Any, attrs: Dict[str, Any]):
+        for node_id in (source, target):
+            if node_id not in self._index:
+                raise KeyError(f"Node {node_id} does not exist")
+        s, t = self._index[source], self._index[target]
+        data = dict(attrs.get("data", {}))
+        for name in _LINK_FIELDS:
+            data.pop(name, None)
+        if "created_at" not in data and "created_at" in attrs:
+            data["created_at"] = attrs["created_at"]
+        with self._lock:
+            e = len(self._ekeys)
+            self._src.append(s)
+            self._dst.append(t)
+            self._rel.append(self._rels.code(attrs["type"]))
+            self._ealive.append(1)
+            self._ekeys.append(key)
+            self._eprops.append(data)
+            self._out.add(s, e)
+            self._in.add(t, e)
+            self._edge_count += 1
+
+    def _edge_attrs(self, e: int) -> Dict[str, Any]:
+        rel = self._rels[self._rel[e]]
+        data = {
+            "id": self._ekeys[e],
+            "source_id": self._ids[self._src[e]],
+            "target_id": self._ids[self._dst[e]],
+            "relationship_type": rel,
+        }
+        data.update(self._eprops.get(e))
+        return {"type": rel, "data": data, "created_at": data.get("created_at")}
+
+    def _needs_rebuild(self) -> bool:
+        pending = self._out.delta_size
+        return pending >= self.min_rebuild and pending >= self.rebuild_ratio * len(
+            self._ekeys
+        )
+
+    def _maybe_rebuild(self) -> None:
+        if self._needs_rebuild():
+            with self._lock:
+                # 다른 스레드가 먼저 재구성했을 수 있음
+                if self._needs_rebuild():
+                    self._rebuild_locked()
+
+    def rebuild(self) -> None:
+        """Fold pending edges into the CSR arrays and drop deleted edges."""
+        with self._lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        alive = np.frombuffer(bytes(self._ealive), dtype=np.uint8).astype(bool)
+        n = len(self._ids)
+        self._out.rebuild(np.array(self._src, dtype=np.int64), alive, n)
+        self._in.rebuild(np.array(self._dst, dtype=np.int64), alive, n)
+
+    def _out_edge_ids(self, i: int) -> List[int]:
+        self._maybe_rebuild()
+        return [e for e in self._out.edges_of(i) if self._ealive[e]]
+
+    def _in_edge_ids(self, i: int) -> List[int]:
+        self._maybe_rebuild()
+        return [e for e in self._in.edges_of(i) if self._ealive[e]]
+
+    def out_edges(self, node_id: Any) -> Iterator[Tuple[Any, Any, Dict[str, Any]]]:
+        i = self._index.get(node_id)
+        if i is None:
+            return
+        for e in self._out_edge_ids(i):
+            yield self._ids[self._dst[e]], self._ekeys[e], self._edge_attrs(e)
+
+    def in_edges(self, node_id: Any) -> Iterator[Tuple[Any, Any, Dict[str, Any]]]:
+        i = self._index.get(node_id)
+        if i is None:
+            return
+        for e in self._in_edge_ids(i):
+            yield self._ids[self._src[e]], self._ekeys[e], self._edge_attrs(e)
+
+    def neighbors(self, node_id: Any, direction: str = "out") -> Iterator[Tuple[Any, str]]:
+        """Yield ``(neighbour, relationship_type)`` straight from the arrays."""
+        i = self._index.get(node_id)
+        if i is None:
+            return
+        if direction == "out":
+            edge_ids, other = self._out_edge_ids(i), self._dst
+        else:
+            edge_ids, other = self._in_edge_ids(i), self._src
+        for e in edge_ids:
+            yield self._ids[other[e]], self._rels[self._rel[e]]
+
+    def edges(self) -> Iterator[EdgeTuple]:
+        for e, alive in enumerate(self._ealive):
+            if alive:
+                yield (
+                    self._ids[self._src[e]],
+                    self._ids[self._dst[e]],
+                    self._ekeys[e],
+                    self._edge_attrs(e),
+                )
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def edge_index(self) -> EdgeIndex:
+        """Return all edges as node positions plus relationship codes.
+
+        Built from the edge arrays without touching per-edge properties.
+        """
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        position = np.cumsum(alive) - 1
+        with self._lock:
+            edges = np.frombuffer(bytes(self._ealive), dtype=np.uint8).astype(bool)
+            src = np.frombuffer(self._src, dtype=np.int64)[edges]
+            dst = np.frombuffer(self._dst, dtype=np.int64)[edges]
+            codes = np.frombuffer(self._rel, dtype=np.int32)[edges].astype(np.int64)
+        node_ids = [node_id for node_id in self._ids if node_id is not None]
+        return node_ids, position[src], position[dst], codes, list(self._rels.values)
+
+    def csr(self, direction: str = "out") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(indptr, neighbour_ids, edge_ids)`` over integer node ids."""
+        with self._lock:
+            self._rebuild_locked()
+            adjacency, other = (
+                (self._out, self._dst) if direction == "out" else (self._in, self._src)
+            )
+            indptr, indices, _ = adjacency.state
+            neighbours = np.frombuffer(other, dtype=np.int64)[indices]
+        return indptr, neighbours, indices
+
+    # -- export -------------------------------------------------------------
+
+    def to_networkx(self) -> "nx.MultiDiGraph":
+        """Materialise the store as a NetworkX graph (export view)."""
+        import networkx as nx
+
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edges())
+        return graph
+
+
+def create_store(backend: str = "networkx"):
+    """Create a graph store by backend name (``networkx`` or ``compact``)."""
+    if backend == "networkx":
+        return NetworkXStore()
+    if backend == "compact":
+        return CompactStore()
+    raise ValueError(f"Unknown graph backend: {backend}")
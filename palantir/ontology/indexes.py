@@ -0,0 +1,390 @@
+"""Secondary indexes and a small query planner for the ontology repository."""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+DEFAULT_INDEXED_PROPERTIES = ("customer_id", "order_id", "related_id", "category")
+
+MISSING = object()
+_MAX_ID = "\uffff"
+
+
+def property_value(data: Dict[str, Any], key: str, default: Any = MISSING) -> Any:
+    """Read a property from a stored object dict.
+
+    Declared model fields live at the top level of the dict; ad-hoc values
+    live under ``properties``. Top-level fields win.
+    """
+    if key in data and key != "properties":
+        return data[key]
+    props = data.get("properties")
+    if isinstance(props, dict) and key in props:
+        return props[key]
+    return default
+
+
+def index_key(value: Any) -> Optional[Hashable]:
+    """Normalise a value for hash lookups (UUIDs compare equal to their str)."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, dict, set)):
+        return None
+    return value
+
+
+def values_equal(actual: Any, expected: Any) -> bool:
+    """Equality used by both indexed and scanned lookups."""
+    if actual is MISSING:
+        return False
+    a, e = index_key(actual), index_key(expected)
+    if a is None or e is None:
+        return actual == expected
+    return a == e
+
+
+def sort_key(value: Any) -> Optional[Tuple[int, Any]]:
+    """Order values of mixed types: numbers, then strings, then dates."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return (0, float(value))
+    if isinstance(value, UUID):
+        return (1, str(value))
+    if isinstance(value, str):
+        return (1, value)
+    if isinstance(value, (datetime, date)):
+        return (2, value.isoformat())
+    return None
+
+
+class HashIndex:
+    """Exact-match index: value -> ids, in insertion order."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, Dict[Any, None]] = {}
+
+    def add(self, value: Any, node_id: Any) -> None:
+        key = index_key(value)
+        if key is not None:
+            self._entries.setdefault(key, {})[node_id] = None
+
+    def remove(self, value: Any, node_id: Any) -> None:
+        key = index_key(value)
+        ids = self._entries.get(key) if key is not None else None
+        if ids is not None:
+            ids.pop(node_id, None)
+            if not ids:
+                del self._entries[key]
+
+    def get(self, value: Any) -> Dict[Any, None]:
+        key = index_key(value)
+        if key is None:
+            return {}
+        return self._entries.get(key, {})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SortedIndex:
+    """Ordered index supporting range and prefix scans by binary search."""
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[Tuple[int, Any], str]] = []
+        self._ids: Dict[str, Any] = {}
+
+    def add(self, value: Any, node_id: Any) -> None:
+        key = sort_key(value)
+        if key is not None:
+            self._ids[str(node_id)] = node_id
+            insort(self._keys, (key, str(node_id)))
+
+    def load(self, pairs: Iterable[Tuple[Tuple[int, Any], Any]]) -> None:
+        """Replace the contents with ``(sort_key, id)`` pairs, sorting once."""
+        keys: List[Tuple[Tuple[int, Any], str]] = []
+        ids: Dict[str, Any] = {}
+        for key, node_id in pairs:
+            name = str(node_id)
+            ids[name] = node_id
+            keys.append((key, name))
+        keys.sort()
+        self._keys, self._ids = keys, ids
+
+    def remove(self, value: Any, node_id: Any) -> None:
+        key = sort_key(value)
+        if key is None:
+            return
+        entry = (key, str(node_id))
+        pos = bisect_left(self._keys, entry)
+        if pos < len(self._keys) and self._keys[pos] == entry:
+            del self._keys[pos]
+            self._ids.pop(str(node_id), None)
+
+    def span(
+        self,
+        low: Any = None,
+        high: Any = None,
+        include_low: bool = True,
+        include_high: bool = True,
+    ) -> Tuple[int, int]:
+        """Return the ``[start, stop)`` positions of values in a range.
+
+        Bounds of a different kind than the indexed values (e.g. a number
+        against strings) select nothing rather than raising.
+        """
+        keys = self._keys
+        lk = sort_key(low) if low is not None else None
+        hk = sort_key(high) if high is not None else None
+        if (low is not None and lk is None) or (high is not None and hk is None):
+            return 0, 0
+        kinds = {k[0] for k in (lk, hk) if k is not None}
+        if len(kinds) > 1:
+            return 0, 0
+        start, stop = 0, len(keys)
+        if kinds:
+            # 같은 종류(숫자/문자열/날짜)의 값 구간으로 제한
+            kind = kinds.pop()
+            start = bisect_left(keys, ((kind,), ""))
+            stop = bisect_left(keys, ((kind + 1,), ""))
+        if lk is not None:
+            start = max(
+                start,
+                bisect_left(keys, (lk, ""))
+                if include_low
+                else bisect_right(keys, (lk, _MAX_ID)),
+            )
+        if hk is not None:
+            stop = min(
+                stop,
+                bisect_right(keys, (hk, _MAX_ID))
+                if include_high
+                else bisect_left(keys, (hk, "")),
+            )
+        return start, max(start, stop)
+
+    def prefix_span(self, prefix: str) -> Tuple[int, int]:
+        """Return the positions of string values starting with ``prefix``."""
+        start = bisect_left(self._keys, ((1, prefix), ""))
+        stop = bisect_left(self._keys, ((1, prefix + _MAX_ID), ""))
+        return start, stop
+
+    def scan(
+        self,
+        start: int,
+        stop: int,
+        reverse: bool = False,
+        after: Optional[Tuple[Tuple[int, Any], str]] = None,
+    ) -> Iterator[Any]:
+        """Yield ids between two positions in value order.
+
+        Args:
+            start: First position (inclusive).
+            stop: Last position (exclusive).
+            reverse: Walk from ``stop`` down to ``start``.
+            after: Resume strictly after this ``(sort_key, str(id))`` entry,
+                in the direction of the walk (cursor pagination).
+        """
+        if after is not None:
+            if reverse:
+                stop = min(stop, bisect_left(self._keys, after))
+            else:
+                start = max(start, bisect_right(self._keys, after))
+        positions = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        for pos in positions:
+            yield self._ids[self._keys[pos][1]]
+
+    def range(
+        self,
+        low: Any = None,
+        high: Any = None,
+        include_low: bool = True,
+        include_high: bool = True,
+        reverse: bool = False,
+    ) -> Iterator[Any]:
+        """Yield ids with ``low <= value <= high`` in value order."""
+        start, stop = self.span(low, high, include_low, include_high)
+        return self.scan(start, stop, reverse)
+
+    def prefix(self, prefix: str) -> Iterator[Any]:
+        """Yield ids whose string value starts with ``prefix``."""
+        return self.scan(*self.prefix_span(prefix))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@dataclass
+class QueryPlan:
+    """Access path chosen for a lookup.
+
+    ``candidates`` is None when no index applies and a full scan is needed.
+    ``residual`` lists the property filters still to check per candidate.
+    """
+
+    index: str
+    candidates: Optional[Iterable[Any]]
+    residual: Dict[str, Any] = field(default_factory=dict)
+    estimated_rows: Optional[int] = None
+
+
+class OntologyIndexes:
+    """Type index plus hash and sorted indexes on declared properties.
+
+    Kept consistent by the repository on every add, update and delete.
+    Derived indexes (anything with ``add``/``remove``/``clear`` taking
+    ``(node_id, data, obj_type)``) can be attached and are kept in step;
+    those with a ``load`` method are also rebuilt in bulk by ``load``.
+    """
+
+    def __init__(self, properties: Iterable[str] = DEFAULT_INDEXED_PROPERTIES):
+        self.properties = tuple(properties)
+        self.attached: List[Any] = []
+        self.by_type: Dict[str, Dict[Any, None]] = {}
+        self.hash: Dict[str, HashIndex] = {p: HashIndex() for p in self.properties}
+        self.sorted: Dict[str, SortedIndex] = {
+            p: SortedIndex() for p in self.properties
+        }
+
+    def add(
+        self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str] = None
+    ) -> None:
+        obj_type = obj_type or data.get("type")
+        if obj_type is not None:
+            self.by_type.setdefault(obj_type, {})[node_id] = None
+        for prop in self.properties:
+            value = property_value(data, prop)
+            if value is not MISSING:
+                self.hash[prop].add(value, node_id)
+                self.sorted[prop].add(value, node_id)
+        for index in self.attached:
+            index.add(node_id, data, obj_type)
+
+    def remove(
+        self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str] = None
+    ) -> None:
+        obj_type = obj_type or data.get("type")
+        ids = self.by_type.get(obj_type)
+        if ids is not None:
+            ids.pop(node_id, None)
+            if not ids:
+                del self.by_type[obj_type]
+        for prop in self.properties:
+            value = property_value(data, prop)
+            if value is not MISSING:
+                self.hash[prop].remove(value, node_id)
+                self.sorted[prop].remove(value, node_id)
+        for index in self.attached:
+            index.remove(node_id, data, obj_type)
+
+    def load(self, items: Iterable[Tuple[Any, Dict[str, Any], Optional[str]]]) -> None:
+        """Rebuild every index from ``(node_id, data, obj_type)`` in one pass.
+
+        Used when a whole repository is restored. Sorted indexes collect
+        their keys and sort once instead of inserting object by object.
+        """
+        items = list(items)
+        self.clear()
+        pairs: Dict[str, List[Tuple[Tuple[int, Any], Any]]] = {
+            p: [] for p in self.properties
+        }
+        for node_id, data, obj_type in items:
+            obj_type = obj_type or data.get("type")
+            if obj_type is not None:
+                self.by_type.setdefault(obj_type, {})[node_id] = None
+            props = data.get("properties")
+            if not isinstance(props, dict):
+                props = {}
+            for prop in self.properties:
+                # property_value와 같은 규칙을 호출 없이 적용
+                if prop in data and prop != "properties":
+                    value = data[prop]
+                elif prop in props:
+                    value = props[prop]
+                else:
+                    continue
+                self.hash[prop].add(value, node_id)
+                key = sort_key(value)
+                if key is not None:
+                    pairs[prop].append((key, node_id))
+        for prop, entries in pairs.items():
+            self.sorted[prop].load(entries)
+        for index in self.attached:
+            bulk = getattr(index, "load", None)
+            if bulk is not None:
+                bulk(items)
+                continue
+            for node_id, data, obj_type in items:
+                index.add(node_id, data, obj_type or data.get("type"))
+
+    def attach(self, index: Any) -> Any:
+        """Keep a derived index in step with this one; returns ``index``."""
+        self.attached.append(index)
+        return index
+
+    def update(
+        self,
+        node_id: Any,
+        old: Dict[str, Any],
+        new: Dict[str, Any],
+        old_type: Optional[str] = None,
+        new_type: Optional[str] = None,
+    ) -> None:
+        old_type = old_type or old.get("type")
+        new_type = new_type or new.get("type")
+        if old_type != new_type:
+            self.remove(node_id, old, old_type)
+            self.add(node_id, new, new_type)
+            return
+        for prop in self.properties:
+            before, after = property_value(old, prop), property_value(new, prop)
+            if before is after or (
+                before is not MISSING
+                and after is not MISSING
+                and values_equal(before, after)
+            ):
+                continue
+            if before is not MISSING:
+                self.hash[prop].remove(before, node_id)
+                self.sorted[prop].remove(before, node_id)
+            if after is not MISSING:
+                self.hash[prop].add(after, node_id)
+                self.sorted[prop].add(after, node_id)
+        for index in self.attached:
+            index.remove(node_id, old, old_type)
+            index.add(node_id, new, new_type)
+
+    def clear(self) -> None:
+        self.by_type.clear()
+        self.hash = {p: HashIndex() for p in self.properties}
+        self.sorted = {p: SortedIndex() for p in self.properties}
+        for index in self.attached:
+            index.clear()
+
+    def plan(
+        self,
+        obj_type: Optional[str] = None,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> QueryPlan:
+        """Pick the most selective index for an equality lookup.
+
+        Every usable index is a candidate; the one with the fewest entries
+        drives the scan and the remaining filters are checked per row.
+        """
+        properties = dict(properties or {})
+        options: List[Tuple[int, str, Dict[Any, None]]] = []
+        if obj_type is not None:
+            ids = self.by_type.get(obj_type, {})
+            options.append((len(ids), "type", ids))
+        for key, value in properties.items():
+            if key in self.hash and index_key(value) is not None:
+                ids = self.hash[key].get(value)
+                options.append((len(ids), key, ids))
+        if not options:
+            return QueryPlan("scan", None, properties)
+        size, name, ids = min(options, key=lambda o: o[0])
+        residual = {k: v for k, v in properties.items() if k != name}
+        return QueryPlan(name, ids, residual, size)
@@ -8,6 +8,9 @@ from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, validator
 
 from .base import OntologyObject
+from .rules import (DELIVERY_ORDER_MISMATCH, ORDER_DELIVERY_RULES,
+                    ORDER_PAYMENT_RULES, PAYMENT_AMOUNT_MISMATCH,
+                    PAYMENT_ORDER_MISMATCH, check_link)
 
 
 class Customer(OntologyObject):
@@ -25,8 +28,20 @@ class Customer(OntologyObject):
         """Get a human-readable display name."""
         return f"{self.name} ({self.email})"
 
-    def recommend_products(self, orders: list, products: list) -> list:
-        """고객의 주문 이력 기반으로 추천 상품 리스트 반환 (유사도 기반 예시)"""
+    def recommend_products(
+        self,
+        orders: Optional[list] = None,
+        products: Optional[list] = None,
+        repo=None,
+        k: int = 5,
+    ) -> list:
+        """고객의 주문 이력 기반으로 추천 상품 리스트 반환 (유사도 기반 예시)
+
+        ``repo``가 주어지면 리스트를 훑지 않고 저장소의 공동구매 인덱스
+        (``OntologyRepository.recommend_products``)로 상위 ``k``개를 구한다.
+        """
+        if repo is not None:
+            return _hydrate(repo, repo.recommend_products(self.id, k))
         purchased = set()
         for order in orders:
             if order.customer_id == self.id:
@@ -67,8 +82,16 @@ class Product(OntologyObject):
         """Check if the product is available in stock."""
         return self.stock > 0
 
-    def similar_products(self, products: list) -> list:
-        """유사 카테고리/태그 기반 유사 상품 추천"""
+    def similar_products(
+        self, products: Optional[list] = None, repo=None, k: int = 5
+    ) -> list:
+        """유사 카테고리/태그 기반 유사 상품 추천
+
+        ``repo``가 주어지면 저장소의 태그 인덱스
+        (``OntologyRepository.similar_products``)로 상위 ``k``개를 구한다.
+        """
+        if repo is not None:
+            return _hydrate(repo, repo.similar_products(self.id, k))
         sims = []
         for p in products:
             if p.id != self.id:
@@ -105,20 +128,11 @@ class Order(OntologyObject):
 
     def link_payment(self, payment) -> bool:
         """주문-결제 연결 유효성 체크"""
-        return (
-            payment
-            and self.total_amount == payment.amount
-            and self.status != "cancelled"
-            and payment.order_id == self.id
-        )
+        return check_link(ORDER_PAYMENT_RULES, order=self, payment=payment)
 
     def link_delivery(self, delivery) -> bool:
         """주문-배송 연결 유효성 체크"""
-        return (
-            delivery
-            and delivery.order_id == self.id
-            and self.status in ["shipped", "delivered"]
-        )
+        return check_link(ORDER_DELIVERY_RULES, order=self, delivery=delivery)
 
     def related_events(self, events: list) -> list:
         """이 주문과 관련된 이벤트 리스트 반환"""
@@ -150,7 +164,9 @@ class Payment(BaseModel):
 
     def is_valid_for_order(self, order) -> bool:
         """결제-주문 연결 유효성 체크"""
-        return self.order_id == order.id and self.amount == order.total_amount
+        return check_link(
+            (PAYMENT_ORDER_MISMATCH, PAYMENT_AMOUNT_MISMATCH), order=order, payment=self
+        )
 
 
 class Delivery(BaseModel):
@@ -168,7 +184,7 @@ class Delivery(BaseModel):
 
     def is_valid_for_order(self, order) -> bool:
         """배송-주문 연결 유효성 체크"""
-        return self.order_id == order.id
+        return check_link((DELIVERY_ORDER_MISMATCH,), order=order, delivery=self)
 
 
 class Event(BaseModel):
@@ -185,9 +201,18 @@ class Event(BaseModel):
 
     @staticmethod
     def filter_events(
-        events: list, event_type: str = None, related_id: UUID = None
+        events: Optional[list] = None,
+        event_type: str = None,
+        related_id: UUID = None,
+        repo=None,
     ) -> list:
-        """이벤트 타입/연관 객체 기준 필터링"""
+        """이벤트 타입/연관 객체 기준 필터링
+
+        ``repo``가 주어지면 저장소의 이벤트 시간 인덱스에서 바로 조회한다
+        (결과는 시간순).
+        """
+        if repo is not None:
+            return _hydrate(repo, repo.event_timeline(related_id, event_type))
         return [
             e
             for e in events
@@ -196,28 +221,30 @@ class Event(BaseModel):
         ]
 
     @staticmethod
-    def timeline(events: list) -> list:
-        """이벤트 타임라인(시간순 정렬)"""
+    def timeline(
+        events: Optional[list] = None, repo=None, related_id: UUID = None
+    ) -> list:
+        """이벤트 타임라인(시간순 정렬)
+
+        ``repo``가 주어지면 정렬 없이 이벤트 시간 인덱스 순서를 그대로 쓴다.
+        """
+        if repo is not None:
+            return _hydrate(repo, repo.event_timeline(related_id))
         return sorted(events, key=lambda e: e.timestamp)
 
 
-# 관계/유효성 메서드 예시 (Order와 Payment/Delivery 연결)
+def _hydrate(repo, rows: list) -> list:
+    """저장소가 돌려준 dict 목록을 모델 객체로 변환"""
+    return [repo.get_object(row["id"]) for row in rows]
+
+
+# 관계/유효성 메서드 (규칙 정의는 rules.py, DataFrame 검증과 공유)
 def link_order_payment(order: Order, payment: Payment) -> bool:
-    return (
-        order
-        and payment
-        and order.total_amount == payment.amount
-        and order.status != "cancelled"
-    )
+    return check_link(ORDER_PAYMENT_RULES, order=order, payment=payment)
 
 
 def link_order_delivery(order: Order, delivery: Delivery) -> bool:
-    return (
-        order
-        and delivery
-        and order.status in ["shipped", "delivered"]
-        and delivery.order_id == order.customer_id
-    )
+    return check_link(ORDER_DELIVERY_RULES, order=order, delivery=delivery)
 
 
 # 관계/유효성/이벤트 자동화 함수 예시
@@ -0,0 +1,216 @@
+"""Write-ahead log and snapshots for durable ontology repositories.
+
+Every repository mutation is appended to a log segment as a framed record
+(length, CRC32, pickled ``(seq, op, payload)``). Records are buffered and
+fsynced together (group commit), either by a background thread every
+``commit_interval`` seconds or immediately in ``sync="always"`` mode.
+
+A snapshot stores the whole graph at a sequence number. Writing one starts
+a new log segment and removes older segments and snapshots. On startup the
+newest snapshot is loaded and only the log tail after it is replayed. A
+torn record at the end of the last segment (crash mid-write) is detected
+by its checksum and truncated.
+"""
+
+import logging
+import os
+import pickle
+import struct
+import threading
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<II")  # payload length, crc32
+_SNAPSHOT_PREFIX = "snapshot-"
+_WAL_PREFIX = "wal-"
+
+Record = Tuple[int, str, Dict[str, Any]]
+
+
+def _seq_of(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+def _fsync_dir(path: Path) -> None:
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_segment(path: Path, truncate_torn: bool = False) -> Iterator[Record]:
+    """Yield records from one log segment, stopping at the first bad frame."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + _HEADER.size <= len(data):
+        length, crc = _HEADER.unpack_from(data, offset)
+        start, end = offset + _HEADER.size, offset + _HEADER.size + length
+        body = data[start:end]
+        if len(body) < length or zlib.crc32(body) != crc:
+            break
+        yield pickle.loads(body)  # noqa: S301 - our own log file
+        offset = end
+    if offset < len(data):
+        logger.warning("Discarding %d torn bytes at end of %s", len(data) - offset, path)
+        if truncate_torn:
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+
+class WriteAheadLog:
+    """Append-only, segment-rotated mutation log with group commit."""
+
+    def __init__(
+        self,
+        directory: str,
+        sync: str = "group",
+        commit_interval: float = 0.05,
+    ):
+        """Open the log directory.
+
+        Args:
+            directory: Directory holding log segments and snapshots.
+            sync: ``"always"`` fsyncs on every record, ``"group"`` batches
+                fsyncs every ``commit_interval`` seconds, ``"none"`` leaves
+                flushing to the OS.
+            commit_interval: Group-commit window in seconds.
+        """
+        if sync not in ("always", "group", "none"):
+            raise ValueError(f"Unknown sync mode: {sync}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sync = sync
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._file = None
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    # -- recovery -----------------------------------------------------------
+
+    def snapshots(self) -> List[Path]:
+        return sorted(
+            self.directory.glob(f"{_SNAPSHOT_PREFIX}*.bin"), key=_seq_of
+        )
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{_WAL_PREFIX}*.log"), key=_seq_of)
+
+    def identity(self) -> str:
+        """Random id of this log directory, created on first use.
+
+        Sequence numbers are only comparable between runs that share it.
+        """
+        path = self.directory / "epoch"
+        if path.exists():
+            return path.read_text(encoding="utf-8").strip()
+        epoch = uuid.uuid4().hex
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(epoch, encoding="utf-8")
+        os.replace(tmp, path)
+        return epoch
+
+    def load_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Load the newest snapshot, or None if there is none."""
+        snapshots = self.snapshots()
+        if not snapshots:
+            return None
+        with open(snapshots[-1], "rb") as f:
+            return pickle.load(f)  # noqa: S301 - our own snapshot file
+
+    def replay(self, after_seq: int = 0) -> Iterator[Record]:
+        """Yield logged records with a sequence number above ``after_seq``."""
+        segments = self.segments()
+        for i, segment in enumerate(segments):
+            last = i == len(segments) - 1
+            for record in read_segment(segment, truncate_torn=last):
+                if record[0] > after_seq:
+                    yield record
+
+    # -- writing ------------------------------------------------------------
+
+    def open(self, next_seq: int) -> None:
+        """Start appending, reusing the newest segment if there is one."""
+        segments = self.segments()
+        path = segments[-1] if segments else self._segment_path(next_seq)
+        self._file = open(path, "ab")
+        if self.sync == "group" and self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="ontology-wal", daemon=True
+            )
+            self._flusher.start()
+
+    def _segment_path(self, first_seq: int) -> Path:
+        return self.directory / f"{_WAL_PREFIX}{first_seq:020d}.log"
+
+    def append(self, seq: int, op: str, payload: Dict[str, Any]) -> None:
+        """Queue one record; it is durable once the next commit completes."""
+        body = pickle.dumps((seq, op, payload), protocol=pickle.HIGHEST_PROTOCOL)
+        frame = _HEADER.pack(len(body), zlib.crc32(body)) + body
+        with self._lock:
+            self._buffer.append(frame)
+            if self.sync == "always":
+                self._commit_locked()
+
+    def commit(self) -> None:
+        """Write and fsync all queued records."""
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        if not self._buffer or self._file is None:
+            return
+        self._file.write(b"".join(self._buffer))
+        self._buffer.clear()
+        self._file.flush()
+        if self.sync != "none":
+            os.fsync(self._file.fileno())
+
+    def _run_flusher(self) -> None:
+        while not self._closed.wait(self.commit_interval):
+            try:
+                self.commit()
+            except Exception:  # noqa: BLE001 - keep flushing on transient errors
+                logger.exception("Write-ahead log commit failed")
+
+    def write_snapshot(self, seq: int, state: Dict[str, Any]) -> Path:
+        """Persist a snapshot at ``seq`` and start a fresh log segment."""
+        path = self.directory / f"{_SNAPSHOT_PREFIX}{seq:020d}.bin"
+        tmp = path.with_suffix(".tmp")
+        with self._lock:
+            self._commit_locked()
+            with open(tmp, "wb") as f:
+                pickle.dump({"seq": seq, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            _fsync_dir(self.directory)
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._segment_path(seq + 1), "ab")
+            for old in self.snapshots()[:-1]:
+                old.unlink()
+            for old in self.segments()[:-1]:
+                old.unlink()
+        return path
+
+    def close(self) -> None:
+        """Commit pending records and stop the flusher."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            self._commit_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
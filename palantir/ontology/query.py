@@ -0,0 +1,345 @@
+"""Executable ontology queries.
+
+Compiles the ``OntologyQuery`` shape (``type``, ``properties``,
+``relations``, ``limit``, ``offset``) into an index-aware plan:
+
+* property conditions are plain values (equality) or operator dicts such as
+  ``{"$gt": 100}``;
+* equality and ``$in`` use hash indexes, ranges and ``$prefix`` use sorted
+  indexes, and the most selective one drives the scan;
+* ``relations`` are existence joins (``{"type": "PLACED", "direction": "in",
+  "target_type": "Customer", "where": {...}}``);
+* results are ordered by ``order_by`` (or id) and paged with opaque cursors.
+  Only ``offset + limit`` rows are ever held, in a bounded heap or by
+  walking a sorted index in order.
+"""
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .indexes import MISSING, index_key, property_value, sort_key, values_equal
+
+OPERATORS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin",
+             "$prefix", "$exists")
+_RANGE_OPS = ("$gt", "$gte", "$lt", "$lte")
+
+
+@dataclass
+class Condition:
+    """One ``property <op> value`` filter."""
+
+    prop: str
+    op: str
+    value: Any
+
+    def matches(self, data: Dict[str, Any]) -> bool:
+        actual = property_value(data, self.prop)
+        if self.op == "$exists":
+            return (actual is not MISSING) == bool(self.value)
+        if self.op == "$eq":
+            return values_equal(actual, self.value)
+        if self.op == "$ne":
+            return not values_equal(actual, self.value)
+        if self.op == "$in":
+            return any(values_equal(actual, v) for v in self.value)
+        if self.op == "$nin":
+            return not any(values_equal(actual, v) for v in self.value)
+        if actual is MISSING:
+            return False
+        if self.op == "$prefix":
+            return isinstance(actual, str) and actual.startswith(self.value)
+        a, b = sort_key(actual), sort_key(self.value)
+        if a is None or b is None or a[0] != b[0]:
+            return False
+        return {
+            "$gt": a > b,
+            "$gte": a >= b,
+            "$lt": a < b,
+            "$lte": a <= b,
+        }[self.op]
+
+
+@dataclass
+class Relation:
+    """Require (or forbid) a relationship to a matching object."""
+
+    type: Optional[str] = None
+    direction: str = "out"
+    target_type: Optional[str] = None
+    where: List[Condition] = field(default_factory=list)
+    exists: bool = True
+
+
+@dataclass
+class QueryPage:
+    """One page of query results."""
+
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    plan: str
+
+
+def parse_conditions(properties: Optional[Dict[str, Any]]) -> List[Condition]:
+    """Turn a ``properties`` dict into conditions."""
+    conditions = []
+    for key, value in (properties or {}).items():
+        if isinstance(value, dict) and value and all(k in OPERATORS for k in value):
+            conditions.extend(Condition(key, op, v) for op, v in value.items())
+            continue
+        conditions.append(Condition(key, "$eq", value))
+    for cond in conditions:
+        if cond.op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {cond.op}")
+        if cond.op in ("$in", "$nin") and not isinstance(cond.value, (list, tuple, set)):
+            raise ValueError(f"{cond.op} needs a list for {cond.prop}")
+    return conditions
+
+
+def parse_relations(relations: Optional[Iterable[Dict[str, Any]]]) -> List[Relation]:
+    """Turn ``relations`` dicts into relation joins."""
+    parsed = []
+    for rel in relations or []:
+        direction = rel.get("direction", "out")
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"Unknown relation direction: {direction}")
+        parsed.append(
+            Relation(
+                type=rel.get("type"),
+                direction=direction,
+                target_type=rel.get("target_type"),
+                where=parse_conditions(rel.get("where") or rel.get("properties")),
+                exists=rel.get("exists", True),
+            )
+        )
+    return parsed
+
+
+def encode_cursor(key: Tuple[int, Any], node_id: Any) -> str:
+    raw = json.dumps([list(key), str(node_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Tuple[int, Any], str]:
+    try:
+        key, node_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (tuple(key), node_key)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _directions(direction: str) -> Tuple[str, ...]:
+    return ("out", "in") if direction == "both" else (direction,)
+
+
+class QueryExecutor:
+    """Plans and runs property/relation queries against a repository."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.indexes = repo.indexes
+        self.store = repo.store
+
+    # -- planning -----------------------------------------------------------
+
+    def _index_options(
+        self, obj_type: Optional[str], conditions: List[Condition]
+    ) -> List[Tuple[int, str, Callable[[], Iterable[Any]], Optional[Condition]]]:
+        """List usable access paths as ``(size, name, ids_fn, condition)``."""
+        options = []
+        if obj_type is not None:
+            ids = self.indexes.by_type.get(obj_type, {})
+            options.append((len(ids), "type", lambda ids=ids: list(ids), None))
+        bounds: Dict[str, Dict[str, Condition]] = {}
+        for cond in conditions:
+            hashed = self.indexes.hash.get(cond.prop)
+            ordered = self.indexes.sorted.get(cond.prop)
+            if cond.op == "$eq" and hashed is not None and index_key(cond.value) is not None:
+                ids = hashed.get(cond.value)
+                options.append((len(ids), cond.prop, lambda ids=ids: list(ids), cond))
+            elif cond.op == "$in" and hashed is not None:
+                groups = [hashed.get(v) for v in cond.value]
+
+                def union(groups=groups):
+                    seen = {}
+                    for ids in groups:
+                        seen.update(ids)
+                    return list(seen)
+
+                options.append((sum(map(len, groups)), f"{cond.prop}:in", union, cond))
+            elif cond.op == "$prefix" and ordered is not None:
+                start, stop = ordered.prefix_span(cond.value)
+                options.append(
+                    (stop - start, f"{cond.prop}:prefix",
+                     lambda o=ordered, s=start, e=stop: list(o.scan(s, e)), cond)
+                )
+            elif cond.op in _RANGE_OPS and ordered is not None:
+                bounds.setdefault(cond.prop, {})[cond.op] = cond
+        for prop, ops in bounds.items():
+            ordered = self.indexes.sorted[prop]
+            low = ops.get("$gte") or ops.get("$gt")
+            high = ops.get("$lte") or ops.get("$lt")
+            start, stop = ordered.span(
+                low.value if low else None,
+                high.value if high else None,
+                include_low=low is None or low.op == "$gte",
+                include_high=high is None or high.op == "$lte",
+            )
+            options.append(
+                (stop - start, f"{prop}:range",
+                 lambda o=ordered, s=start, e=stop: list(o.scan(s, e)), None)
+            )
+        return options
+
+    def _relation_option(
+        self, relation: Relation
+    ) -> Optional[Tuple[int, str, Callable[[], Iterable[Any]], None]]:
+        """Semi-join: objects that have a relation to a filtered target set."""
+        if not relation.exists or not (relation.target_type or relation.where):
+            return None
+        targets = [
+            node_id
+            for node_id, _ in self._matching(relation.target_type, relation.where)
+        ]
+        sources: Dict[Any, None] = {}
+        reverse = {"out": "in", "in": "out"}
+        for target in targets:
+            for direction in _directions(relation.direction):
+                for other, rel in self.store.neighbors(target, reverse[direction]):
+                    if relation.type is None or rel == relation.type:
+                        sources[other] = None
+        return (len(sources), f"relation:{relation.type}", lambda: list(sources), None)
+
+    def _matching(
+        self, obj_type: Optional[str], conditions: List[Condition]
+    ) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        options = self._index_options(obj_type, conditions)
+        if options:
+            _, _, ids_fn, _ = min(options, key=lambda o: o[0])
+            node_ids = ids_fn()
+        else:
+            node_ids = self.store.node_ids()
+        for node_id in node_ids:
+            node = self.store.get_node(node_id)
+            if node is None or (obj_type and node["type"] != obj_type):
+                continue
+            if all(cond.matches(node["data"]) for cond in conditions):
+                yield node_id, node
+
+    def _has_relation(self, node_id: Any, relation: Relation) -> bool:
+        for direction in _directions(relation.direction):
+            for other, rel in self.store.neighbors(node_id, direction):
+                if relation.type is not None and rel != relation.type:
+                    continue
+                target = self.store.get_node(other)
+                if relation.target_type and target["type"] != relation.target_type:
+                    continue
+                if all(cond.matches(target["data"]) for cond in relation.where):
+                    return True
+        return False
+
+    # -- execution ----------------------------------------------------------
+
+    def execute(
+        self,
+        obj_type: Optional[str] = None,
+        properties: Optional[Dict[str, Any]] = None,
+        relations: Optional[Iterable[Dict[str, Any]]] = None,
+        limit: int = 10,
+        offset: int = 0,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+    ) -> QueryPage:
+        """Run a query and return one page.
+
+        Args:
+            obj_type: Object type filter.
+            properties: Property conditions (values or operator dicts).
+            relations: Relation joins, see module docstring.
+            limit: Page size.
+            offset: Rows to skip (after the cursor, if any).
+            order_by: Property to sort on; objects without a sortable value
+                for it are left out. Defaults to ordering by id.
+            descending: Sort order.
+            cursor: ``next_cursor`` of the previous page.
+
+        Returns:
+            The page, the cursor for the next page (None on the last page)
+            and the name of the driving access path.
+        """
+        conditions = parse_conditions(properties)
+        joins = parse_relations(relations)
+        after = decode_cursor(cursor) if cursor else None
+        want = offset + limit
+
+        options = self._index_options(obj_type, conditions)
+        for relation in joins:
+            option = self._relation_option(relation)
+            if option is not None:
+                options.append(option)
+        best = min(options, key=lambda o: o[0]) if options else None
+
+        def keep(node_id: Any, node: Dict[str, Any]) -> bool:
+            if obj_type and node["type"] != obj_type:
+                return False
+            if not all(cond.matches(node["data"]) for cond in conditions):
+                return False
+            return all(
+                self._has_relation(node_id, rel) == rel.exists for rel in joins
+            )
+
+        def order_key(node_id: Any, node: Dict[str, Any]):
+            if order_by is None:
+                return (1, str(node_id))
+            return sort_key(property_value(node["data"], order_by, None))
+
+        def past_cursor(entry: Tuple[Tuple[int, Any], str]) -> bool:
+            if after is None:
+                return True
+            return entry < after if descending else entry > after
+
+        ordered_index = self.indexes.sorted.get(order_by) if order_by else None
+        # 정렬 인덱스를 순서대로 훑는 편이 후보 집합보다 저렴하면 그대로 스트리밍
+        stream = ordered_index is not None and (
+            best is None or best[1] == "type" or best[0] > 4 * want
+        )
+        if stream:
+            plan = f"{order_by}:ordered"
+            start, stop = 0, len(ordered_index)
+            node_ids = ordered_index.scan(start, stop, descending, after)
+            rows: List[Tuple[Any, Any, Dict[str, Any]]] = []
+            for node_id in node_ids:
+                node = self.store.get_node(node_id)
+                if node is not None and keep(node_id, node):
+                    rows.append((order_key(node_id, node), node_id, node))
+                    if len(rows) > want:
+                        break
+        else:
+            plan = best[1] if best else "scan"
+            node_ids = best[2]() if best else self.store.node_ids()
+
+            def candidates():
+                for node_id in node_ids:
+                    node = self.store.get_node(node_id)
+                    if node is None or not keep(node_id, node):
+                        continue
+                    key = order_key(node_id, node)
+                    if key is None:
+                        continue
+                    entry = (key, str(node_id))
+                    if past_cursor(entry):
+                        yield entry, node_id, node
+
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            top = pick(want + 1, candidates(), key=lambda row: row[0])
+            rows = [(entry[0], node_id, node) for entry, node_id, node in top]
+
+        page = rows[offset:want]
+        next_cursor = None
+        if len(rows) > want and page:
+            key, node_id, _ = page[-1]
+            next_cursor = encode_cursor(key, node_id)
+        return QueryPage([node["data"] for _, _, node in page], next_cursor, plan)
@@ -0,0 +1,244 @@
+"""Co-purchase recommendation index.
+
+Orders are folded into two sparse matrices as they are stored:
+
+* customer x product: how many orders of the customer contain the product;
+* product x product: how many customers bought both products.
+
+Both live in ``scipy.sparse`` CSR form (imported on the first merge) with a
+small pending delta for recent updates, so a recommendation is one sparse row product over the customer's
+purchases. Its cost depends on how many products co-occur with them, not on
+catalogue or order-history size.
+"""
+
+import heapq
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+from .indexes import MISSING, index_key, property_value
+
+
+class GrowableSparse:
+    """CSR matrix that grows on demand and buffers recent increments."""
+
+    def __init__(self, merge_ratio: float = 0.125, min_merge: int = 1024):
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+        self._base = None  # 첫 병합 전까지는 scipy를 불러오지 않음
+        self._pending: Dict[int, Dict[int, float]] = {}
+        self._pending_size = 0
+        self.shape = (0, 0)
+
+    def add(self, row: int, col: int, value: float) -> None:
+        cells = self._pending.setdefault(row, {})
+        if col not in cells:
+            self._pending_size += 1
+        cells[col] = cells.get(col, 0.0) + value
+        self.shape = (max(self.shape[0], row + 1), max(self.shape[1], col + 1))
+        nnz = 0 if self._base is None else self._base.nnz
+        if self._pending_size >= max(self.min_merge, self.merge_ratio * nnz):
+            self.merge()
+
+    def merge(self) -> "sp.csr_matrix":
+        """Fold pending increments into the CSR base and return it."""
+        import scipy.sparse as sp
+
+        if self._base is None:
+            self._base = sp.csr_matrix((0, 0), dtype=np.float64)
+        if self._pending or self._base.shape != self.shape:
+            rows, cols, vals = [], [], []
+            for row, cells in self._pending.items():
+                rows.extend([row] * len(cells))
+                cols.extend(cells.keys())
+                vals.extend(cells.values())
+            delta = sp.csr_matrix((vals, (rows, cols)), shape=self.shape)
+            base = self._base.copy()
+            base.resize(self.shape)
+            self._base = (base + delta).tocsr()
+            self._base.eliminate_zeros()
+            self._pending.clear()
+            self._pending_size = 0
+        return self._base
+
+    def row_sum(
+        self, rows: Iterable[int], weights: Optional[Iterable[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Weighted sum of rows as sparse ``(columns, values)`` arrays."""
+        rows = np.asarray(list(rows), dtype=np.int64)
+        weights = (
+            np.ones(len(rows)) if weights is None else np.asarray(list(weights), float)
+        )
+        cols: List[np.ndarray] = []
+        vals: List[np.ndarray] = []
+        in_base = rows < (0 if self._base is None else self._base.shape[0])
+        if in_base.any():
+            import scipy.sparse as sp
+
+            vector = sp.csr_matrix(
+                (weights[in_base], (np.zeros(in_base.sum(), dtype=np.int64), rows[in_base])),
+                shape=(1, self._base.shape[0]),
+            )
+            product = (vector @ self._base).tocsr()
+            cols.append(product.indices.astype(np.int64))
+            vals.append(product.data)
+        for row, weight in zip(rows.tolist(), weights.tolist()):
+            cells = self._pending.get(row)
+            if cells:
+                cols.append(np.fromiter(cells.keys(), dtype=np.int64, count=len(cells)))
+                vals.append(np.fromiter(cells.values(), dtype=float, count=len(cells)) * weight)
+        if not cols:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        cols_all, vals_all = np.concatenate(cols), np.concatenate(vals)
+        unique, inverse = np.unique(cols_all, return_inverse=True)
+        summed = np.bincount(inverse, weights=vals_all, minlength=len(unique))
+        keep = summed != 0
+        return unique[keep], summed[keep]
+
+
+class CoPurchaseIndex:
+    """Incrementally maintained customer x product and item-item matrices."""
+
+    def __init__(self) -> None:
+        self._customers: Dict[Hashable, int] = {}
+        self._products: Dict[Hashable, int] = {}
+        self._product_ids: List[Any] = []
+        self.purchases = GrowableSparse()
+        self.co_occurrence = GrowableSparse()
+        self._lock = threading.RLock()
+
+    def _code(self, mapping: Dict[Hashable, int], key: Hashable) -> int:
+        code = mapping.get(key)
+        if code is None:
+            code = mapping[key] = len(mapping)
+        return code
+
+    def _product_code(self, product_id: Any) -> int:
+        key = index_key(product_id)
+        code = self._products.get(key)
+        if code is None:
+            code = self._code(self._products, key)
+            self._product_ids.append(product_id)
+        return code
+
+    def _basket(self, customer: int) -> Dict[int, float]:
+        cols, vals = self.purchases.row_sum([customer])
+        return dict(zip(cols.tolist(), vals.tolist()))
+
+    def add_order(self, customer_id: Any, product_ids: Iterable[Any]) -> None:
+        """Record that a customer ordered the given products."""
+        with self._lock:
+            customer = self._code(self._customers, index_key(customer_id))
+            products = {self._product_code(p) for p in product_ids}
+            basket = self._basket(customer)
+            new = [p for p in products if basket.get(p, 0) <= 0]
+            owned = [p for p, n in basket.items() if n > 0]
+            for p in products:
+                self.purchases.add(customer, p, 1.0)
+            for i, p in enumerate(new):
+                # 새로 구매한 상품만 기존 구매 상품과의 동시 구매 횟수를 올림
+                for q in owned + new[:i]:
+                    self.co_occurrence.add(p, q, 1.0)
+                    self.co_occurrence.add(q, p, 1.0)
+
+    def remove_order(self, customer_id: Any, product_ids: Iterable[Any]) -> None:
+        """Undo ``add_order`` (order deleted or changed)."""
+        with self._lock:
+            customer = self._customers.get(index_key(customer_id))
+            if customer is None:
+                return
+            products = {
+                self._products[key]
+                for key in map(index_key, product_ids)
+                if key in self._products
+            }
+            basket = self._basket(customer)
+            gone = [p for p in products if basket.get(p, 0) == 1]
+            for p in products:
+                if basket.get(p, 0) > 0:
+                    self.purchases.add(customer, p, -1.0)
+            remaining = [p for p, n in basket.items() if n > 0 and p not in gone]
+            for i, p in enumerate(gone):
+                for q in remaining + gone[:i]:
+                    self.co_occurrence.add(p, q, -1.0)
+                    self.co_occurrence.add(q, p, -1.0)
+
+    def recommend(
+        self, customer_id: Any, k: int = 5, exclude_purchased: bool = True
+    ) -> List[Tuple[Any, float]]:
+        """Top-k products co-purchased with the customer's purchases.
+
+        Returns:
+            ``(product_id, score)`` pairs, best first.
+        """
+        with self._lock:
+            customer = self._customers.get(index_key(customer_id))
+            if customer is None:
+                return []
+            basket = [p for p, n in self._basket(customer).items() if n > 0]
+            if not basket:
+                return []
+            cols, scores = self.co_occurrence.row_sum(basket)
+            if exclude_purchased and len(cols):
+                mask = ~np.isin(cols, basket)
+                cols, scores = cols[mask], scores[mask]
+            return self._top(cols, scores, k)
+
+    def similar(self, product_id: Any, k: int = 5) -> List[Tuple[Any, float]]:
+        """Top-k products most often bought by the same customers."""
+        with self._lock:
+            code = self._products.get(index_key(product_id))
+            if code is None:
+                return []
+            cols, scores = self.co_occurrence.row_sum([code])
+            return self._top(cols, scores, k)
+
+    def _top(self, cols: np.ndarray, scores: np.ndarray, k: int):
+        if len(cols) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            cols, scores = cols[part], scores[part]
+        top = heapq.nsmallest(
+            len(cols), zip(cols.tolist(), scores.tolist()), key=lambda c: (-c[1], c[0])
+        )
+        return [(self._product_ids[col], score) for col, score in top]
+
+    # -- repository hooks ----------------------------------------------------
+
+    @staticmethod
+    def order_products(data: Dict[str, Any]) -> Optional[Tuple[Any, List[Any]]]:
+        """Customer and product ids of a stored order dict, if it has them."""
+        customer_id = property_value(data, "customer_id")
+        items = property_value(data, "items")
+        if customer_id is MISSING or not isinstance(items, list):
+            return None
+        products = [
+            item["product_id"]
+            for item in items
+            if isinstance(item, dict) and item.get("product_id") is not None
+        ]
+        return customer_id, products
+
+    def add(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type == "Order":
+            order = self.order_products(data)
+            if order:
+                self.add_order(*order)
+
+    def remove(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type == "Order":
+            order = self.order_products(data)
+            if order:
+                self.remove_order(*order)
+
+    def clear(self) -> None:
+        # 잠금 객체는 유지 (__init__을 다시 부르면 대기 중인 호출과 잠금이 갈림)
+        with self._lock:
+            self._customers = {}
+            self._products = {}
+            self._product_ids = []
+            self.purchases = GrowableSparse()
+            self.co_occurrence = GrowableSparse()
@@ -0,0 +1,49 @@
+"""Registry of concrete ontology model classes by type name."""
+
+from typing import Dict, Type
+
+from pydantic import BaseModel
+
+from .base import OntologyObject
+from .objects import Customer, Delivery, Event, Order, Payment, Product
+
+MODEL_REGISTRY: Dict[str, Type[BaseModel]] = {
+    "OntologyObject": OntologyObject,
+    "Customer": Customer,
+    "Order": Order,
+    "Product": Product,
+    "Payment": Payment,
+    "Delivery": Delivery,
+    "Event": Event,
+}
+
+
+def register_model(cls: Type[BaseModel], name: str = None) -> Type[BaseModel]:
+    """Register a model class so stored objects can be hydrated as it.
+
+    Usable as a class decorator.
+    """
+    MODEL_REGISTRY[name or cls.__name__] = cls
+    return cls
+
+
+def resolve_model(name: str) -> Type[BaseModel]:
+    """Return the class registered under ``name`` (generic object if unknown)."""
+    return MODEL_REGISTRY.get(name, OntologyObject)
+
+
+def model_name(obj: BaseModel) -> str:
+    """Name under which an instance's class is stored."""
+    return type(obj).__name__
+
+
+def object_type(obj: BaseModel) -> str:
+    """Ontology type of an instance.
+
+    Generic objects carry their type in the ``type`` field. Business models
+    that are not ``OntologyObject`` subclasses (``Payment``, ``Delivery``,
+    ``Event``) are typed by class name, since ``Event.type`` is the event kind.
+    """
+    if isinstance(obj, OntologyObject):
+        return obj.type
+    return model_name(obj)
@@ -1,47 +1,460 @@
-"""Ontology graph repository using NetworkX."""
+"""Ontology graph repository with pluggable graph storage."""
+
+import atexit
+import gc
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Type, TypeVar)
+from uuid import UUID, uuid4
 
-from typing import Any, Dict, List, Optional, Type, TypeVar
-from uuid import UUID
-
-import chromadb
-import networkx as nx
-from chromadb.utils import embedding_functions
 from pydantic import BaseModel
 
+from palantir.utils.chroma_writer import ChromaBatchWriter
 from palantir.ontology.objects import Delivery, Event, Payment
 
+from .arrow_io import read_snapshot, write_snapshot
 from .base import OntologyLink, OntologyObject
-
-T = TypeVar("T", bound=OntologyObject)
-
-CHROMA_DATA_PATH = "chroma_data/"
-embed_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2"
-)
-client = chromadb.PersistentClient(path=CHROMA_DATA_PATH)
-collection = client.create_collection(name="ontology", embedding_function=embed_fn)
+from .changes import ChangeFeed, RedisStreamBridge, describe
+from .embedding_refresh import EmbeddingRefreshWorker, EmbeddingTracker
+from .events import EventIndex
+from .graph_store import create_store
+from .indexes import (DEFAULT_INDEXED_PROPERTIES, OntologyIndexes, QueryPlan,
+                      property_value, values_equal)
+from .persistence import WriteAheadLog
+from .query import QueryExecutor, QueryPage
+from .recommend import CoPurchaseIndex
+from .similar import TagIndex
+from .registry import model_name, object_type, resolve_model
+from .traversal import TraversalQuery, traverse
+from .vector_search import SimilarityQuery, SimilarityResult, similar_search
+from .vector_index import get_vector_index
+from .validation import RowError, frame_rows, trusted_loader, validate_many
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+    from .analytics import GraphAnalytics, GraphMetrics
+
+T = TypeVar("T", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+# Chroma 클라이언트/임베딩 모델은 첫 사용 시 생성 (vector_index 참고)
+_LAZY_ATTRS = {
+    "client": "client",
+    "collection": "collection",
+    "embed_fn": "embedding_function",
+}
+
+
+def __getattr__(name: str) -> Any:
+    # 하위 호환: repository.collection 등은 지연 생성된 객체를 반환
+    if name in _LAZY_ATTRS:
+        return getattr(get_vector_index(), _LAZY_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic GC while building many long-lived objects at once."""
+    # 대량 적재 중 세대별 GC가 커지는 힙을 반복해서 훑는 비용을 피함
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk insert: stored ids and per-row errors."""
+
+    inserted: List[Any] = field(default_factory=list)
+    errors: List[RowError] = field(default_factory=list)
 
 
 class OntologyRepository:
     """Repository for managing ontology objects and their relationships."""
 
-    def __init__(self):
-        """Initialize an empty ontology graph."""
-        self.graph = nx.MultiDiGraph()
+    def __init__(
+        self,
+        indexed_properties=DEFAULT_INDEXED_PROPERTIES,
+        cache_size: int = 1024,
+        backend: str = "networkx",
+    ):
+        """Initialize an empty ontology graph.
+
+        Args:
+            indexed_properties: Properties that get hash and sorted indexes.
+            cache_size: Number of hydrated model instances kept by ``get_object``.
+            backend: Graph storage, ``"networkx"`` or the array-backed
+                ``"compact"`` store for large ontologies.
+        """
+        self.backend = backend
+        self.store = create_store(backend)
+        self._export: Optional["nx.MultiDiGraph"] = None
+        self._export_seq = -1
+        self.indexes = OntologyIndexes(indexed_properties)
+        self.copurchase = self.indexes.attach(CoPurchaseIndex())
+        self.tags = self.indexes.attach(TagIndex())
+        self.events = self.indexes.attach(EventIndex())
+        self._embeddings: Optional[EmbeddingTracker] = None
+        self.embedding_worker: Optional[EmbeddingRefreshWorker] = None
+        self._analytics: Optional["GraphAnalytics"] = None
+        self.changes = ChangeFeed()
+        self.change_stream: Optional[RedisStreamBridge] = None
+        self.cache_size = cache_size
+        self._hydrated: "OrderedDict[Any, BaseModel]" = OrderedDict()
+        self._hydrated_lock = threading.Lock()
+        self._evictions = 0  # 캐시 무효화 횟수 (읽는 동안 바뀌었는지 확인용)
+        self.seq = 0
+        # seq가 의미를 갖는 범위: 메모리 저장소는 실행마다, 영속 저장소는 디렉터리마다 새 값
+        self.epoch = uuid4().hex
+        self.wal: Optional[WriteAheadLog] = None
+        self.snapshot_every = 0
+        self._since_snapshot = 0
+        self._lock = threading.RLock()
+
+    @property
+    def analytics(self) -> "GraphAnalytics":
+        """Sparse graph metrics cache (scipy is imported on first use)."""
+        if self._analytics is None:
+            from .analytics import GraphAnalytics
+
+            with self._lock:
+                if self._analytics is None:
+                    self._analytics = GraphAnalytics(self)
+        return self._analytics
+
+    @property
+    def embeddings(self) -> EmbeddingTracker:
+        """Dirty set for embedding refreshes, tracked from first use on.
+
+        Objects already stored are marked dirty when tracking starts; the
+        refresh skips those whose stored vector is current.
+        """
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    tracker = EmbeddingTracker(self._node_data)
+                    for node_id, attrs in self.store.nodes():
+                        if "data" in attrs:
+                            tracker.add(node_id, attrs["data"], attrs["type"])
+                    self._embeddings = self.indexes.attach(tracker)
+        return self._embeddings
+
+    def _node_data(self, node_id: Any) -> Optional[Dict[str, Any]]:
+        node = self.store.get_node(node_id)
+        return None if node is None else node.get("data")
+
+    @property
+    def graph(self) -> "nx.MultiDiGraph":
+        """NetworkX view of the ontology.
+
+        With the compact backend this is an exported copy, rebuilt only when
+        the repository has changed since the last export.
+        """
+        with self._lock:
+            if self.backend == "networkx":
+                return self.store.to_networkx()
+            if self._export is None or self._export_seq != self.seq:
+                self._export = self.store.to_networkx()
+                self._export_seq = self.seq
+            return self._export
+
+    @classmethod
+    def open(
+        cls,
+        directory: str,
+        sync: str = "group",
+        snapshot_every: int = 100_000,
+        **kwargs: Any,
+    ) -> "OntologyRepository":
+        """Open a durable repository backed by a write-ahead log.
+
+        Loads the newest snapshot, replays the log tail after it and keeps
+        logging every mutation to ``directory``.
+
+        Args:
+            directory: Directory for log segments and snapshots.
+            sync: Log sync mode, see ``WriteAheadLog``.
+            snapshot_every: Take a snapshot after this many mutations
+                (0 disables automatic snapshots).
+            **kwargs: Passed to the constructor.
+        """
+        repo = cls(**kwargs)
+        wal = WriteAheadLog(directory, sync=sync)
+        with _gc_paused():
+            snapshot = wal.load_snapshot()
+            if snapshot is not None:
+                repo._restore(snapshot)
+        for seq, op, payload in wal.replay(after_seq=repo.seq):
+            try:
+                repo._check(op, payload)
+                repo._mutate(op, payload)
+            except (KeyError, ValueError) as exc:
+                # 잘못 기록된 레코드 하나 때문에 저장소 전체를 못 여는 일이 없도록 건너뜀
+                logger.warning("Skipping log record %d (%s): %s", seq, op, exc)
+            repo.seq = seq
+        wal.open(repo.seq + 1)
+        repo.changes.reset(repo.seq)
+        repo.wal = wal
+        repo.epoch = wal.identity()
+        repo.snapshot_every = snapshot_every
+        return repo
+
+    def snapshot(self) -> None:
+        """Write a snapshot so the next startup replays only newer records."""
+        if self.wal is None:
+            raise ValueError("Repository is not persistent")
+        with self._lock:
+            self.wal.write_snapshot(self.seq, self._export_state())
+            self._since_snapshot = 0
+
+    def export_arrow(
+        self,
+        directory: str,
+        node_ids: Optional[Iterable[Any]] = None,
+        types: Optional[Iterable[str]] = None,
+        compression: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Export objects and links as Arrow IPC files, one table per type.
 
-    def add_object(self, obj: OntologyObject) -> None:
+        Args:
+            directory: Output directory.
+            node_ids: Only export these objects (and the links between them).
+            types: Only export objects of these types.
+            compression: Optional ``"lz4"`` or ``"zstd"`` file compression.
+
+        Returns:
+            The snapshot manifest; see ``palantir.ontology.arrow_io``.
+        """
+        return write_snapshot(self, directory, node_ids, types, compression)
+
+    def import_arrow(self, directory: str) -> None:
+        """Replace the repository contents with an ``export_arrow`` snapshot.
+
+        The store and all indexes are rebuilt in one pass instead of going
+        through per-object mutations. A durable repository takes a snapshot
+        right away; change feed consumers see a gap and resynchronise.
+        """
+        with _gc_paused():
+            state = read_snapshot(directory)
+            with self._lock:
+                state["seq"] = self.seq + 1
+                self._restore(state)
+                self.changes.reset(self.seq)
+                if self.wal is not None:
+                    self.snapshot()
+
+    def close(self) -> None:
+        """Flush the write-ahead log."""
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
+
+    def _export_state(self) -> Dict[str, Any]:
+        return {
+            "nodes": list(self.store.nodes()),
+            "edges": list(self.store.edges()),
+        }
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self.store = create_store(self.backend)
+        for node_id, attrs in state["nodes"]:
+            self.store.add_node(node_id, attrs)
+        # 인덱스는 객체별 삽입 대신 한 번에 정렬해 구축
+        self.indexes.load(
+            (node_id, attrs["data"], attrs["type"])
+            for node_id, attrs in state["nodes"]
+            if "data" in attrs
+        )
+        for source, target, key, attrs in state["edges"]:
+            self.store.add_edge(source, target, key, attrs)
+        self._evict()
+        self.seq = state["seq"]
+
+    def _apply(self, op: str, payload: Dict[str, Any]) -> None:
+        """Log a mutation, apply it to the in-memory graph and publish it."""
+        with self._lock:
+            # 실패할 변경이 로그에 남지 않도록 기록 전에 검사
+            self._check(op, payload)
+            seq = self.seq + 1
+            if self.wal is not None:
+                self.wal.append(seq, op, payload)
+            change = describe(seq, op, payload, self.store)
+            self._mutate(op, payload)
+            self.seq = seq
+            self.changes.publish(change)
+            if self.wal is not None and self.snapshot_every:
+                self._since_snapshot += 1
+                if self._since_snapshot >= self.snapshot_every:
+                    self.snapshot()
+
+    def _put_node(self, node_id: Any, attrs: Dict[str, Any]) -> None:
+        old = self.store.get_node(node_id)
+        if old is not None and "data" in old:
+            self.indexes.remove(node_id, old["data"], old["type"])
+        self._evict(node_id)
+        self.store.add_node(node_id, attrs)
+        self.indexes.add(node_id, attrs["data"], attrs["type"])
+
+    def _evict(self, node_id: Any = None) -> None:
+        """Drop one object (or, without an id, all) from the hydrated cache."""
+        with self._hydrated_lock:
+            if node_id is None:
+                self._hydrated.clear()
+            else:
+                self._hydrated.pop(node_id, None)
+            self._evictions += 1
+
+    def _check(self, op: str, payload: Dict[str, Any]) -> None:
+        """Raise if a mutation refers to objects that do not exist."""
+        if op in ("update_node", "remove_node"):
+            if not self.store.has_node(payload["id"]):
+                raise ValueError(f"Object with ID {payload['id']} not found")
+        elif op in ("add_edge", "add_edges"):
+            if op == "add_edge":
+                items = [(payload["source"], payload["target"])]
+            else:
+                items = [(item[0], item[1]) for item in payload["items"]]
+            missing = {
+                str(node_id)
+                for pair in items
+                for node_id in pair
+                if not self.store.has_node(node_id)
+            }
+            if missing:
+                raise ValueError(f"Unknown object(s): {', '.join(sorted(missing))}")
+        elif op not in ("add_node", "add_nodes"):
+            raise ValueError(f"Unknown mutation: {op}")
+
+    def _mutate(self, op: str, payload: Dict[str, Any]) -> None:
+        if op == "add_node":
+            self._put_node(payload["id"], payload["attrs"])
+        elif op == "add_nodes":
+            for node_id, attrs in payload["items"]:
+                self._put_node(node_id, attrs)
+        elif op == "update_node":
+            node_id, attrs = payload["id"], payload["attrs"]
+            node = self.store.get_node(node_id)
+            self.indexes.update(
+                node_id, node["data"], attrs["data"], node["type"], attrs["type"]
+            )
+            self._evict(node_id)
+            self.store.update_node(node_id, attrs)
+        elif op == "remove_node":
+            node_id = payload["id"]
+            node = self.store.get_node(node_id)
+            if "data" in node:
+                self.indexes.remove(node_id, node["data"], node["type"])
+            self._evict(node_id)
+            self.store.remove_node(node_id)
+        elif op == "add_edge":
+            self.store.add_edge(
+                payload["source"],
+                payload["target"],
+                payload["key"],
+                payload["attrs"],
+            )
+        elif op == "add_edges":
+            for source, target, key, attrs in payload["items"]:
+                self.store.add_edge(source, target, key, attrs)
+        else:
+            raise ValueError(f"Unknown mutation: {op}")
+
+    @staticmethod
+    def _node_attrs(obj: BaseModel) -> Dict[str, Any]:
+        return {
+            "type": object_type(obj),
+            "model": model_name(obj),
+            "data": obj.dict(),
+            "created_at": getattr(obj, "created_at", None),
+            "updated_at": getattr(obj, "updated_at", None),
+        }
+
+    @staticmethod
+    def _edge_attrs(link: OntologyLink) -> Dict[str, Any]:
+        return {
+            "type": link.relationship_type,
+            "data": link.dict(),
+            "created_at": link.created_at,
+        }
+
+    def add_object(self, obj: BaseModel) -> None:
         """Add an object to the ontology graph.
 
         Args:
             obj: The ontology object to add.
         """
-        self.graph.add_node(
-            obj.id,
-            type=obj.type,
-            data=obj.dict(),
-            created_at=obj.created_at,
-            updated_at=obj.updated_at,
-        )
+        self._apply("add_node", {"id": obj.id, "attrs": self._node_attrs(obj)})
+
+    def add_objects(
+        self,
+        objects: Iterable[Any],
+        model_cls: Type[BaseModel] = OntologyObject,
+        validate: bool = True,
+    ) -> BulkResult:
+        """Add many objects as one logged mutation.
+
+        Invalid rows are reported in the result and skipped; the rest of the
+        batch is still stored.
+
+        Args:
+            objects: Model instances, dicts, or a Polars/pandas frame or Arrow
+                table of rows.
+            model_cls: Model that dict rows are validated as.
+            validate: Set to False for rows that were validated upstream.
+
+        Returns:
+            The inserted ids and ``{"index", "error"}`` entries for failed rows.
+        """
+        valid, errors = validate_many(frame_rows(objects), model_cls, validate)
+        items = [(obj.id, self._node_attrs(obj)) for _, obj in valid]
+        if items:
+            self._apply("add_nodes", {"items": items})
+        return BulkResult([node_id for node_id, _ in items], errors)
+
+    def add_event(self, event: Event) -> None:
+        """Add an event; it is indexed by related object, kind and time."""
+        self.add_object(event)
+
+    def add_events(self, events: Iterable[Any], validate: bool = True) -> BulkResult:
+        """Add many events (``Event`` models, dicts or a frame) in one batch."""
+        return self.add_objects(events, Event, validate)
+
+    def event_timeline(
+        self,
+        related_id: Any = None,
+        event_type: Optional[str] = None,
+        start: Any = None,
+        end: Any = None,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Stored events in time order from the event index.
+
+        Args:
+            related_id: Only events of this object.
+            event_type: Only events of this kind.
+            start: Earliest timestamp (inclusive).
+            end: Latest timestamp (inclusive).
+            limit: Maximum number of events.
+            reverse: Newest first (``limit=N, reverse=True`` is "last N").
+        """
+        return [
+            self.store.get_node(node_id)["data"]
+            for node_id in self.events.scan(
+                related_id, event_type, start, end, limit, reverse
+            )
+        ]
 
     def add_link(self, link: OntologyLink) -> None:
         """Add a relationship between two objects.
@@ -49,30 +462,110 @@ class OntologyRepository:
         Args:
             link: The relationship to add.
         """
-        self.graph.add_edge(
-            link.source_id,
-            link.target_id,
-            key=link.id,
-            type=link.relationship_type,
-            data=link.dict(),
-            created_at=link.created_at,
+        attrs = self._edge_attrs(link)
+        self._apply(
+            "add_edge",
+            {
+                "source": link.source_id,
+                "target": link.target_id,
+                "key": link.id,
+                "attrs": attrs,
+            },
         )
 
-    def get_object(self, obj_id: UUID, model_cls: Type[T]) -> Optional[T]:
+    def add_links(
+        self, links: Iterable[Any], validate: bool = True
+    ) -> BulkResult:
+        """Add many relationships as one logged mutation.
+
+        Links whose source or target object does not exist are reported as
+        row errors instead of being stored.
+
+        Args:
+            links: ``OntologyLink`` instances, dicts, or a frame of rows.
+            validate: Set to False for rows that were validated upstream.
+
+        Returns:
+            The inserted link ids and per-row errors.
+        """
+        valid, errors = validate_many(frame_rows(links), OntologyLink, validate)
+        items = []
+        for i, link in valid:
+            missing = [
+                str(node_id)
+                for node_id in (link.source_id, link.target_id)
+                if not self.store.has_node(node_id)
+            ]
+            if missing:
+                errors.append(
+                    {"index": i, "error": f"Unknown object(s): {', '.join(missing)}"}
+                )
+                continue
+            items.append(
+                (link.source_id, link.target_id, link.id, self._edge_attrs(link))
+            )
+        if items:
+            self._apply("add_edges", {"items": items})
+        errors.sort(key=lambda e: e["index"])
+        return BulkResult([item[2] for item in items], errors)
+
+    def get_object(
+        self, obj_id: UUID, model_cls: Optional[Type[T]] = None
+    ) -> Optional[T]:
         """Get an object by its ID.
 
+        Without ``model_cls`` the object is built as the concrete class it was
+        stored with. Stored data was validated on write, so it is rebuilt
+        without validating again. Instances of that class are served from a
+        bounded LRU cache, so they are shared between callers and must not be
+        mutated in place; pass a modified copy to ``update_object`` instead.
+
         Args:
             obj_id: The ID of the object to retrieve.
-            model_cls: The Pydantic model class to deserialize to.
+            model_cls: Optional Pydantic model class to deserialize to.
 
         Returns:
             The object if found, None otherwise.
         """
-        if not self.graph.has_node(obj_id):
+        node = self.store.get_node(obj_id)
+        if node is None:
             return None
 
-        node_data = self.graph.nodes[obj_id]["data"]
-        return model_cls(**node_data)
+        stored_cls = resolve_model(node.get("model", node["type"]))
+        if model_cls is not None and model_cls is not stored_cls:
+            return model_cls.model_validate(node["data"])
+
+        with self._hydrated_lock:
+            cached = self._hydrated.get(obj_id)
+            if cached is not None:
+                self._hydrated.move_to_end(obj_id)
+                return cached
+            evictions = self._evictions
+        obj = trusted_loader(stored_cls)(node["data"])
+        if self.cache_size > 0:
+            with self._hydrated_lock:
+                # 만드는 사이에 쓰기가 있었다면 오래된 객체일 수 있으므로 캐시하지 않음
+                if self._evictions == evictions:
+                    self._hydrated[obj_id] = obj
+                    if len(self._hydrated) > self.cache_size:
+                        self._hydrated.popitem(last=False)
+        return obj
+
+    def get_object_type(self, obj_id: UUID) -> Optional[str]:
+        """Return an object's ontology type without building a model."""
+        node = self.store.get_node(obj_id)
+        return None if node is None else node["type"]
+
+    def get_model_class(self, obj_id: UUID) -> Optional[Type[BaseModel]]:
+        """Return the model class an object was stored with."""
+        node = self.store.get_node(obj_id)
+        if node is None:
+            return None
+        return resolve_model(node.get("model", node["type"]))
+
+    def has_object(self, obj_id: UUID) -> bool:
+        """Check whether an object exists."""
+        return self.store.has_node(obj_id)
 
     def get_linked_objects(
         self,
@@ -91,37 +584,33 @@ class OntologyRepository:
             List of linked objects with their relationship data.
         """
         if direction == "out":
-            edges = self.graph.out_edges(obj_id, data=True, keys=True)
-            get_other_node = lambda e: e[1]  # target node
+            edges = self.store.out_edges(obj_id)  # (target, key, data)
         else:
-            edges = self.graph.in_edges(obj_id, data=True, keys=True)
-            get_other_node = lambda e: e[0]  # source node
+            edges = self.store.in_edges(obj_id)  # (source, key, data)
 
         results = []
-        for edge in edges:
-            edge_data = edge[3]  # edge data dictionary
+        for other_node, _, edge_data in edges:
             if relationship_type and edge_data["type"] != relationship_type:
                 continue
 
-            other_node = get_other_node(edge)
-            node_data = self.graph.nodes[other_node]["data"]
+            node_data = self.store.get_node(other_node)["data"]
 
             results.append({"object": node_data, "relationship": edge_data})
 
         return results
 
-    def update_object(self, obj: OntologyObject) -> None:
+    def update_object(self, obj: BaseModel) -> None:
         """Update an existing object.
 
         Args:
             obj: The object with updated data.
         """
-        if not self.graph.has_node(obj.id):
+        if not self.store.has_node(obj.id):
             raise ValueError(f"Object with ID {obj.id} not found")
 
-        self.graph.nodes[obj.id].update(
-            {"data": obj.dict(), "updated_at": obj.updated_at}
-        )
+        attrs = self._node_attrs(obj)
+        del attrs["created_at"]
+        self._apply("update_node", {"id": obj.id, "attrs": attrs})
 
     def delete_object(self, obj_id: UUID) -> None:
         """Delete an object and all its relationships.
@@ -129,10 +618,10 @@ class OntologyRepository:
         Args:
             obj_id: The ID of the object to delete.
         """
-        if not self.graph.has_node(obj_id):
+        if not self.store.has_node(obj_id):
             raise ValueError(f"Object with ID {obj_id} not found")
 
-        self.graph.remove_node(obj_id)
+        self._apply("remove_node", {"id": obj_id})
 
     def search_objects(
         self,
@@ -148,41 +637,266 @@ class OntologyRepository:
         Returns:
             List of matching objects.
         """
-        results = []
+        return [node["data"] for _, node in self.iter_matching(obj_type, properties)]
 
-        for node_id in self.graph.nodes():
-            node_data = self.graph.nodes[node_id]["data"]
+    def find_objects(
+        self,
+        obj_type: Optional[str] = None,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> List[BaseModel]:
+        """Like ``search_objects`` but returns models (trusted fast path)."""
+        return [
+            self.get_object(node_id)
+            for node_id, _ in self.iter_matching(obj_type, properties)
+        ]
+
+    def iter_matching(
+        self,
+        obj_type: Optional[str] = None,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """Lazily yield ``(id, node)`` pairs matching a search.
+
+        Args:
+            obj_type: Optional filter for object type.
+            properties: Optional dictionary of property values to match.
+        """
+        plan = self.plan_search(obj_type, properties)
+        node_ids = (
+            self.store.node_ids() if plan.candidates is None else list(plan.candidates)
+        )
+        check_type = obj_type and plan.index != "type"
+
+        for node_id in node_ids:
+            node = self.store.get_node(node_id)
+            node_data = node["data"]
+
+            if check_type and node["type"] != obj_type:
+                continue
 
-            if obj_type and node_data["type"] != obj_type:
+            if plan.residual and not all(
+                values_equal(property_value(node_data, key), value)
+                for key, value in plan.residual.items()
+            ):
                 continue
 
-            if properties:
-                match = True
-                for key, value in properties.items():
-                    if key not in node_data or node_data[key] != value:
-                        match = False
-                        break
-                if not match:
-                    continue
+            yield node_id, node
 
-            results.append(node_data)
+    def query(self, query: Any = None, **kwargs: Any) -> QueryPage:
+        """Run an ``OntologyQuery``-style query with operators and paging.
 
+        Args:
+            query: Object with ``type``, ``properties``, ``relations``,
+                ``limit`` and ``offset`` attributes (e.g. ``OntologyQuery``)
+                or a dict with the same keys.
+            **kwargs: ``QueryExecutor.execute`` arguments; they override the
+                fields of ``query``.
+
+        Returns:
+            One page of matching objects and the cursor for the next page.
+        """
+        params: Dict[str, Any] = {}
+        if query is not None:
+            fields = query if isinstance(query, dict) else vars(query)
+            params = {
+                "obj_type": fields.get("type"),
+                "properties": fields.get("properties"),
+                "relations": fields.get("relations"),
+                "limit": fields.get("limit", 10),
+                "offset": fields.get("offset", 0),
+            }
+        params.update(kwargs)
+        return QueryExecutor(self).execute(**params)
+
+    def recommend_products(self, customer_id: Any, k: int = 5) -> List[Dict[str, Any]]:
+        """Products most co-purchased with the customer's past orders.
+
+        Args:
+            customer_id: Customer id (UUID or its string form).
+            k: Number of recommendations.
+
+        Returns:
+            Stored product dicts, best first; products that are not in the
+            repository (only referenced by order items) are skipped.
+        """
+        results = []
+        for product_id, _ in self.copurchase.recommend(customer_id, k):
+            node = self.store.get_node(product_id)
+            if node is None and isinstance(product_id, str):
+                try:
+                    node = self.store.get_node(UUID(product_id))
+                except ValueError:
+                    node = None
+            if node is not None:
+                results.append(node["data"])
         return results
 
+    def similar_products(
+        self, product_id: Any, k: int = 5, tfidf: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Products sharing the category or tags of a product, best first.
+
+        Args:
+            product_id: Product id (UUID or its string form).
+            k: Number of results.
+            tfidf: Weight shared tags by rarity instead of counting them.
+        """
+        return [
+            self.store.get_node(node_id)["data"]
+            for node_id, _ in self.tags.similar(product_id, k, tfidf)
+        ]
+
+    def graph_metrics(self) -> "GraphMetrics":
+        """PageRank, degree, betweenness and components of the graph.
+
+        Computed on sparse matrices and cached until the next mutation.
+        """
+        return self.analytics.metrics()
+
+    def refresh_embeddings(self, limit: Optional[int] = None, **kwargs: Any) -> Dict[str, int]:
+        """Re-embed objects whose text changed since they were last embedded.
+
+        Args:
+            limit: Refresh at most this many dirty objects.
+            **kwargs: Passed to a one-off ``EmbeddingRefreshWorker``. Without
+                them the background worker, if started, runs the refresh.
+                Its embedder and collection are reused unless overridden.
+
+        Returns:
+            Counts of embedded, deleted and skipped objects.
+        """
+        background = self.embedding_worker
+        if background is not None and not kwargs:
+            return background.run_once(limit)
+        if background is not None:
+            if "embed" not in kwargs:
+                kwargs["embed"] = background.embed
+            if "collection" not in kwargs:
+                kwargs["collection"] = background.collection
+        return EmbeddingRefreshWorker(self.embeddings, **kwargs).run_once(limit)
+
+    def start_embedding_refresh(self, **kwargs: Any) -> EmbeddingRefreshWorker:
+        """Refresh embeddings in the background; see ``EmbeddingRefreshWorker``."""
+        if self.embedding_worker is None:
+            self.embedding_worker = EmbeddingRefreshWorker(self.embeddings, **kwargs)
+            atexit.register(self.embedding_worker.stop)
+        self.embedding_worker.start()
+        return self.embedding_worker
+
+    def similar_objects(self, query: SimilarityQuery, **kwargs: Any) -> SimilarityResult:
+        """Top-k similar objects among those passing graph/property filters.
+
+        See ``palantir.ontology.vector_search``; keyword arguments are passed
+        to ``similar_search``.
+        """
+        return similar_search(self, query, **kwargs)
+
+    def traverse(self, query: TraversalQuery) -> Iterator[Dict[str, Any]]:
+        """Run a multi-hop traversal; see ``palantir.ontology.traversal``."""
+        return traverse(self, query)
+
+    def plan_search(
+        self,
+        obj_type: Optional[str] = None,
+        properties: Optional[Dict[str, Any]] = None,
+    ) -> QueryPlan:
+        """Choose the index that drives a ``search_objects`` call.
+
+        Args:
+            obj_type: Optional filter for object type.
+            properties: Optional dictionary of property values to match.
+
+        Returns:
+            The chosen access path and the filters left to check per row.
+        """
+        return self.indexes.plan(obj_type or None, properties)
+
+
+_shared_repo: Optional[OntologyRepository] = None
+_shared_lock = threading.Lock()
+
+
+def get_repository() -> OntologyRepository:
+    """Return the process-wide repository shared by all routers and UI pages.
+
+    The repository is durable when ``ONTOLOGY_DATA_DIR`` is set; its log
+    sync mode comes from ``ONTOLOGY_WAL_SYNC`` (default ``group``). The graph
+    backend comes from ``ONTOLOGY_BACKEND`` (default ``networkx``). When
+    ``ONTOLOGY_CHANGE_STREAM`` holds a Redis URL, the change feed is mirrored
+    to the ``ontology:changes`` stream for other processes. When
+    ``ONTOLOGY_EMBEDDING_INTERVAL`` is set (seconds), changed objects are
+    re-embedded in the background on that schedule, or earlier once
+    ``ONTOLOGY_EMBEDDING_THRESHOLD`` objects (default 1000) are pending.
+    """
+    global _shared_repo
+    if _shared_repo is None:
+        with _shared_lock:
+            if _shared_repo is None:
+                data_dir = os.getenv("ONTOLOGY_DATA_DIR")
+                backend = os.getenv("ONTOLOGY_BACKEND", "networkx")
+                if data_dir:
+                    repo = OntologyRepository.open(
+                        data_dir,
+                        sync=os.getenv("ONTOLOGY_WAL_SYNC", "group"),
+                        backend=backend,
+                    )
+                    atexit.register(repo.close)
+                else:
+                    repo = OntologyRepository(backend=backend)
+                stream_url = os.getenv("ONTOLOGY_CHANGE_STREAM")
+                if stream_url:
+                    repo.change_stream = RedisStreamBridge(repo.changes, url=stream_url)
+                    atexit.register(repo.change_stream.close)
+                interval = os.getenv("ONTOLOGY_EMBEDDING_INTERVAL")
+                if interval:
+                    repo.start_embedding_refresh(
+                        interval=float(interval),
+                        threshold=int(os.getenv("ONTOLOGY_EMBEDDING_THRESHOLD", "1000")),
+                    )
+                _shared_repo = repo
+    return _shared_repo
+
 
 # 온톨로지 노드 임베딩 및 저장
+def _node_record(node) -> Dict[str, Any]:
+    if isinstance(node, dict):
+        node_id = node.get("id")
+        doc = node.get("description") or str(node)
+        node_type = node.get("type", "dict")
+    else:
+        node_id = getattr(node, "id", None)
+        doc = getattr(node, "description", None) or str(node)
+        node_type = type(node).__name__
+    return {
+        "id": node_id,
+        "document": doc,
+        "metadata": {"name": node_id, "type": node_type},
+    }
+
+
+def embedding_nodes(nodes, batch_size: Optional[int] = None) -> int:
+    """Embed and upsert many nodes with batched collection writes.
+
+    Args:
+        nodes: Ontology objects or plain dicts with an ``id``.
+        batch_size: Records per upsert call.
+
+    Returns:
+        Number of nodes written.
+    """
+    with ChromaBatchWriter(get_vector_index().collection, batch_size) as writer:
+        for node in nodes:
+            writer.add(**_node_record(node))
+    return writer.written
+
+
 def embedding_node(node):
-    doc = node.description if hasattr(node, "description") else str(node)
-    collection.add(
-        documents=[doc],
-        metadatas=[{"name": getattr(node, "id", None), "type": type(node).__name__}],
-        ids=[getattr(node, "id", None)],
-    )
+    embedding_nodes([node])
 
 
 # 유사 노드 검색
 def query_similar_nodes(query_text, n_results=5):
-    results = collection.query(query_texts=[query_text], n_results=n_results)
+    results = get_vector_index().query([query_text], n_results=n_results)
     return results
 
 
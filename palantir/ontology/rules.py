@@ -0,0 +1,240 @@
+"""Order/Payment/Delivery link rules, shared by objects and DataFrames.
+
+Each rule is declared once as data (``LinkRule``) and evaluated either on
+single objects (``check_link``, used by ``Order.link_payment`` and friends)
+or as Polars expressions over joined frames (``validate_links``), so the
+per-object methods and the bulk reconciliation cannot drift apart.
+
+Conventions shared by both paths: ids are compared as strings (``UUID`` and
+``str`` ids match), amounts are compared as floats within ``AMOUNT_TOLERANCE``
+(``Decimal`` and ``float`` amounts match), and a rule whose inputs are
+missing is not evaluated; the ``*_MISSING`` rules report absent objects.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+AMOUNT_TOLERANCE = 1e-6
+
+
+@dataclass(frozen=True)
+class Ref:
+    """A field of one side of a link, e.g. ``Ref("order", "status")``."""
+
+    side: str
+    field: str
+
+    @property
+    def column(self) -> str:
+        return f"{self.side}_{self.field}"
+
+
+@dataclass(frozen=True)
+class LinkRule:
+    """A condition a valid link must satisfy; ``code`` names the violation."""
+
+    code: str
+    left: Ref
+    op: str  # present | same_id | same_amount | in | not_in
+    right: Any = None
+    message: str = ""
+    context: Tuple[str, ...] = ()  # 규칙이 적용되려면 함께 있어야 하는 객체
+
+    @property
+    def sides(self) -> Tuple[str, ...]:
+        sides = [self.left.side, *self.context]
+        if isinstance(self.right, Ref):
+            sides.append(self.right.side)
+        return tuple(dict.fromkeys(sides))
+
+    def check(self, objects: Dict[str, Any]) -> Optional[bool]:
+        """Evaluate on objects; ``None`` when an input is missing."""
+        if self.op == "present":
+            return objects.get(self.left.side) is not None
+        if any(objects.get(side) is None for side in self.sides):
+            return None
+        left = _get(objects, self.left)
+        right = _get(objects, self.right) if isinstance(self.right, Ref) else self.right
+        if left is None or right is None:
+            return None
+        if self.op == "same_id":
+            return str(left) == str(right)
+        if self.op == "same_amount":
+            return abs(float(left) - float(right)) <= AMOUNT_TOLERANCE
+        if self.op == "in":
+            return left in right
+        if self.op == "not_in":
+            return left not in right
+        raise ValueError(f"Unknown rule operator: {self.op}")
+
+    def violated(self):
+        """Polars expression that is true where the rule is violated."""
+        import polars as pl
+
+        left = pl.col(self.left.column)
+        if self.op == "present":
+            return left.is_null()
+        if isinstance(self.right, Ref):
+            right = pl.col(self.right.column)
+        else:
+            right = pl.lit(self.right)
+        if self.op == "same_id":
+            ok = left.cast(pl.Utf8) == right.cast(pl.Utf8)
+        elif self.op == "same_amount":
+            ok = (left.cast(pl.Float64) - right.cast(pl.Float64)).abs() <= AMOUNT_TOLERANCE
+        elif self.op == "in":
+            ok = left.is_in(list(self.right))
+        elif self.op == "not_in":
+            ok = ~left.is_in(list(self.right))
+        else:
+            raise ValueError(f"Unknown rule operator: {self.op}")
+        for side in self.sides:
+            ok = ok | pl.col(f"{side}_id").is_null()
+        return ok.not_().fill_null(False)
+
+
+def _get(objects: Dict[str, Any], ref: Ref) -> Any:
+    obj = objects.get(ref.side)
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(ref.field)
+    return getattr(obj, ref.field, None)
+
+
+ORDER_MISSING = LinkRule("ORDER_MISSING", Ref("order", "id"), "present",
+                         message="결제/배송에 해당하는 주문이 없음")
+PAYMENT_MISSING = LinkRule("PAYMENT_MISSING", Ref("payment", "id"), "present",
+                           message="주문에 결제가 없음")
+PAYMENT_ORDER_MISMATCH = LinkRule(
+    "PAYMENT_ORDER_MISMATCH", Ref("payment", "order_id"), "same_id", Ref("order", "id"),
+    message="결제의 order_id가 주문과 다름",
+)
+PAYMENT_AMOUNT_MISMATCH = LinkRule(
+    "PAYMENT_AMOUNT_MISMATCH", Ref("payment", "amount"), "same_amount",
+    Ref("order", "total_amount"), message="결제 금액이 주문 총액과 다름",
+)
+ORDER_CANCELLED = LinkRule("ORDER_CANCELLED", Ref("order", "status"), "not_in",
+                           ("cancelled",), message="취소된 주문의 결제",
+                           context=("payment",))
+DELIVERY_MISSING = LinkRule("DELIVERY_MISSING", Ref("delivery", "id"), "present",
+                            message="주문에 배송이 없음")
+DELIVERY_ORDER_MISMATCH = LinkRule(
+    "DELIVERY_ORDER_MISMATCH", Ref("delivery", "order_id"), "same_id", Ref("order", "id"),
+    message="배송의 order_id가 주문과 다름",
+)
+ORDER_NOT_SHIPPED = LinkRule("ORDER_NOT_SHIPPED", Ref("order", "status"), "in",
+                             ("shipped", "delivered"), message="출고되지 않은 주문의 배송",
+                             context=("delivery",))
+
+# 관계별 규칙 집합 (객체 메서드와 DataFrame 검증이 같은 정의를 사용)
+ORDER_PAYMENT_RULES: Tuple[LinkRule, ...] = (
+    ORDER_MISSING, PAYMENT_MISSING, PAYMENT_ORDER_MISMATCH,
+    PAYMENT_AMOUNT_MISMATCH, ORDER_CANCELLED,
+)
+ORDER_DELIVERY_RULES: Tuple[LinkRule, ...] = (
+    ORDER_MISSING, DELIVERY_MISSING, DELIVERY_ORDER_MISMATCH, ORDER_NOT_SHIPPED,
+)
+
+
+def link_violations(rules: Iterable[LinkRule], **objects: Any) -> List[str]:
+    """Codes of the rules the given objects violate."""
+    return [rule.code for rule in rules if rule.check(objects) is False]
+
+
+def check_link(rules: Iterable[LinkRule], **objects: Any) -> bool:
+    """Whether the objects satisfy every rule (missing inputs fail)."""
+    return all(rule.check(objects) is True for rule in rules)
+
+
+def _frame(data: Any, side: str, columns: Sequence[str]):
+    import polars as pl
+
+    frame = data if isinstance(data, pl.DataFrame) else pl.DataFrame(data)
+    present = [c for c in columns if c in frame.columns]
+    frame = frame.select(present).rename({c: f"{side}_{c}" for c in present})
+    missing = [f"{side}_{c}" for c in columns if c not in present]
+    if missing:
+        frame = frame.with_columns(pl.lit(None).alias(c) for c in missing)
+    objects = [c for c, dtype in frame.schema.items() if dtype == pl.Object]
+    if objects:  # UUID 등 파이썬 객체 열은 문자열로 변환
+        frame = frame.with_columns(
+            pl.col(c).map_elements(str, return_dtype=pl.Utf8) for c in objects
+        )
+    return frame.with_columns(
+        pl.col(f"{side}_id").cast(pl.Utf8),
+        pl.col(f"{side}_order_id" if side != "order" else f"{side}_id")
+        .cast(pl.Utf8)
+        .alias("order_key"),
+    )
+
+
+def _rule_columns(rules: Iterable[LinkRule], side: str) -> List[str]:
+    fields = {"id"}
+    for rule in rules:
+        for ref in (rule.left, rule.right):
+            if isinstance(ref, Ref) and ref.side == side:
+                fields.add(ref.field)
+    if side != "order":
+        fields.add("order_id")
+    return sorted(fields)
+
+
+def validate_links(orders: Any, payments: Any = None, deliveries: Any = None):
+    """Check order/payment/delivery frames against the link rules at once.
+
+    Each link type is joined to orders on ``order_id`` separately (a full
+    outer join, so orphans on either side are reported) and checked with its
+    own rules as vectorised expressions. Joining payments and deliveries in
+    one frame would pair every payment of an order with every delivery and
+    repeat each violation.
+
+    Args:
+        orders: Orders frame (Polars, or anything ``pl.DataFrame`` accepts)
+            with ``id``, ``status`` and ``total_amount``.
+        payments: Optional payments frame with ``id``, ``order_id``, ``amount``.
+        deliveries: Optional deliveries frame with ``id`` and ``order_id``.
+
+    Returns:
+        Polars frame with one row per order and link (or missing link):
+        ``link`` (``"payment"`` or ``"delivery"``), ``order_id``,
+        ``payment_id``/``delivery_id`` for the sides given, and
+        ``violations`` (that link type's rule codes, empty when valid).
+
+    Raises:
+        ValueError: Neither payments nor deliveries were given.
+    """
+    import polars as pl
+
+    sides = [("payment", payments, ORDER_PAYMENT_RULES),
+             ("delivery", deliveries, ORDER_DELIVERY_RULES)]
+    sides = [s for s in sides if s[1] is not None]
+    if not sides:
+        raise ValueError("Pass payments and/or deliveries to validate")
+    all_rules = [rule for _, _, side_rules in sides for rule in side_rules]
+    order_frame = _frame(orders, "order", _rule_columns(all_rules, "order"))
+
+    results = []
+    for side, data, side_rules in sides:
+        frame = _frame(data, side, _rule_columns(side_rules, side))
+        joined = order_frame.join(frame, on="order_key", how="full", coalesce=True)
+        codes = [
+            pl.when(rule.violated()).then(pl.lit(rule.code)).otherwise(None)
+            for rule in side_rules
+        ]
+        # concat_list보다 문자열 결합 후 분리가 훨씬 빠름
+        joined_codes = pl.concat_str(codes, separator=",", ignore_nulls=True)
+        violations = (
+            pl.when(joined_codes == "")
+            .then(pl.lit([], dtype=pl.List(pl.Utf8)))
+            .otherwise(joined_codes.str.split(","))
+            .alias("violations")
+        )
+        results.append(
+            joined.select(
+                pl.lit(side).alias("link"), "order_key", f"{side}_id", violations
+            )
+        )
+    keep = ["link", "order_key"] + [f"{side}_id" for side, _, _ in sides]
+    result = pl.concat(results, how="diagonal")
+    return result.select(*keep, "violations").rename({"order_key": "order_id"})
@@ -0,0 +1,107 @@
+"""Inverted tag/category index for similar-product lookups.
+
+Each product's category and tags are posted under their term, so finding
+similar products only visits products that share at least one term with
+the query product. Scores are the number of shared terms (category counts
+as one) or, optionally, the sum of their IDF weights so that rare tags
+count more than ubiquitous ones.
+"""
+
+import heapq
+import math
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .indexes import MISSING, index_key, property_value
+
+Term = Tuple[str, Any]
+
+
+def product_terms(data: Dict[str, Any]) -> FrozenSet[Term]:
+    """Category and tag terms of a stored product dict."""
+    terms = set()
+    category = property_value(data, "category")
+    if category is not MISSING and category not in (None, ""):
+        key = index_key(category)
+        if key is not None:
+            terms.add(("category", key))
+    tags = property_value(data, "tags")
+    if isinstance(tags, (list, tuple, set)):
+        terms.update(("tag", tag) for tag in tags if isinstance(tag, str) and tag)
+    return frozenset(terms)
+
+
+class TagIndex:
+    """Term -> product postings, maintained on product add/update/delete."""
+
+    def __init__(self, obj_type: str = "Product") -> None:
+        self.obj_type = obj_type
+        self._postings: Dict[Term, Dict[Any, None]] = {}
+        self._terms: Dict[Any, FrozenSet[Term]] = {}
+        self._ids: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type != self.obj_type:
+            return
+        key = index_key(node_id)
+        terms = product_terms(data)
+        with self._lock:
+            self._terms[key] = terms
+            self._ids[key] = node_id
+            for term in terms:
+                self._postings.setdefault(term, {})[key] = None
+
+    def remove(self, node_id: Any, data: Dict[str, Any], obj_type: Optional[str]) -> None:
+        if obj_type != self.obj_type:
+            return
+        key = index_key(node_id)
+        with self._lock:
+            for term in self._terms.pop(key, ()):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(key, None)
+                    if not postings:
+                        del self._postings[term]
+            self._ids.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._terms.clear()
+            self._ids.clear()
+
+    def idf(self, term: Term) -> float:
+        """Smoothed inverse document frequency of a term."""
+        df = len(self._postings.get(term, ()))
+        return math.log((1 + len(self._terms)) / (1 + df)) + 1.0
+
+    def similar(
+        self, product_id: Any, k: int = 5, tfidf: bool = False
+    ) -> List[Tuple[Any, float]]:
+        """Top-k products sharing the most (or most specific) terms.
+
+        Args:
+            product_id: Query product id.
+            k: Number of results.
+            tfidf: Weight shared terms by IDF instead of counting them.
+
+        Returns:
+            ``(product_id, score)`` pairs, best first.
+        """
+        key = index_key(product_id)
+        with self._lock:
+            terms = self._terms.get(key)
+            if not terms:
+                return []
+            scores: Dict[Any, float] = {}
+            for term in terms:
+                weight = self.idf(term) if tfidf else 1.0
+                for other in self._postings.get(term, ()):
+                    if other != key:
+                        scores[other] = scores.get(other, 0.0) + weight
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self._ids[other], score) for other, score in top]
@@ -0,0 +1,238 @@
+"""Bounded subgraph extraction for graph viewers.
+
+Instead of shipping the whole ontology to the browser, ``extract_subgraph``
+returns at most ``max_nodes`` nodes:
+
+* around seed objects, the ``radius``-hop neighbourhood, nearest first;
+* without seeds, an overview of the highest-ranked objects (degree or
+  PageRank).
+
+Objects that do not fit are folded into one cluster node per type, and the
+edges touching them are merged into weighted cluster edges. The result is a
+set of parallel arrays (ids, types, labels, edge index pairs) that can be
+rendered directly.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from .indexes import MISSING, property_value
+
+RANKS = ("degree", "pagerank")
+
+
+@dataclass
+class Subgraph:
+    """Compact subgraph; edges refer to node positions."""
+
+    ids: List[str] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    labels: List[str] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    clusters: List[bool] = field(default_factory=list)
+    edges: List[Tuple[int, int]] = field(default_factory=list)
+    edge_types: List[str] = field(default_factory=list)
+    edge_weights: List[int] = field(default_factory=list)
+    total_nodes: int = 0
+    truncated: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _resolve(store, node_id: Any) -> Optional[Any]:
+    if store.has_node(node_id):
+        return node_id
+    if isinstance(node_id, str):
+        try:
+            candidate = UUID(node_id)
+        except ValueError:
+            return None
+        return candidate if store.has_node(candidate) else None
+    return None
+
+
+def _label(data: Dict[str, Any], obj_type: str) -> str:
+    name = property_value(data, "name")
+    return f"{obj_type}: {name}" if name not in (MISSING, None) else obj_type
+
+
+def _neighbourhood(
+    store,
+    seeds: Sequence[Any],
+    radius: int,
+    types: Optional[set],
+    max_candidates: int,
+) -> Tuple[List[Any], List[int], bool]:
+    """Breadth-first candidates around seeds with their hop distance."""
+    depth: Dict[Any, int] = {}
+    frontier = []
+    for seed in seeds:
+        node_id = _resolve(store, seed)
+        if node_id is not None and node_id not in depth:
+            depth[node_id] = 0
+            frontier.append(node_id)
+    truncated = False
+    for hop in range(1, radius + 1):
+        following = []
+        for node_id in frontier:
+            for direction in ("out", "in"):
+                for other, _ in store.neighbors(node_id, direction):
+                    if other in depth:
+                        continue
+                    if types and store.node_type(other) not in types:
+                        continue
+                    depth[other] = hop
+                    following.append(other)
+            if len(depth) >= max_candidates:
+                truncated = True
+                break
+        frontier = following
+        if truncated or not frontier:
+            break
+    ids = list(depth)
+    return ids, [depth[i] for i in ids], truncated
+
+
+def _candidate_edges(
+    store, candidates: List[Any]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    position = {node_id: i for i, node_id in enumerate(candidates)}
+    rel_codes: Dict[str, int] = {}
+    src, dst, codes = [], [], []
+    for i, node_id in enumerate(candidates):
+        for other, rel in store.neighbors(node_id, "out"):
+            j = position.get(other)
+            if j is not None:
+                src.append(i)
+                dst.append(j)
+                codes.append(rel_codes.setdefault(rel, len(rel_codes)))
+    return (
+        np.asarray(src, dtype=np.int64),
+        np.asarray(dst, dtype=np.int64),
+        np.asarray(codes, dtype=np.int64),
+        list(rel_codes),
+    )
+
+
+def extract_subgraph(
+    repo,
+    seeds: Optional[Iterable[Any]] = None,
+    radius: int = 1,
+    max_nodes: int = 300,
+    rank: str = "degree",
+    types: Optional[Iterable[str]] = None,
+    aggregate: bool = True,
+    max_candidates: int = 50_000,
+) -> Subgraph:
+    """Extract a bounded subgraph for display.
+
+    Args:
+        repo: Ontology repository.
+        seeds: Object ids to centre on; without seeds an overview of the
+            whole graph is returned.
+        radius: Hops around the seeds.
+        max_nodes: Maximum nodes returned, cluster nodes included.
+        rank: ``"degree"`` or ``"pagerank"``; decides which objects are
+            kept individually (after hop distance, for seeded requests).
+        types: Only include objects of these types (seeds are always kept).
+        aggregate: Fold objects that do not fit into per-type cluster nodes;
+            otherwise they are dropped.
+        max_candidates: Stop expanding a neighbourhood after this many objects.
+
+    Returns:
+        The subgraph as parallel arrays.
+    """
+    if rank not in RANKS:
+        raise ValueError(f"rank must be one of {RANKS}")
+    store = repo.store
+    types = set(types) if types else None
+    seeds = list(seeds or [])
+
+    if seeds:
+        candidates, depth, truncated = _neighbourhood(
+            store, seeds, radius, types, max_candidates
+        )
+        src, dst, codes, rel_names = _candidate_edges(store, candidates)
+        depth = np.asarray(depth, dtype=np.int64)
+    else:
+        candidates, src, dst, codes, rel_names = store.edge_index()
+        truncated = False
+        depth = np.zeros(len(candidates), dtype=np.int64)
+        if types:
+            keep = np.fromiter(
+                (store.node_type(n) in types for n in candidates),
+                dtype=bool,
+                count=len(candidates),
+            )
+            remap = np.cumsum(keep) - 1
+            edge_keep = keep[src] & keep[dst]
+            src, dst, codes = remap[src[edge_keep]], remap[dst[edge_keep]], codes[edge_keep]
+            candidates = [n for n, k in zip(candidates, keep) if k]
+            depth = depth[keep]
+
+    n = len(candidates)
+    result = Subgraph(total_nodes=n, truncated=truncated)
+    if n == 0:
+        return result
+
+    if rank == "pagerank":
+        # 저장소 버전(seq)별로 캐시된 PageRank 재사용
+        scores_by_id = repo.analytics.pagerank_scores()
+        score = np.asarray([scores_by_id.get(c, 0.0) for c in candidates])
+    else:
+        score = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+
+    # 가까운 노드 우선, 같은 거리에서는 점수 높은 노드 우선
+    order = np.lexsort((-score, depth))
+    node_types = [store.node_type(c) for c in candidates]
+    budget = max_nodes
+    if aggregate and n > max_nodes:
+        # 남는 타입마다 클러스터 노드 한 칸씩 확보
+        for _ in range(3):
+            overflow = {node_types[i] for i in order[budget:]}
+            budget = max(1, max_nodes - len(overflow))
+    kept, rest = order[:budget], order[budget:]
+    result.truncated = result.truncated or len(rest) > 0
+
+    slot = np.full(n, -1, dtype=np.int64)
+    for i in kept.tolist():
+        node_id = candidates[i]
+        slot[i] = len(result.ids)
+        node = store.get_node(node_id)
+        result.ids.append(str(node_id))
+        result.types.append(node_types[i])
+        result.labels.append(_label(node["data"], node_types[i]))
+        result.sizes.append(1)
+        result.clusters.append(False)
+    if aggregate and len(rest):
+        cluster_slot: Dict[str, int] = {}
+        for i in rest.tolist():
+            obj_type = node_types[i]
+            if obj_type not in cluster_slot:
+                cluster_slot[obj_type] = len(result.ids)
+                result.ids.append(f"cluster:{obj_type}")
+                result.types.append(obj_type)
+                result.labels.append(obj_type)
+                result.sizes.append(0)
+                result.clusters.append(True)
+            slot[i] = cluster_slot[obj_type]
+            result.sizes[slot[i]] += 1
+        for obj_type, s in cluster_slot.items():
+            result.labels[s] = f"{obj_type} ({result.sizes[s]})"
+
+    if len(src):
+        a, b = slot[src], slot[dst]
+        is_cluster = np.asarray(result.clusters, dtype=bool)
+        keep = (a >= 0) & (b >= 0)
+        keep[keep] &= ~((a[keep] == b[keep]) & is_cluster[a[keep]])  # 클러스터 내부 간선 제외
+        if keep.any():
+            triples = np.stack([a[keep], b[keep], codes[keep]], axis=1)
+            unique, counts = np.unique(triples, axis=0, return_counts=True)
+            result.edges = [(int(u), int(v)) for u, v, _ in unique]
+            result.edge_types = [rel_names[int(c)] for c in unique[:, 2]]
+            result.edge_weights = counts.tolist()
+    return result
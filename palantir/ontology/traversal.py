@@ -0,0 +1,176 @@
+"""Multi-hop traversal over the ontology graph.
+
+A ``TraversalQuery`` describes a walk declaratively: which objects to start
+from, which relationships to follow in which direction, how deep to go and
+what each hop must match. ``traverse`` runs it breadth first over the
+repository's adjacency, visiting every object at most once (at its shortest
+depth), and yields results as soon as they are found.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from .indexes import property_value, values_equal
+
+DIRECTIONS = ("out", "in", "both")
+
+
+class HopSpec(BaseModel):
+    """Constraints for one hop; unset fields fall back to the query defaults."""
+
+    relationship_types: Optional[List[str]] = None
+    direction: Optional[str] = None
+    target_type: Optional[str] = None
+    where: Dict[str, Any] = Field(default_factory=dict)
+
+
+class TraversalQuery(BaseModel):
+    """Declarative multi-hop pattern."""
+
+    start_ids: List[Any] = Field(default_factory=list)
+    start_type: Optional[str] = None
+    start_properties: Dict[str, Any] = Field(default_factory=dict)
+    relationship_types: Optional[List[str]] = None
+    direction: str = "out"
+    min_depth: int = Field(1, ge=0)
+    max_depth: Optional[int] = Field(None, ge=0)
+    hops: List[HopSpec] = Field(default_factory=list)
+    limit: int = Field(100, ge=1)
+    max_visited: int = Field(100_000, ge=1)
+    include_paths: bool = False
+
+    @model_validator(mode="after")
+    def _check(self) -> "TraversalQuery":
+        if self.max_depth is None:
+            self.max_depth = max(len(self.hops), 1)
+        if self.min_depth > self.max_depth:
+            raise ValueError("min_depth must not exceed max_depth")
+        for direction in [self.direction] + [h.direction for h in self.hops]:
+            if direction is not None and direction not in DIRECTIONS:
+                raise ValueError(f"direction must be one of {DIRECTIONS}")
+        if not (self.start_ids or self.start_type or self.start_properties):
+            raise ValueError("A start filter is required")
+        return self
+
+
+def _hop(query: TraversalQuery, depth: int) -> HopSpec:
+    """Effective spec for the hop that reaches ``depth`` (1-based)."""
+    spec = query.hops[depth - 1] if depth <= len(query.hops) else HopSpec()
+    return HopSpec(
+        relationship_types=(
+            spec.relationship_types
+            if spec.relationship_types is not None
+            else query.relationship_types
+        ),
+        direction=spec.direction or query.direction,
+        target_type=spec.target_type,
+        where=spec.where,
+    )
+
+
+def _start_ids(repo, query: TraversalQuery) -> List[Any]:
+    if query.start_ids:
+        ids = []
+        for node_id in query.start_ids:
+            node = repo.store.get_node(node_id)
+            if node is None and isinstance(node_id, str):
+                # JSON으로 들어온 UUID 문자열
+                try:
+                    node_id = UUID(node_id)
+                except ValueError:
+                    continue
+                node = repo.store.get_node(node_id)
+            if node is None:
+                continue
+            if query.start_type and node["type"] != query.start_type:
+                continue
+            if not all(
+                values_equal(property_value(node["data"], k), v)
+                for k, v in query.start_properties.items()
+            ):
+                continue
+            ids.append(node_id)
+        return ids
+    return [
+        node_id
+        for node_id, _ in repo.iter_matching(
+            query.start_type, query.start_properties or None
+        )
+    ]
+
+
+def _matches(repo, node_id: Any, spec: HopSpec) -> bool:
+    if spec.target_type and repo.store.node_type(node_id) != spec.target_type:
+        return False
+    if spec.where:
+        data = repo.store.get_node(node_id)["data"]
+        return all(
+            values_equal(property_value(data, k), v) for k, v in spec.where.items()
+        )
+    return True
+
+
+def traverse(repo, query: TraversalQuery) -> Iterator[Dict[str, Any]]:
+    """Run a traversal and yield one result per reached object.
+
+    Each result has ``id``, ``type``, ``depth``, ``relationship`` (type of the
+    edge it was reached by, None for start objects) and ``object``; with
+    ``include_paths`` also ``path``, the ids from the start object.
+
+    Stops after ``query.limit`` results or once ``query.max_visited``
+    objects have been visited.
+    """
+    store = repo.store
+    starts = _start_ids(repo, query)
+    parents: Dict[Any, Any] = {}
+    visited = set()
+    frontier = deque()
+    for node_id in starts:
+        if node_id not in visited:
+            visited.add(node_id)
+            parents[node_id] = None
+            frontier.append((node_id, 0, None))
+
+    emitted = 0
+    while frontier:
+        node_id, depth, via = frontier.popleft()
+        if depth >= query.min_depth:
+            node = store.get_node(node_id)
+            result = {
+                "id": node_id,
+                "type": node["type"],
+                "depth": depth,
+                "relationship": via,
+                "object": node["data"],
+            }
+            if query.include_paths:
+                path, cur = [], node_id
+                while cur is not None:
+                    path.append(cur)
+                    cur = parents[cur]
+                result["path"] = path[::-1]
+            yield result
+            emitted += 1
+            if emitted >= query.limit:
+                return
+        if depth >= query.max_depth or len(visited) >= query.max_visited:
+            continue
+
+        spec = _hop(query, depth + 1)
+        rel_types = set(spec.relationship_types or ())
+        directions = ("out", "in") if spec.direction == "both" else (spec.direction,)
+        for direction in directions:
+            for other, rel in store.neighbors(node_id, direction):
+                if len(visited) >= query.max_visited:
+                    break
+                if other in visited or (rel_types and rel not in rel_types):
+                    continue
+                if not _matches(repo, other, spec):
+                    continue
+                # 최단 깊이에서 한 번만 방문 (frontier 중복 제거)
+                visited.add(other)
+                parents[other] = node_id
+                frontier.append((other, depth + 1, rel))
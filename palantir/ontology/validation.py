@@ -0,0 +1,216 @@
+"""Batched validation of ontology rows with cached pydantic adapters.
+
+Untrusted input (API payloads, CSV and frame rows) goes through
+``validate_many``. Data the repository stored itself was validated when it
+was written, so reads rebuild models with ``trusted_loader`` instead, which
+skips validation (``model_construct``) whenever that is safe for the model.
+"""
+
+from collections.abc import Mapping, Sequence
+from collections.abc import Set as AbstractSet
+from functools import lru_cache
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Tuple, Type,
+                    get_args, get_origin)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+RowError = Dict[str, Any]
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model_cls: Type[BaseModel]) -> TypeAdapter:
+    """Return the (cached) ``TypeAdapter`` for ``List[model_cls]``."""
+    return TypeAdapter(List[model_cls])
+
+
+def frame_rows(data: Any) -> Iterable[Any]:
+    """Turn a Polars/pandas frame or Arrow table into row dicts.
+
+    Anything else is returned unchanged.
+    """
+    if hasattr(data, "to_dicts"):  # polars
+        return data.to_dicts()
+    if hasattr(data, "to_pylist"):  # pyarrow
+        return data.to_pylist()
+    if hasattr(data, "to_dict") and hasattr(data, "columns"):  # pandas
+        return data.to_dict(orient="records")
+    return data
+
+
+def validate_many(
+    rows: Iterable[Any],
+    model_cls: Type[BaseModel],
+    validate: bool = True,
+) -> Tuple[List[Tuple[int, BaseModel]], List[RowError]]:
+    """Validate rows into models in one adapter call.
+
+    Rows that are already ``model_cls`` instances pass through. Dict rows
+    are validated together; when some fail, their errors are reported per
+    row and the remaining rows are validated again without them.
+
+    Args:
+        rows: Model instances or dicts.
+        model_cls: Model to validate dicts as.
+        validate: When False, dict rows are trusted and built with
+            ``model_construct`` (e.g. frames that were validated upstream).
+
+    Returns:
+        ``(index, model)`` pairs for valid rows and ``{"index", "error"}``
+        dicts for the rest, both by position in ``rows``.
+    """
+    valid: Dict[int, BaseModel] = {}
+    pending: List[Tuple[int, Any]] = []
+    errors: List[RowError] = []
+    for i, row in enumerate(rows):
+        if isinstance(row, BaseModel):
+            valid[i] = row
+        elif not isinstance(row, dict):
+            errors.append({"index": i, "error": f"Unsupported row type: {type(row).__name__}"})
+        elif validate:
+            pending.append((i, row))
+        else:
+            valid[i] = model_cls.model_construct(**row)
+
+    adapter = list_adapter(model_cls)
+    while pending:
+        try:
+            models = adapter.validate_python([row for _, row in pending])
+        except ValidationError as exc:
+            failed: Dict[int, List[str]] = {}
+            for err in exc.errors():
+                pos = err["loc"][0]
+                field = ".".join(str(part) for part in err["loc"][1:])
+                failed.setdefault(pos, []).append(f"{field}: {err['msg']}")
+            for pos, messages in failed.items():
+                errors.append({"index": pending[pos][0], "error": "; ".join(messages)})
+            pending = [p for pos, p in enumerate(pending) if pos not in failed]
+            continue
+        valid.update((i, model) for (i, _), model in zip(pending, models))
+        break
+
+    errors.sort(key=lambda e: e["index"])
+    return sorted(valid.items(), key=lambda item: item[0]), errors
+
+
+def _contains_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in get_args(annotation))
+
+
+_CONTAINERS = frozenset((dict, list, set))
+
+
+def _copy_containers(value: Any) -> Any:
+    """Copy dicts, lists and sets (recursively); other values are shared."""
+    # 얕은 복사 후 중첩 컨테이너만 재귀 복사 (스칼라 원소는 호출 없이 유지)
+    cls = value.__class__
+    if cls is dict:
+        copied = value.copy()
+        for k, v in value.items():
+            if v.__class__ in _CONTAINERS:
+                copied[k] = _copy_containers(v)
+        return copied
+    if cls is list:
+        copied = value.copy()
+        for i, v in enumerate(value):
+            if v.__class__ in _CONTAINERS:
+                copied[i] = _copy_containers(v)
+        return copied
+    if cls is set:
+        return value.copy()
+    # 하위 클래스
+    if isinstance(value, dict):
+        return {k: _copy_containers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+def _copy_flat(value: Any) -> Any:
+    """Shallow copy of a container whose elements are scalars."""
+    return value.copy() if value.__class__ in _CONTAINERS else _copy_containers(value)
+
+
+def _is_container(annotation: Any) -> bool:
+    origin = get_origin(annotation) or annotation
+    return isinstance(origin, type) and issubclass(
+        origin, (Mapping, Sequence, AbstractSet)
+    ) and not issubclass(origin, (str, bytes))
+
+
+def _may_hold_container(annotation: Any) -> bool:
+    if annotation is Any or _is_container(annotation):
+        return True
+    return any(_may_hold_container(arg) for arg in get_args(annotation))
+
+
+def _field_copier(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """How to copy a stored field value; ``None`` if it holds no containers."""
+    if not _may_hold_container(annotation):
+        return None
+    if _is_container(annotation) and not any(
+        _may_hold_container(arg) for arg in get_args(annotation)
+    ) and get_args(annotation):
+        # List[str], Set[int] 같은 스칼라 컨테이너는 얕은 복사로 충분
+        return _copy_flat
+    return _copy_containers
+
+
+@lru_cache(maxsize=None)
+def trusted_loader(model_cls: Type[BaseModel]) -> Callable[[Dict[str, Any]], BaseModel]:
+    """Return a function that rebuilds ``model_cls`` from its own ``dict()``.
+
+    Flat models skip validation entirely (no ``EmailStr``/``Decimal``
+    parsing): the instance ``__dict__`` is filled straight from the stored
+    dict, as ``model_construct`` does but without its per-field default
+    handling, falling back to ``model_construct`` when fields are missing.
+    Fields whose annotation can hold containers (``properties``, ``items``,
+    ``tags``...) are copied, so editing a loaded model never changes the
+    stored data behind the indexes; which fields and how deep is decided once
+    per model.
+    Models with nested model fields or private attributes keep a cached
+    validator, since their stored dicts must be turned back into models.
+    """
+    if model_cls.__private_attributes__ or any(
+        _contains_model(f.annotation) for f in model_cls.model_fields.values()
+    ):
+        return TypeAdapter(model_cls).validate_python
+
+    fields = tuple(model_cls.model_fields)
+    field_set = frozenset(fields)
+    copiers = tuple(
+        (name, copier)
+        for name, info in model_cls.model_fields.items()
+        if (copier := _field_copier(info.annotation)) is not None
+    )
+    new, set_attr = object.__new__, object.__setattr__
+    construct = model_cls.model_construct
+
+    def load(data: Dict[str, Any]) -> BaseModel:
+        try:
+            values = {name: data[name] for name in fields}
+        except KeyError:
+            return construct(**_copy_containers(data))
+        for name, copier in copiers:
+            value = values[name]
+            if value is not None:
+                values[name] = copier(value)
+        obj = new(model_cls)
+        set_attr(obj, "__dict__", values)
+        set_attr(obj, "__pydantic_fields_set__", set(field_set))
+        set_attr(obj, "__pydantic_extra__", None)
+        set_attr(obj, "__pydantic_private__", None)
+        return obj
+
+    return load
+
+
+def hydrate_many(
+    model_cls: Type[BaseModel], rows: Iterable[Dict[str, Any]]
+) -> List[BaseModel]:
+    """Rebuild trusted (already validated) rows into models."""
+    load = trusted_loader(model_cls)
+    return [load(row) for row in rows]
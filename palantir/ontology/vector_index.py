@@ -0,0 +1,141 @@
+"""Lazily initialised Chroma collection for ontology node embeddings.
+
+Nothing is loaded at import time. The Chroma client, the
+SentenceTransformer embedding function and the collection are created on
+first use, once per process, behind a lock. The collection is opened with
+``get_or_create`` so restarts reuse it. ``warm_up`` can load everything
+ahead of the first request, optionally in a background thread.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CHROMA_DATA_PATH = os.getenv("CHROMA_DATA_PATH", "chroma_data/")
+ONTOLOGY_COLLECTION = os.getenv("ONTOLOGY_COLLECTION", "ontology")
+EMBEDDING_MODEL = os.getenv("ONTOLOGY_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+
+class VectorIndexService:
+    """Thread-safe, lazily created Chroma collection with its embedder."""
+
+    def __init__(
+        self,
+        path: str = CHROMA_DATA_PATH,
+        collection_name: str = ONTOLOGY_COLLECTION,
+        model_name: str = EMBEDDING_MODEL,
+    ):
+        """Describe the collection; nothing is opened until it is used.
+
+        Args:
+            path: Chroma persistence directory.
+            collection_name: Collection holding node embeddings.
+            model_name: SentenceTransformer model used to embed documents.
+        """
+        self.path = path
+        self.collection_name = collection_name
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._client = None
+        self._embedding_function = None
+        self._collection = None
+        self._warm_up: Optional[threading.Thread] = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import chromadb
+
+                    self._client = chromadb.PersistentClient(path=self.path)
+        return self._client
+
+    @property
+    def embedding_function(self) -> Any:
+        if self._embedding_function is None:
+            with self._lock:
+                if self._embedding_function is None:
+                    from chromadb.utils import embedding_functions
+
+                    self._embedding_function = (
+                        embedding_functions.SentenceTransformerEmbeddingFunction(
+                            model_name=self.model_name
+                        )
+                    )
+        return self._embedding_function
+
+    @property
+    def collection(self) -> Any:
+        if self._collection is None:
+            client, embed_fn = self.client, self.embedding_function
+            with self._lock:
+                if self._collection is None:
+                    self._collection = client.get_or_create_collection(
+                        name=self.collection_name, embedding_function=embed_fn
+                    )
+        return self._collection
+
+    @property
+    def ready(self) -> bool:
+        """Whether the collection has been opened."""
+        return self._collection is not None
+
+    def query(self, query_texts, n_results: int = 5, **kwargs: Any) -> Any:
+        return self.collection.query(
+            query_texts=query_texts, n_results=n_results, **kwargs
+        )
+
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """Open the collection and load model weights ahead of first use.
+
+        Args:
+            background: Run in a daemon thread and return it.
+        """
+        if not background:
+            self._load()
+            return None
+        with self._lock:
+            if self._warm_up is None:
+                self._warm_up = threading.Thread(
+                    target=self._load, name="vector-index-warmup", daemon=True
+                )
+                self._warm_up.start()
+            return self._warm_up
+
+    def _load(self) -> None:
+        try:
+            self.collection
+            # 첫 임베딩 호출에서 모델 가중치가 실제로 로드됨
+            self.embedding_function(["warm-up"])
+        except Exception:  # noqa: BLE001 - warm-up is best effort
+            logger.exception("Vector index warm-up failed")
+
+    def reset(self) -> None:
+        """Forget the opened client and collection (tests, path changes)."""
+        with self._lock:
+            self._client = self._embedding_function = self._collection = None
+            self._warm_up = None
+
+
+_shared_index: Optional[VectorIndexService] = None
+_shared_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndexService:
+    """Return the process-wide vector index service.
+
+    Set ``ONTOLOGY_VECTOR_WARMUP=1`` to start a background warm-up when the
+    service is first requested.
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_lock:
+            if _shared_index is None:
+                _shared_index = VectorIndexService()
+                if os.getenv("ONTOLOGY_VECTOR_WARMUP", "0") == "1":
+                    _shared_index.warm_up(background=True)
+    return _shared_index
@@ -0,0 +1,224 @@
+"""Similarity search restricted by graph and property filters.
+
+``similar_search`` answers questions such as "products similar to X that
+were bought by customers in segment 3" in two steps:
+
+1. The filters (object type and properties through the repository indexes,
+   optionally a ``TraversalQuery``) produce a candidate id set.
+2. Candidates are ranked by vector distance, either exactly, by fetching
+   only the candidates' vectors and scanning them, or by asking the ANN
+   index for ``k / selectivity`` neighbours and discarding non-candidates.
+
+The strategy is chosen from a cost estimate: an exact scan costs one vector
+fetch per candidate, the ANN path roughly the number of neighbours it must
+request before ``k`` of them survive the filter.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from pydantic import BaseModel, Field, model_validator
+
+from .traversal import TraversalQuery
+
+STRATEGIES = ("auto", "exact", "ann")
+
+
+class SimilarityQuery(BaseModel):
+    """Top-k similarity over objects that pass graph/property filters."""
+
+    text: Optional[str] = None
+    like_id: Optional[Any] = None
+    obj_type: Optional[str] = None
+    properties: Dict[str, Any] = Field(default_factory=dict)
+    traversal: Optional[TraversalQuery] = None
+    k: int = Field(10, ge=1, le=1000)
+    strategy: str = "auto"
+    exact_limit: int = Field(20_000, ge=0)
+    oversample: float = Field(2.0, ge=1.0)
+
+    @model_validator(mode="after")
+    def _check(self) -> "SimilarityQuery":
+        if (self.text is None) == (self.like_id is None):
+            raise ValueError("Give exactly one of text or like_id")
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}")
+        return self
+
+
+@dataclass
+class SimilarityResult:
+    """Ranked hits with the plan that produced them."""
+
+    hits: List[Tuple[Any, float]] = field(default_factory=list)
+    strategy: str = "ann"
+    candidates: Optional[int] = None
+    fetched: int = 0
+
+
+def _resolve(store, node_id: Any) -> Optional[Any]:
+    if store.has_node(node_id):
+        return node_id
+    if isinstance(node_id, str):
+        try:
+            candidate = UUID(node_id)
+        except ValueError:
+            return None
+        return candidate if store.has_node(candidate) else None
+    return None
+
+
+def candidate_ids(repo, query: SimilarityQuery) -> Optional[Dict[str, Any]]:
+    """Ids passing the filters, keyed by their vector id; ``None`` if unfiltered."""
+    ids: Optional[Set[Any]] = None
+    if query.obj_type or query.properties:
+        ids = {
+            node_id
+            for node_id, _ in repo.iter_matching(query.obj_type, query.properties or None)
+        }
+    if query.traversal is not None:
+        reached = {result["id"] for result in repo.traverse(query.traversal)}
+        ids = reached if ids is None else ids & reached
+    if ids is None:
+        return None
+    return {str(node_id): node_id for node_id in ids}
+
+
+def _distance_fn(collection) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """Distance matching the collection space, so both strategies agree."""
+    space = (getattr(collection, "metadata", None) or {}).get("hnsw:space", "l2")
+    if space == "cosine":
+        def distance(vectors, q):
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(q)
+            return 1.0 - (vectors @ q) / np.where(norms == 0, 1.0, norms)
+    elif space == "ip":
+        def distance(vectors, q):
+            return 1.0 - vectors @ q
+    else:
+        def distance(vectors, q):
+            diff = vectors - q
+            return np.einsum("ij,ij->i", diff, diff)
+    return distance
+
+
+def _exact(collection, query_vector, ids: List[str], k: int, batch_size: int):
+    distance = _distance_fn(collection)
+    best_ids: List[str] = []
+    best = np.empty(0)
+    fetched = 0
+    for start in range(0, len(ids), batch_size):
+        batch = collection.get(ids=ids[start:start + batch_size], include=["embeddings"])
+        embeddings = batch.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            continue
+        fetched += len(batch["ids"])
+        scores = distance(np.asarray(embeddings, dtype=np.float64), query_vector)
+        best_ids = best_ids + list(batch["ids"])
+        best = np.concatenate([best, scores])
+        if len(best) > k:
+            keep = np.argpartition(best, k)[:k]
+            best_ids = [best_ids[i] for i in keep]
+            best = best[keep]
+    order = np.argsort(best, kind="stable")
+    return [(best_ids[i], float(best[i])) for i in order], fetched
+
+
+def _ann(collection, query_vector, allowed: Optional[Dict[str, Any]], k: int,
+         n_results: int, total: int, exclude: Optional[str]):
+    while True:
+        response = collection.query(
+            query_embeddings=[query_vector.tolist()], n_results=min(n_results, total),
+            include=["distances"],
+        )
+        hits = [
+            (record_id, float(dist))
+            for record_id, dist in zip(response["ids"][0], response["distances"][0])
+            if record_id != exclude and (allowed is None or record_id in allowed)
+        ]
+        # 필터 후 k개가 안 되면 더 많이 요청 (전체를 다 보면 중단)
+        if len(hits) >= k or n_results >= total:
+            return hits[:k], min(n_results, total)
+        n_results *= 4
+
+
+def similar_search(
+    repo,
+    query: SimilarityQuery,
+    collection: Any = None,
+    embed: Optional[Callable[[List[str]], Any]] = None,
+    batch_size: int = 5000,
+) -> SimilarityResult:
+    """Rank the objects passing the query filters by similarity.
+
+    Args:
+        repo: Ontology repository.
+        query: Filters, query text or reference object, and ``k``.
+        collection: Chroma collection; defaults to the vector index one.
+        embed: Maps texts to vectors; defaults to the vector index embedder.
+        batch_size: Vectors fetched per call during an exact scan.
+
+    Returns:
+        Up to ``k`` ``(node_id, distance)`` hits, nearest first.
+
+    Raises:
+        KeyError: ``like_id`` has no stored vector.
+    """
+    if collection is None or (embed is None and query.text is not None):
+        from .vector_index import get_vector_index
+
+        index = get_vector_index()
+        collection = collection if collection is not None else index.collection
+        embed = embed or index.embedding_function
+
+    exclude = None
+    if query.like_id is not None:
+        exclude = str(_resolve(repo.store, query.like_id) or query.like_id)
+        stored = collection.get(ids=[exclude], include=["embeddings"])
+        if stored.get("embeddings") is None or len(stored["embeddings"]) == 0:
+            raise KeyError(f"No embedding stored for {query.like_id}")
+        query_vector = np.asarray(stored["embeddings"][0], dtype=np.float64)
+    else:
+        query_vector = np.asarray(embed([query.text])[0], dtype=np.float64)
+
+    allowed = candidate_ids(repo, query)
+    if allowed is not None and exclude is not None:
+        allowed.pop(exclude, None)
+    result = SimilarityResult(candidates=None if allowed is None else len(allowed))
+    if allowed is not None and not allowed:
+        result.strategy = "exact"
+        return result
+
+    total = collection.count()
+    if total == 0:
+        return result
+    wanted = query.k + (exclude is not None)
+    strategy = query.strategy
+    if allowed is None:
+        n_results = wanted
+        strategy = "ann"
+    else:
+        # 선택도로 필요한 ANN 결과 수 추정 → 후보 수(정확 탐색 비용)와 비교
+        selectivity = max(len(allowed) / max(total, 1), 1e-9)
+        n_results = math.ceil(wanted / selectivity * query.oversample)
+        if strategy == "auto":
+            exact_cheaper = len(allowed) <= query.exact_limit or len(allowed) <= n_results
+            strategy = "exact" if exact_cheaper else "ann"
+
+    result.strategy = strategy
+    if strategy == "exact":
+        hits, result.fetched = _exact(
+            collection, query_vector, list(allowed), query.k, batch_size
+        )
+    else:
+        hits, result.fetched = _ann(
+            collection, query_vector, allowed, query.k, n_results, total, exclude
+        )
+    lookup = allowed or {}
+    result.hits = [
+        (lookup.get(record_id) or _resolve(repo.store, record_id) or record_id, dist)
+        for record_id, dist in hits
+    ]
+    return result
@@ -0,0 +1,174 @@
+"""Content-hash result cache for expensive ETL tasks."""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from palantir.process.logs import get_logger
+
+CACHE_DIR = os.getenv("ETL_CACHE_DIR", ".etl_cache")
+CACHE_TTL_SECONDS = int(os.getenv("ETL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+_SUFFIXES = (".parquet", ".npy", ".json")
+
+
+def _update(h: "hashlib._Hash", value: Any) -> None:
+    """Feed a value into the hash in a type-tagged, order-preserving way."""
+    if isinstance(value, pl.DataFrame):
+        h.update(b"pl")
+        h.update(repr(value.schema).encode())
+        h.update(value.hash_rows(seed=0).to_numpy())
+        h.update(pl.__version__.encode())
+    elif isinstance(value, pd.DataFrame):
+        h.update(b"pd")
+        h.update(repr(list(value.columns)).encode())
+        h.update(repr(value.dtypes.tolist()).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy())
+    elif isinstance(value, np.ndarray):
+        h.update(b"np")
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b"seq%d" % len(value))
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        h.update(b"map%d" % len(value))
+        for key in sorted(value, key=str):
+            _update(h, str(key))
+            _update(h, value[key])
+    else:
+        data = str(value).encode()
+        h.update(b"s%d:" % len(data))
+        h.update(data)
+
+
+def fingerprint(*values: Any) -> str:
+    """Return a stable content hash for DataFrames, arrays, text lists and scalars.
+
+    Args:
+        values: Values to hash together.
+
+    Returns:
+        Hex digest identifying the combined content.
+    """
+    h = hashlib.sha256()
+    for value in values:
+        _update(h, value)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """File-backed cache storing frames as Parquet, arrays as .npy, dicts as JSON."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = None):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cached results. Defaults to ``ETL_CACHE_DIR``.
+            ttl: Expiry in seconds. Defaults to ``ETL_CACHE_TTL_SECONDS``;
+                ``0`` disables expiry.
+        """
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.ttl = CACHE_TTL_SECONDS if ttl is None else ttl
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / key
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Load a cached result, or None if missing or expired."""
+        base = self._path(namespace, key)
+        for suffix in _SUFFIXES:
+            path = base.with_suffix(suffix)
+            if not path.exists():
+                continue
+            if self.ttl and time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            if suffix == ".parquet":
+                return pl.read_parquet(path)
+            if suffix == ".npy":
+                return np.load(path, allow_pickle=False)
+            return json.loads(path.read_text(encoding="utf-8"))
+        return None
+
+    def set(self, namespace: str, key: str, value: Any) -> bool:
+        """Persist a result. Returns False for unsupported result types."""
+        base = self._path(namespace, key)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(value, pl.DataFrame):
+            path, write = base.with_suffix(".parquet"), value.write_parquet
+        elif isinstance(value, np.ndarray):
+            path = base.with_suffix(".npy")
+
+            def write(p: Path) -> None:
+                # 파일 객체로 저장해야 np.save가 .npy 접미사를 덧붙이지 않음
+                with open(p, "wb") as f:
+                    np.save(f, value, allow_pickle=False)
+
+        elif isinstance(value, dict):
+            path = base.with_suffix(".json")
+
+            def write(p: Path) -> None:
+                p.write_text(json.dumps(value), encoding="utf-8")
+
+        else:
+            return False
+        # 원자적 교체로 동시 실행 중 부분 파일을 읽지 않도록 함
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        write(tmp)
+        os.replace(tmp, path)
+        return True
+
+
+def content_cached(
+    namespace: Optional[str] = None,
+    cache: Optional[ResultCache] = None,
+    exclude: Iterable[str] = (),
+) -> Callable:
+    """Cache a task function's result keyed by a fingerprint of its arguments.
+
+    Apply below ``@task`` so the hit/miss message lands in the flow run logs.
+
+    Args:
+        namespace: Cache sub-directory. Defaults to the function name.
+        cache: Cache instance. Defaults to a ``ResultCache`` using env settings.
+        exclude: Argument names that do not affect the result.
+    """
+    excluded = set(exclude)
+
+    def decorator(func: Callable) -> Callable:
+        ns = namespace or func.__name__
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or ResultCache()
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = fingerprint(
+                [(k, v) for k, v in bound.arguments.items() if k not in excluded]
+            )
+            logger = get_logger()
+            cached = store.get(ns, key)
+            if cached is not None:
+                logger.info(f"Cache hit for {ns} ({key[:12]})")
+                return cached
+            logger.info(f"Cache miss for {ns} ({key[:12]})")
+            result = func(*args, **kwargs)
+            if not store.set(ns, key, result):
+                logger.warning(f"Result of {ns} is not cacheable: {type(result)}")
+            return result
+
+        return wrapper
+
+    return decorator
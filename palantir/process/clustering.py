@@ -0,0 +1,220 @@
+"""Incremental customer clustering over stored embeddings."""
+
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+from sklearn.cluster import MiniBatchKMeans
+
+EVENT_COLUMNS = ["id", "type", "related_id", "timestamp", "description"]
+
+Page = Tuple[List[str], np.ndarray]
+
+
+def iter_chroma_embeddings(collection: Any, page_size: int = 10_000) -> Iterator[Page]:
+    """Yield ``(ids, embeddings)`` pages from a Chroma collection.
+
+    Args:
+        collection: Chroma collection holding precomputed embeddings.
+        page_size: Records fetched per ``collection.get`` call.
+    """
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        ids = page["ids"]
+        if not ids:
+            return
+        yield list(ids), np.asarray(page["embeddings"], dtype=np.float32)
+        offset += len(ids)
+
+
+def fetch_embeddings(collection: Any, ids: List[str], page_size: int = 10_000) -> Page:
+    """Stored embeddings for ``ids``; ids without a stored vector are left out.
+
+    Args:
+        collection: Chroma collection holding precomputed embeddings.
+        ids: Record ids to fetch.
+        page_size: Ids requested per ``collection.get`` call.
+    """
+    found: List[str] = []
+    chunks: List[np.ndarray] = []
+    for start in range(0, len(ids), page_size):
+        page = collection.get(ids=ids[start:start + page_size], include=["embeddings"])
+        if len(page["ids"]):
+            found.extend(page["ids"])
+            chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+    if not chunks:
+        return found, np.empty((0, 0), dtype=np.float32)
+    return found, np.vstack(chunks)
+
+
+class IncrementalClusterer:
+    """MiniBatchKMeans wrapper that trains page by page and can be resumed."""
+
+    def __init__(
+        self,
+        n_clusters: int = 3,
+        batch_size: int = 1024,
+        random_state: int = 42,
+    ):
+        """Initialize the clusterer.
+
+        Args:
+            n_clusters: Number of clusters.
+            batch_size: Mini-batch size used by MiniBatchKMeans.
+            random_state: Seed for reproducible centroids.
+        """
+        self.n_clusters = n_clusters
+        self.model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=batch_size,
+            random_state=random_state,
+            n_init=3,
+        )
+        self._carry: Optional[np.ndarray] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return hasattr(self.model, "cluster_centers_")
+
+    def partial_fit(self, embeddings: np.ndarray) -> "IncrementalClusterer":
+        """Update centroids with a new chunk of embeddings.
+
+        The first update needs at least ``n_clusters`` samples, so smaller
+        chunks are held back until enough have arrived.
+        """
+        if self._carry is not None:
+            embeddings = np.vstack([self._carry, embeddings])
+            self._carry = None
+        if not self.is_fitted and len(embeddings) < self.n_clusters:
+            self._carry = embeddings
+            return self
+        self.model.partial_fit(embeddings)
+        return self
+
+    def fit_pages(self, pages: Iterable[Page]) -> "IncrementalClusterer":
+        """Train on a stream of ``(ids, embeddings)`` pages."""
+        for _, embeddings in pages:
+            self.partial_fit(embeddings)
+        if self._carry is not None:
+            raise ValueError(
+                f"At least {self.n_clusters} embeddings are needed, "
+                f"got {len(self._carry)}"
+            )
+        return self
+
+    def predict_pages(self, pages: Iterable[Page]) -> Tuple[List[str], np.ndarray]:
+        """Assign clusters to a stream of pages."""
+        all_ids: List[str] = []
+        labels: List[np.ndarray] = []
+        for ids, embeddings in pages:
+            all_ids.extend(ids)
+            labels.append(self.model.predict(embeddings))
+        if not labels:
+            return all_ids, np.empty(0, dtype=np.int32)
+        return all_ids, np.concatenate(labels).astype(np.int32)
+
+    def save(self, path: str) -> None:
+        """Persist the model so the next run can continue with ``partial_fit``."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self.model, f)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalClusterer":
+        """Load a model saved with ``save``."""
+        with open(path, "rb") as f:
+            model = pickle.load(f)  # noqa: S301 - trusted local artifact
+        clusterer = cls(n_clusters=model.n_clusters)
+        clusterer.model = model
+        return clusterer
+
+
+def cluster_events_frame(
+    ids: List[str],
+    labels: np.ndarray,
+    event_type: str = "customer_clustered",
+    timestamp: Optional[datetime] = None,
+) -> pl.DataFrame:
+    """Build cluster-assignment events as one columnar batch.
+
+    Returns:
+        DataFrame with the ``Event`` fields plus a ``cluster`` column.
+    """
+    timestamp = timestamp or datetime.utcnow()
+    suffix = f":{event_type}:{timestamp.strftime('%Y%m%d%H%M%S')}"
+    return pl.DataFrame(
+        {"related_id": ids, "cluster": labels}, schema_overrides={"cluster": pl.Int32}
+    ).select(
+        (pl.col("related_id") + suffix).alias("id"),
+        pl.lit(event_type).alias("type"),
+        pl.col("related_id"),
+        pl.lit(timestamp).alias("timestamp"),
+        pl.format("Cluster: {}", pl.col("cluster")).alias("description"),
+        pl.col("cluster"),
+    )
+
+
+def cluster_stored_embeddings(
+    collection: Any,
+    n_clusters: int = 3,
+    page_size: int = 10_000,
+    clusterer: Optional[IncrementalClusterer] = None,
+) -> Tuple[IncrementalClusterer, pl.DataFrame]:
+    """Cluster every embedding in a collection without re-encoding.
+
+    Args:
+        collection: Chroma collection holding the embeddings.
+        n_clusters: Number of clusters for a new model.
+        page_size: Records fetched per page.
+        clusterer: Previously trained model to update incrementally.
+
+    Returns:
+        The updated clusterer and the cluster-assignment events.
+    """
+    clusterer = clusterer or IncrementalClusterer(n_clusters=n_clusters)
+    clusterer.fit_pages(iter_chroma_embeddings(collection, page_size))
+    ids, labels = clusterer.predict_pages(iter_chroma_embeddings(collection, page_size))
+    return clusterer, cluster_events_frame(ids, labels)
+
+
+def cluster_ids(
+    collection: Any,
+    ids: List[str],
+    new_ids: Iterable[str] = (),
+    n_clusters: int = 3,
+    clusterer: Optional[IncrementalClusterer] = None,
+    page_size: int = 10_000,
+) -> Tuple[IncrementalClusterer, pl.DataFrame]:
+    """Assign clusters to ``ids``, training only on what the model has not seen.
+
+    A new model is trained once on every stored embedding; an existing one
+    is updated with ``partial_fit`` on the embeddings of ``new_ids`` only.
+
+    Args:
+        collection: Chroma collection holding the embeddings.
+        ids: Records to label.
+        new_ids: Records embedded since the model was last updated.
+        n_clusters: Number of clusters for a new model.
+        clusterer: Previously trained model to update incrementally.
+        page_size: Records fetched per page.
+
+    Returns:
+        The updated clusterer and cluster-assignment events for ``ids``
+        (ids without a stored embedding are skipped).
+    """
+    if clusterer is None or not clusterer.is_fitted:
+        clusterer = clusterer or IncrementalClusterer(n_clusters=n_clusters)
+        clusterer.fit_pages(iter_chroma_embeddings(collection, page_size))
+    else:
+        new_ids = list(new_ids)
+        if new_ids:
+            clusterer.fit_pages([fetch_embeddings(collection, new_ids, page_size)])
+    found, embeddings = fetch_embeddings(collection, ids, page_size)
+    labels = np.empty(0, dtype=np.int32)
+    if found:
+        _, labels = clusterer.predict_pages([(found, embeddings)])
+    return clusterer, cluster_events_frame(found, labels)
@@ -1,12 +1,183 @@
 """Database utilities for DuckDB connections."""
 
 import contextlib
+import re
+import threading
 from pathlib import Path
-from typing import Generator, Optional
+from typing import Any, Dict, Generator, List, Optional, Tuple
 import os
 
 import duckdb
-from prefect.logging import get_run_logger
+import polars as pl
+
+from palantir.process.logs import get_logger
+
+MEMORY_DB = ":memory:"
+
+
+class DuckDBConnectionManager:
+    """Process-wide DuckDB instances with per-thread cursors.
+
+    Each database path is opened once and kept warm, so its buffer cache and
+    catalog survive between ETL steps and API reads. Threads get their own
+    cursor on the shared instance, since a DuckDB connection object must not
+    be used from several threads at once.
+
+    A path opened read-write in this process also serves read-only requests:
+    DuckDB refuses to open one file twice with different settings. Read-only
+    leases on a writable instance run inside a ``READ ONLY`` transaction, so
+    they still cannot write. Processes that only query (API workers) open
+    their own read-only instance, which does not block other readers.
+    """
+
+    def __init__(
+        self,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+    ):
+        """Initialize the manager.
+
+        Args:
+            threads: DuckDB worker threads. Defaults to ``DUCKDB_THREADS``.
+            memory_limit: DuckDB memory limit such as ``"4GB"``. Defaults to
+                ``DUCKDB_MEMORY_LIMIT``.
+        """
+        threads = threads or os.getenv("DUCKDB_THREADS")
+        self.threads = int(threads) if threads else None
+        self.memory_limit = memory_limit or os.getenv("DUCKDB_MEMORY_LIMIT")
+        self._databases: Dict[str, Tuple[duckdb.DuckDBPyConnection, bool]] = {}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._leases: Dict[int, int] = {}  # 인스턴스별 사용 중인 lease 수
+        self._cursors: Dict[int, List[duckdb.DuckDBPyConnection]] = {}
+        self._local = threading.local()
+
+    def _config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = {}
+        if self.threads:
+            config["threads"] = self.threads
+        if self.memory_limit:
+            config["memory_limit"] = self.memory_limit
+        return config
+
+    @staticmethod
+    def _key(db_path: Optional[str]) -> str:
+        if not db_path or db_path == MEMORY_DB:
+            return MEMORY_DB
+        return str(Path(db_path).resolve())
+
+    def database(
+        self, db_path: Optional[str] = None, read_only: bool = False
+    ) -> duckdb.DuckDBPyConnection:
+        """Return the shared instance for a path, opening it on first use.
+
+        Args:
+            db_path: Database file. ``None`` selects the shared in-memory DB.
+            read_only: Open a read-only instance if the path is not open yet.
+                A read-only instance is reopened read-write when a writer
+                asks for it, once its active leases are released.
+
+        Raises:
+            RuntimeError: The calling thread itself holds a lease on the
+                read-only instance that would have to be reopened.
+        """
+        key = self._key(db_path)
+        with self._lock:
+            entry = self._databases.get(key)
+            if entry is not None and (read_only or not entry[1]):
+                return entry[0]
+            if entry is not None:
+                # 읽기 전용으로 열린 인스턴스를 쓰기 가능으로 재오픈:
+                # 다른 스레드의 lease가 끝날 때까지 기다린 뒤 닫는다
+                if self._held().get(key):
+                    raise RuntimeError(
+                        f"Cannot reopen {key} read-write while this thread "
+                        "holds a read-only connection to it"
+                    )
+                old = entry[0]
+                self._released.wait_for(lambda: not self._leases.get(id(old)))
+                entry = self._databases.get(key)
+                if entry is not None and entry[0] is not old:
+                    return entry[0]
+                # 스레드별 커서가 남아 있으면 파일을 다른 설정으로 열 수 없다
+                for cur in self._cursors.pop(id(old), []):
+                    cur.close()
+                old.close()
+            read_only = read_only and key != MEMORY_DB
+            conn = duckdb.connect(key, read_only=read_only, config=self._config())
+            self._databases[key] = (conn, read_only)
+            get_logger().info(
+                f"Opened DuckDB {'read-only ' if read_only else ''}instance at {key}"
+            )
+            return conn
+
+    def cursor(
+        self, db_path: Optional[str] = None, read_only: bool = False
+    ) -> duckdb.DuckDBPyConnection:
+        """Return this thread's cursor on the shared instance for a path."""
+        key = self._key(db_path)
+        base = self.database(db_path, read_only)
+        cached = getattr(self._local, key, None)
+        if cached is not None and cached[0] is base:
+            return cached[1]
+        cur = base.cursor()
+        with self._lock:
+            self._cursors.setdefault(id(base), []).append(cur)
+        setattr(self._local, key, (base, cur))
+        return cur
+
+    def _held(self) -> Dict[str, int]:
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = {}
+        return held
+
+    @contextlib.contextmanager
+    def lease(
+        self, db_path: Optional[str] = None, read_only: bool = False
+    ) -> Generator[Tuple[duckdb.DuckDBPyConnection, bool], None, None]:
+        """Hold this thread's cursor so its instance is not closed meanwhile.
+
+        Yields:
+            The cursor and whether the underlying instance is writable.
+        """
+        key = self._key(db_path)
+        while True:
+            cur = self.cursor(db_path, read_only)
+            base = getattr(self._local, key)[0]
+            with self._lock:
+                entry = self._databases.get(key)
+                if entry is not None and entry[0] is base:
+                    self._leases[id(base)] = self._leases.get(id(base), 0) + 1
+                    writable = not entry[1]
+                    break
+            # lease를 잡기 전에 인스턴스가 교체됨 → 다시 시도
+        held = self._held()
+        held[key] = held.get(key, 0) + 1
+        try:
+            yield cur, writable
+        finally:
+            held[key] -= 1
+            with self._lock:
+                remaining = self._leases[id(base)] - 1
+                if remaining:
+                    self._leases[id(base)] = remaining
+                else:
+                    del self._leases[id(base)]
+                    self._released.notify_all()
+
+    def close_all(self) -> None:
+        """Close every shared instance (e.g. on application shutdown)."""
+        with self._lock:
+            for conn, _ in self._databases.values():
+                for cur in self._cursors.pop(id(conn), []):
+                    cur.close()
+                conn.close()
+            self._databases.clear()
+            self._local = threading.local()
+
+
+connection_manager = DuckDBConnectionManager()
 
 
 @contextlib.contextmanager
@@ -17,14 +188,21 @@ def get_duckdb_connection(
 ) -> Generator[duckdb.DuckDBPyConnection, None, None]:
     """Context manager for DuckDB connections.
 
+    Yields this thread's cursor on the process-wide instance instead of
+    opening a new connection, so the database stays warm between uses.
+
     Args:
         db_path: Path to the database file. If None, uses in-memory database.
-        read_only: Whether to open the connection in read-only mode.
+        read_only: Whether to open the connection in read-only mode. On an
+            instance this process also writes to, the block runs in a
+            ``READ ONLY`` transaction instead.
+        schema: Default schema for the block; the cursor's previous schema
+            is restored afterwards.
 
     Yields:
         DuckDB connection object.
     """
-    logger = get_run_logger()
+    logger = get_logger()
     db_path = db_path or os.getenv("DUCKDB_PATH")
     schema = schema or os.getenv("DUCKDB_SCHEMA")
 
@@ -34,14 +212,54 @@ def get_duckdb_connection(
     else:
         logger.info("Using in-memory DuckDB database")
 
-    try:
-        conn = duckdb.connect(db_path, read_only=read_only)
-        if schema:
-            conn.execute(f"SET schema '{schema}'")
-        yield conn
-    finally:
-        conn.close()
-        logger.info("DuckDB connection closed")
+    with connection_manager.lease(db_path, read_only=read_only) as (conn, writable):
+        outermost = connection_manager._held()[connection_manager._key(db_path)] == 1
+        # 쓰기 가능한 인스턴스를 빌린 읽기 전용 요청은 읽기 전용 트랜잭션으로 제한
+        # (중첩된 블록은 바깥 블록의 트랜잭션을 그대로 쓴다)
+        guard = read_only and writable and outermost
+        previous = None
+        if schema:
+            previous = conn.execute("SELECT current_schema()").fetchone()[0]
+            conn.execute(f"SET schema '{schema}'")
+        if guard:
+            conn.execute("BEGIN TRANSACTION READ ONLY")
+        try:
+            yield conn
+        except BaseException:
+            if guard:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            if guard:
+                conn.execute("COMMIT")
+        finally:
+            if previous is not None:
+                conn.execute(f"SET schema '{previous}'")
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def read_table(
+    table_name: str,
+    limit: int = 100,
+    db_path: Optional[str] = None,
+    schema: Optional[str] = None,
+) -> pl.DataFrame:
+    """Read the first rows of a table over a read-only connection.
+
+    Query endpoints use this path so they share the warm instance without
+    being able to modify it.
+
+    Raises:
+        ValueError: ``table_name`` is not a plain identifier.
+    """
+    if not _IDENTIFIER.match(table_name):
+        raise ValueError(f"Invalid table name: {table_name!r}")
+    with get_duckdb_connection(db_path, read_only=True, schema=schema) as conn:
+        return conn.execute(
+            f'SELECT * FROM "{table_name}" LIMIT ?', [int(limit)]
+        ).pl()
 
 
 def init_db(db_path: Optional[str] = None) -> None:
@@ -50,7 +268,7 @@ def init_db(db_path: Optional[str] = None) -> None:
     Args:
         db_path: Path to the database file.
     """
-    logger = get_run_logger()
+    logger = get_logger()
     db_path = db_path or os.getenv("DUCKDB_PATH")
     logger.info(f"Initializing database at {db_path}")
 
@@ -1,9 +1,10 @@
 """ETL flow definitions using Prefect."""
 
-from datetime import datetime
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import os
+import warnings
 
 import chromadb
 import pandas as pd
@@ -15,11 +16,17 @@ from prefect.schedules import CronSchedule
 from prefect_aws.s3 import S3Bucket
 from prefect.logging import get_run_logger
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans
 
 from palantir.ontology.objects import (Customer, Delivery, Event, Order,
                                        Payment, Product)
-from palantir.ontology.repository import OntologyRepository, embedding_node
+from palantir.ontology.repository import OntologyRepository, embedding_nodes
+from palantir.ontology.validation import validate_many
+from palantir.process.cache import content_cached, fingerprint
+from palantir.process.clustering import (EVENT_COLUMNS, IncrementalClusterer,
+                                         cluster_ids, fetch_embeddings)
+from palantir.process.db import get_duckdb_connection
+from palantir.process.lake import register_lake_view, write_partitioned
+from palantir.utils.chroma_writer import ChromaBatchWriter
 
 
 @task
@@ -52,6 +59,7 @@ def extract_api(url: str) -> pl.DataFrame:
 
 
 @task
+@content_cached()
 def transform_data(df: pl.DataFrame) -> pl.DataFrame:
     """Transform the extracted data."""
     logger = get_run_logger()
@@ -72,22 +80,17 @@ def load_to_duckdb(
     db_path: Optional[str] = None,
 ) -> None:
     """Load transformed data to DuckDB."""
-    import duckdb
-
     logger = get_run_logger()
     logger.info(f"Loading data to table {table_name}")
 
-    # Resolve DB path from env if not provided
-    db_path = db_path or os.getenv("DUCKDB_PATH")
-
-    # Connect to DuckDB (in-memory if no path provided)
-    conn = duckdb.connect(db_path) if db_path else duckdb.connect()
-
-    # Load dataframe (register temporary view to handle Polars)
-    conn.register("df_view", df.to_pandas())
-    conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM df_view")
-    conn.unregister("df_view")
-    conn.close()
+    # Shared warm instance (in-memory if no path provided or set in env)
+    with get_duckdb_connection(db_path) as conn:
+        # Load dataframe (register temporary view to handle Polars)
+        conn.register("df_view", df.to_arrow())
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM df_view"
+        )
+        conn.unregister("df_view")
 
     logger.info("Data loaded successfully")
 
@@ -126,6 +129,44 @@ def multi_source_to_duckdb_flow(
     merged = pl.concat([csv_df, api_df], how="diagonal")
     transformed = transform_data(merged)
     load_to_duckdb(transformed, table_name, db_path)
+
+
+@task
+def load_to_parquet_lake(
+    df: pl.DataFrame,
+    table_name: str,
+    lake_root: Optional[str] = None,
+    partition_by: Optional[List[str]] = None,
+    date_column: Optional[str] = None,
+    db_path: Optional[str] = None,
+) -> List[str]:
+    """Append data to the Parquet lake and refresh its DuckDB view."""
+    logger = get_run_logger()
+    files = write_partitioned(
+        df, table_name, lake_root, partition_by=partition_by, date_column=date_column
+    )
+    logger.info(f"Appended {df.height} rows to lake table {table_name}")
+
+    with get_duckdb_connection(db_path) as conn:
+        register_lake_view(conn, table_name, lake_root)
+
+    return files
+
+
+@flow(name="csv_to_parquet_lake")
+def csv_to_parquet_lake_flow(
+    csv_path: str,
+    table_name: str,
+    partition_by: Optional[List[str]] = None,
+    date_column: Optional[str] = None,
+    lake_root: Optional[str] = None,
+) -> None:
+    """ETL flow appending CSV data to a partitioned Parquet lake table."""
+    raw_data = extract_csv(Path(csv_path))
+    transformed_data = transform_data(raw_data)
+    load_to_parquet_lake(
+        transformed_data, table_name, lake_root, partition_by, date_column
+    )
 
 
 @task
@@ -138,6 +179,7 @@ def load_to_sqlite(df: pl.DataFrame, table_name: str, db_path: str):
 
 
 @task
+@content_cached()
 def generate_embeddings(texts: list, model_name: str = "all-MiniLM-L6-v2"):
     model = SentenceTransformer(model_name)
     embeddings = model.encode(texts)
@@ -145,11 +187,22 @@ def generate_embeddings(texts: list, model_name: str = "all-MiniLM-L6-v2"):
 
 
 @task
-def load_embeddings_to_chroma(embeddings, metadatas, collection_name: str = "default"):
+def load_embeddings_to_chroma(
+    embeddings,
+    metadatas,
+    collection_name: str = "default",
+    ids: Optional[list] = None,
+    batch_size: Optional[int] = None,
+    background: bool = False,
+):
     client = chromadb.Client()
     collection = client.get_or_create_collection(collection_name)
-    for emb, meta in zip(embeddings, metadatas):
-        collection.add(emb, metadata=meta)
+    if ids is None:
+        # 재실행 시 같은 레코드가 같은 id로 upsert 되도록 내용 기반 id 사용
+        ids = [meta.get("id") or fingerprint(meta) for meta in metadatas]
+    with ChromaBatchWriter(collection, batch_size, background=background) as writer:
+        writer.add_many(ids, embeddings=embeddings, metadatas=metadatas)
+    return writer.written
 
 
 @flow(name="csv_to_sqlite_and_embed")
@@ -169,6 +222,7 @@ def csv_to_sqlite_and_embed_flow(
 
 # ML 실험 예시 (간단한 분류)
 @task
+@content_cached()
 def train_simple_classifier(df: pd.DataFrame, label_column: str):
     from sklearn.ensemble import RandomForestClassifier
     from sklearn.metrics import accuracy_score
@@ -271,12 +325,30 @@ def register_event_for_prediction(obj_id, event_type, description):
 
 
 @task
-def generate_and_register_embeddings(obj_type, text_field="description"):
-    objs = get_objects_api(obj_type)
-    texts = [o.get(text_field, "") for o in objs]
-    embeddings = generate_embeddings.fn(texts)  # Prefect task의 .fn으로 직접 호출
-    for obj, emb in zip(objs, embeddings):
-        update_object_embedding(obj["id"], obj_type, emb)
+def generate_and_register_embeddings(obj_type=None, text_field=None, limit: int = 1000):
+    # 전체 재인코딩 대신 텍스트가 바뀐 객체만 서버의 dirty set에서 재임베딩
+    if obj_type is not None or text_field is not None:
+        warnings.warn(
+            "obj_type and text_field are ignored: every object whose name or "
+            "description changed is re-embedded",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    totals = {"embedded": 0, "deleted": 0, "skipped": 0}
+    while True:
+        resp = requests.post(
+            f"{ONTOLOGY_API_URL}/embeddings/refresh", params={"limit": limit}
+        )
+        resp.raise_for_status()
+        result = resp.json()
+        if result.get("status") != "refreshed":
+            return {**totals, **result}  # 서버 워커가 처리
+        done = 0
+        for name in totals:
+            totals[name] += result.get(name, 0)
+            done += result.get(name, 0)
+        if not result.get("pending") or not done:
+            return {**totals, "status": "refreshed", "pending": result.get("pending", 0)}
 
 
 @task
@@ -290,53 +362,74 @@ def register_classification_events(
 
 
 def load_customers_from_csv(path: str) -> list:
-    df = pd.read_csv(path)
-    customers = [
-        Customer(id=row["id"], email=row["email"], name=row["name"])
-        for _, row in df.iterrows()
-    ]
-    return customers
-
-
-def embed_and_store_customers(customers: list, chroma_path: str = "chroma_customers"):
+    df = pd.read_csv(path, usecols=["id", "email", "name"])
+    # 외부 입력이므로 검증은 하되 행 단위가 아닌 배치로 수행
+    valid, errors = validate_many(df.to_dict(orient="records"), Customer)
+    if errors:
+        raise ValueError(f"Invalid customer rows in {path}: {errors[:5]}")
+    return [customer for _, customer in valid]
+
+
+def embed_and_store_customers(
+    customers: list,
+    chroma_path: str = "chroma_customers",
+    batch_size: Optional[int] = None,
+    background: bool = True,
+):
     model = SentenceTransformer("all-MiniLM-L6-v2")
     texts = [c.display_name for c in customers]
     embeddings = model.encode(texts)
     client = chromadb.PersistentClient(path=chroma_path)
     collection = client.get_or_create_collection("customers")
-    for c, emb in zip(customers, embeddings):
-        collection.add(
-            documents=[c.display_name], embeddings=[emb.tolist()], ids=[str(c.id)]
+    with ChromaBatchWriter(collection, batch_size, background=background) as writer:
+        writer.add_many(
+            [c.id for c in customers], embeddings=embeddings, documents=texts
         )
     return collection.count()
 
 
 def cluster_customers(
-    customers: list, n_clusters: int = 3, chroma_path: str = "chroma_customers"
+    customers: list,
+    n_clusters: int = 3,
+    chroma_path: str = "chroma_customers",
+    model_path: Optional[str] = None,
 ):
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    texts = [c.display_name for c in customers]
-    embeddings = model.encode(texts)
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    labels = kmeans.fit_predict(embeddings)
-    # 온톨로지/이벤트 기록
-    events = []
-    for c, label in zip(customers, labels):
-        c.cluster_label = int(label)
-        events.append(
-            Event(
-                event_type="customer_clustered",
-                related_id=c.id,
-                timestamp=datetime.utcnow(),
-                description=f"Cluster: {label}",
-            )
-        )
+    # 저장된 임베딩을 재사용하고, 아직 없는 고객만 인코딩
+    client = chromadb.PersistentClient(path=chroma_path)
+    collection = client.get_or_create_collection("customers")
+    ids = [str(c.id) for c in customers]
+    stored, _ = fetch_embeddings(collection, ids)
+    stored = set(stored)
+    missing = [c for c in customers if str(c.id) not in stored]
+    if missing:
+        embed_and_store_customers(missing, chroma_path)
+    model_path = model_path or os.getenv("CUSTOMER_CLUSTER_MODEL")
+    clusterer = (
+        IncrementalClusterer.load(model_path)
+        if model_path and Path(model_path).exists()
+        else None
+    )
+    # 기존 모델은 새로 임베딩된 고객만으로 partial_fit
+    clusterer, events = cluster_ids(
+        collection,
+        ids,
+        new_ids=[str(c.id) for c in missing],
+        n_clusters=n_clusters,
+        clusterer=clusterer,
+    )
+    if model_path:
+        clusterer.save(model_path)
+    label_of = dict(zip(events["related_id"], events["cluster"]))
+    labels = [label_of.get(customer_id) for customer_id in ids]
     return labels, events
 
 
-def update_ontology_with_events(repo: OntologyRepository, events: list):
-    for e in events:
-        repo.add_event(e)
+def update_ontology_with_events(repo: OntologyRepository, events):
+    if isinstance(events, pl.DataFrame):
+        # 클러스터링이 만든 타입이 정해진 프레임이므로 검증 없이 생성
+        repo.add_events(events.select(EVENT_COLUMNS), validate=False)
+    else:
+        repo.add_events(events)
 
 
 def etl_embedding_ml_pipeline(csv_path: str, repo: OntologyRepository):
@@ -365,15 +458,24 @@ def load_data_task():
 
 @task
 def embedding_and_ontology_task(data):
-    # 데이터에서 온톨로지 객체 생성 및 임베딩
+    # 데이터에서 온톨로지 객체 생성 및 임베딩 (모델별로 묶어 배치 검증)
+    logger = get_run_logger()
+    now = datetime.utcnow()
+    groups = {Payment: [], Delivery: [], Event: []}
     for d in data:
         if "amount" in d:
-            obj = Payment(**d, timestamp=None)
+            groups[Payment].append({"timestamp": now, **d})
         elif "address" in d:
-            obj = Delivery(**d, shipped_at=None, delivered_at=None)
+            groups[Delivery].append({"shipped_at": None, "delivered_at": None, **d})
         else:
-            obj = Event(**d, timestamp=None)
-        embedding_node(obj)
+            groups[Event].append({"timestamp": now, **d})
+    objs = []
+    for model_cls, rows in groups.items():
+        valid, errors = validate_many(rows, model_cls)
+        for error in errors:
+            logger.warning(f"Skipping invalid {model_cls.__name__} row: {error}")
+        objs.extend(obj for _, obj in valid)
+    embedding_nodes(objs)
     return True
 
 
@@ -0,0 +1,94 @@
+"""Append-only Parquet lake with Hive-style partitions and DuckDB views."""
+
+import os
+import uuid
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import duckdb
+import polars as pl
+import pyarrow.parquet as pq
+
+LAKE_ROOT = os.getenv("LAKE_ROOT", "data/lake")
+DATE_PARTITION = "dt"
+
+
+def table_path(table_name: str, lake_root: Optional[str] = None) -> Path:
+    """Return the directory holding a lake table."""
+    return Path(lake_root or LAKE_ROOT) / table_name
+
+
+def write_partitioned(
+    df: pl.DataFrame,
+    table_name: str,
+    lake_root: Optional[str] = None,
+    partition_by: Optional[Sequence[str]] = None,
+    date_column: Optional[str] = None,
+    compression: str = "zstd",
+    row_group_size: int = 128_000,
+) -> List[str]:
+    """Append a frame to a lake table as new Parquet files.
+
+    Existing files are never rewritten: each call writes uniquely named files
+    into ``key=value`` partition directories, with column statistics per row
+    group so readers can also skip row groups inside a file.
+
+    Args:
+        df: Data to append.
+        table_name: Lake table (directory) name.
+        lake_root: Lake root directory. Defaults to ``LAKE_ROOT``.
+        partition_by: Columns to partition on.
+        date_column: Date/datetime column to derive a ``dt=YYYY-MM-DD``
+            partition from.
+        compression: Parquet codec.
+        row_group_size: Maximum rows per row group.
+
+    Returns:
+        Paths of the files written.
+    """
+    partition_cols = list(partition_by or [])
+    if date_column:
+        df = df.with_columns(
+            pl.col(date_column).cast(pl.Date).cast(pl.Utf8).alias(DATE_PARTITION)
+        )
+        partition_cols.insert(0, DATE_PARTITION)
+
+    root = table_path(table_name, lake_root)
+    root.mkdir(parents=True, exist_ok=True)
+    written: List[str] = []
+    pq.write_to_dataset(
+        df.to_arrow(),
+        root_path=str(root),
+        partition_cols=partition_cols or None,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        compression=compression,
+        write_statistics=True,
+        max_rows_per_group=row_group_size,
+        file_visitor=lambda f: written.append(f.path),
+    )
+    return written
+
+
+def register_lake_view(
+    conn: duckdb.DuckDBPyConnection,
+    table_name: str,
+    lake_root: Optional[str] = None,
+    view_name: Optional[str] = None,
+) -> str:
+    """Create or refresh a DuckDB view over a lake table.
+
+    Filters on partition columns in queries against the view only open the
+    matching partition directories.
+
+    Returns:
+        The view name.
+    """
+    view_name = view_name or table_name
+    pattern = (table_path(table_name, lake_root) / "**" / "*.parquet").as_posix()
+    conn.execute(
+        f"CREATE OR REPLACE VIEW {view_name} AS "
+        f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, "
+        f"union_by_name = true)"
+    )
+    return view_name
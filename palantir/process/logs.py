@@ -0,0 +1,14 @@
+"""Logging helpers for code that runs both inside and outside Prefect runs."""
+
+import logging
+
+from prefect.exceptions import MissingContextError
+from prefect.logging import get_run_logger
+
+
+def get_logger() -> logging.Logger:
+    """Return the Prefect run logger, or a module logger outside a flow run."""
+    try:
+        return get_run_logger()
+    except MissingContextError:
+        return logging.getLogger("palantir.process")
@@ -14,7 +14,7 @@ from sklearn.preprocessing import StandardScaler
 
 from ...analytics.metrics import calculate_metrics
 from ...models.llm import QueryGenerator
-from ...ontology.repository import OntologyRepository
+from ...ontology.repository import get_repository
 
 try:
     st.page("data", _("data_explorer_title"), icon="🔍")
@@ -22,7 +22,7 @@ except Exception:
     pass
 
 # Initialize components
-repo = OntologyRepository()
+repo = get_repository()
 query_gen = QueryGenerator()
 
 
@@ -17,10 +17,10 @@ from ..i18n import translate as _
 from ...analytics.forecasting import TimeSeriesForecaster
 from ...analytics.metrics import calculate_metrics
 from ...models.processors import DataEnricher, ObjectProcessor
-from ...ontology.repository import OntologyRepository
+from ...ontology.repository import get_repository
 
 # Initialize components
-repo = OntologyRepository()
+repo = get_repository()
 processor = ObjectProcessor()
 enricher = DataEnricher()
 forecaster = TimeSeriesForecaster()
@@ -445,6 +445,29 @@ def render_relationship_insights():
 
         st.plotly_chart(fig, use_container_width=True)
 
+        # Key objects from the precomputed graph metrics
+        st.markdown("#### Key Objects")
+
+        metrics = repo.graph_metrics()
+        for col, obj_type in zip(st.columns(2), (source_type, target_type)):
+            with col:
+                st.markdown(f"**{obj_type}**")
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {
+                                "id": str(node_id),
+                                "pagerank": score,
+                                "betweenness": metrics.score(node_id, "betweenness"),
+                                "degree": metrics.score(node_id, "degree"),
+                            }
+                            for node_id, score in metrics.top(
+                                "pagerank", 5, obj_type
+                            )
+                        ]
+                    )
+                )
+
         # Display insights
         st.markdown("#### Relationship Insights")
 
@@ -15,11 +15,12 @@ from networkx.algorithms import centrality
 from streamlit_agraph import Config, Edge, Node, agraph
 from ..i18n import translate as _
 
-from ...analytics.graph_metrics import calculate_graph_metrics
-from ...ontology.repository import OntologyRepository
+from ...analytics.graph_metrics import calculate_graph_metrics, type_pair_metrics
+from ...ontology.repository import get_repository
+from ...ontology.subgraph import extract_subgraph
 
 # Initialize repository
-repo = OntologyRepository()
+repo = get_repository()
 
 try:
     st.page("ontology", _("ontology_viewer_title"), icon="🕸️")
@@ -30,51 +31,60 @@ API_URL = "http://localhost:8000"
 
 
 def create_graph_data(
-    filter_types: Optional[List[str]] = None, min_weight: float = 0.0
+    filter_types: Optional[List[str]] = None,
+    max_nodes: int = 300,
+    seeds: Optional[List[str]] = None,
+    radius: int = 2,
+    rank: str = "degree",
 ) -> Tuple[List[Node], List[Edge]]:
     """Create graph visualization data from the ontology.
 
+    Only a bounded subgraph is rendered: the neighbourhood of ``seeds`` or,
+    without seeds, the top-ranked objects. Objects that do not fit are shown
+    as one cluster node per type.
+
     Args:
         filter_types: Optional list of object types to include.
-        min_weight: Minimum weight threshold for edges.
+        max_nodes: Maximum number of nodes to render.
+        seeds: Optional object IDs to centre the view on.
+        radius: Hops around the seeds.
+        rank: "degree" or "pagerank" sampling for the overview.
 
     Returns:
         Tuple of (nodes, edges) for visualization.
     """
-    nodes = []
-    edges = []
-
-    # Get all objects
-    objects = repo.search_objects()
-    if filter_types:
-        objects = [obj for obj in objects if obj["type"] in filter_types]
-
-    # Create nodes
-    for obj in objects:
-        nodes.append(
-            Node(
-                id=str(obj["id"]),
-                label=f"{obj['type']}: {obj.get('name', 'Unnamed')}",
-                size=20,
-                color=get_node_color(obj["type"]),
-                title=json.dumps(obj["properties"], indent=2),  # Hover information
-            )
-        )
+    sub = extract_subgraph(
+        repo,
+        seeds=seeds,
+        radius=radius,
+        max_nodes=max_nodes,
+        rank=rank,
+        types=filter_types,
+    )
 
-    # Get relationships
-    for obj in objects:
-        linked = repo.get_linked_objects(obj["id"])
-        for link in linked:
-            weight = float(link["relationship"].get("weight", 1.0))
-            if weight >= min_weight:
-                edges.append(
-                    Edge(
-                        source=str(obj["id"]),
-                        target=str(link["object"]["id"]),
-                        label=link["relationship"]["type"],
-                        weight=weight,
-                    )
-                )
+    nodes = [
+        Node(
+            id=node_id,
+            label=label,
+            size=20 + min(size, 30) if cluster else 20,
+            color=get_node_color(obj_type),
+            title=f"{size} objects" if cluster else node_id,  # Hover information
+        )
+        for node_id, obj_type, label, size, cluster in zip(
+            sub.ids, sub.types, sub.labels, sub.sizes, sub.clusters
+        )
+    ]
+    edges = [
+        Edge(
+            source=sub.ids[source],
+            target=sub.ids[target],
+            label=rel_type,
+            weight=float(weight),
+        )
+        for (source, target), rel_type, weight in zip(
+            sub.edges, sub.edge_types, sub.edge_weights
+        )
+    ]
 
     return nodes, edges
 
@@ -137,7 +147,7 @@ def render_graph_view():
         )
 
     with col2:
-        min_weight = st.slider("Minimum Relationship Weight", 0.0, 1.0, 0.0, 0.1)
+        max_nodes = st.slider("Maximum Nodes", 50, 2000, 300, 50)
 
     with col3:
         layout_type = st.selectbox(
@@ -145,7 +155,7 @@ def render_graph_view():
         )
 
     # Create graph data
-    nodes, edges = create_graph_data(filter_types, min_weight)
+    nodes, edges = create_graph_data(filter_types, max_nodes)
 
     # Graph configuration
     config = Config(
@@ -161,32 +171,32 @@ def render_graph_view():
     # Render graph
     agraph(nodes=nodes, edges=edges, config=config)
 
-    # Create NetworkX graph for analysis
-    G = create_networkx_graph(nodes, edges)
-
-    # Graph metrics
+    # Graph metrics (cached per graph version)
     if st.checkbox("Show Graph Metrics"):
-        st.markdown("#### Graph Metrics")
+        # 화면의 부분 그래프가 아닌 전체 저장소 기준 지표
+        st.markdown("#### Whole-Graph Metrics")
+        st.caption(
+            f"Computed over the whole repository; the view above shows "
+            f"{len(nodes)} nodes and {len(edges)} edges."
+        )
+        metrics = calculate_graph_metrics(repo)
 
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            st.metric("Nodes", G.number_of_nodes())
-            st.metric("Edges", G.number_of_edges())
+            st.metric("Total Nodes", metrics["nodes"])
+            st.metric("Total Edges", metrics["edges"])
 
         with col2:
-            st.metric("Density", f"{nx.density(G):.3f}")
-            st.metric(
-                "Average Degree",
-                f"{sum(dict(G.degree()).values()) / G.number_of_nodes():.2f}",
-            )
+            st.metric("Density", f"{metrics['density']:.3f}")
+            st.metric("Average Degree", f"{metrics['average_degree']:.2f}")
 
         with col3:
-            if nx.is_connected(G):
-                st.metric(
-                    "Average Path Length", f"{nx.average_shortest_path_length(G):.2f}"
-                )
-            st.metric("Clustering Coefficient", f"{nx.average_clustering(G):.3f}")
+            st.metric("Components", metrics["components"])
+            st.metric("Largest Component", metrics["largest_component"])
+
+        st.markdown("#### Most Central Objects (whole graph)")
+        st.dataframe(pd.DataFrame(metrics["top"]["pagerank"]))
 
 
 def render_object_details():
@@ -246,8 +256,8 @@ def render_object_details():
 
         with tab3:
             # Create local network
-            local_network = nx.ego_graph(
-                create_networkx_graph(*create_graph_data()), str(obj["id"]), radius=2
+            local_network = create_networkx_graph(
+                *create_graph_data(seeds=[str(obj["id"])], radius=2)
             )
 
             st.markdown("##### Local Network Metrics")
@@ -361,34 +371,20 @@ def render_relationship_analysis():
             )
 
         if st.button("Analyze Relationships"):
-            # Get objects of selected types
-            source_objects = repo.search_objects(obj_type=source_type)
-            target_objects = repo.search_objects(obj_type=target_type)
+            # 캐시된 인접 행렬에서 타입 쌍 관계만 추출
+            pair = type_pair_metrics(repo.graph_metrics(), source_type, target_type)
 
-            if not source_objects or not target_objects:
+            if not pair["relationships"]:
                 st.warning("Not enough data for analysis")
                 return
 
-            # Create network analysis
-            G = nx.DiGraph()
-
-            for source in source_objects:
-                for target in target_objects:
-                    links = repo.get_linked_objects(
-                        source["id"], target_id=target["id"]
-                    )
-                    if links:
-                        G.add_edge(
-                            str(source["id"]), str(target["id"]), weight=len(links)
-                        )
-
             # Calculate metrics
             st.markdown("#### Network Metrics")
 
             metrics = {
-                "Total Relationships": G.number_of_edges(),
-                "Average Degree": sum(dict(G.degree()).values()) / G.number_of_nodes(),
-                "Density": nx.density(G),
+                "Total Relationships": pair["relationships"],
+                "Average Degree": pair["average_degree"],
+                "Density": pair["density"],
             }
 
             col1, col2, col3 = st.columns(3)
@@ -397,7 +393,7 @@ def render_relationship_analysis():
                     st.metric(name, f"{value:.2f}")
 
             # Visualize relationship distribution
-            degrees = [d for _, d in G.degree()]
+            degrees = pair["degrees"]
 
             fig = go.Figure(data=[go.Histogram(x=degrees, nbinsx=10)])
             fig.update_layout(
@@ -0,0 +1,200 @@
+"""Batched, idempotent writer for Chroma collections."""
+
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("CHROMA_BATCH_SIZE", "1000"))
+
+_Scalar = (str, int, float, bool)
+
+
+def clean_metadata(meta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Drop None values and stringify types Chroma cannot store as metadata."""
+    if not meta:
+        return None
+    cleaned = {
+        str(k): v if isinstance(v, _Scalar) else str(v)
+        for k, v in meta.items()
+        if v is not None
+    }
+    return cleaned or None
+
+
+class ChromaBatchWriter:
+    """Buffer records and write them to a collection with bulk ``upsert`` calls.
+
+    Upserts make reruns idempotent: writing the same id twice replaces the
+    stored record instead of failing on a duplicate id (within a batch only
+    the last record per id is sent). A batch only holds records that supply
+    the same fields, so a record without an embedding never causes the
+    embeddings of its neighbours to be dropped. With
+    ``background=True`` full batches are written by a worker thread while the
+    caller keeps encoding; ``flush``/``close`` wait for them and re-raise any
+    write error.
+
+    Example:
+        with ChromaBatchWriter(collection, batch_size=500) as writer:
+            for doc_id, emb in zip(ids, embeddings):
+                writer.add(doc_id, embedding=emb)
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        batch_size: Optional[int] = None,
+        background: bool = False,
+        max_pending_batches: int = 4,
+    ):
+        """Initialize the writer.
+
+        Args:
+            collection: Chroma collection to write to.
+            batch_size: Records per upsert call. Defaults to ``CHROMA_BATCH_SIZE``.
+            background: Write full batches from a worker thread.
+            max_pending_batches: Queue bound for background mode, so producers
+                block instead of buffering unbounded memory.
+        """
+        self.collection = collection
+        self.batch_size = max(1, batch_size or DEFAULT_BATCH_SIZE)
+        self.written = 0
+        self._ids: List[str] = []
+        self._embeddings: List[Any] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._positions: Dict[str, int] = {}
+        self._fields: Optional[Tuple[bool, bool, bool]] = None
+        self._error: Optional[BaseException] = None
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending_batches)
+            self._worker = threading.Thread(
+                target=self._drain,
+                args=(self._queue,),
+                name="chroma-writer",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def add(
+        self,
+        id: Any,
+        embedding: Optional[Sequence[float]] = None,
+        document: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Buffer one record, writing a batch once ``batch_size`` is reached."""
+        if embedding is not None and hasattr(embedding, "tolist"):
+            embedding = embedding.tolist()
+        metadata = clean_metadata(metadata)
+        fields = (embedding is not None, document is not None, metadata is not None)
+        if self._ids and fields != self._fields:
+            # 필드 구성이 바뀌면 배치를 나눠서 기존 값이 누락되지 않게 함
+            self._submit()
+        self._fields = fields
+        record_id = str(id)
+        position = self._positions.get(record_id)
+        if position is not None:
+            # 같은 배치 안의 중복 id는 마지막 레코드만 유지
+            self._embeddings[position] = embedding
+            self._documents[position] = document
+            self._metadatas[position] = metadata
+            return
+        self._positions[record_id] = len(self._ids)
+        self._ids.append(record_id)
+        self._embeddings.append(embedding)
+        self._documents.append(document)
+        self._metadatas.append(metadata)
+        if len(self._ids) >= self.batch_size:
+            self._submit()
+
+    def add_many(
+        self,
+        ids: Sequence[Any],
+        embeddings: Optional[Sequence[Any]] = None,
+        documents: Optional[Sequence[str]] = None,
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> None:
+        """Buffer many records given as parallel sequences."""
+        for i, record_id in enumerate(ids):
+            self.add(
+                record_id,
+                embedding=embeddings[i] if embeddings is not None else None,
+                document=documents[i] if documents is not None else None,
+                metadata=metadatas[i] if metadatas is not None else None,
+            )
+
+    def flush(self) -> None:
+        """Write buffered records and wait for background batches to finish."""
+        if self._ids:
+            self._submit()
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        """Flush and stop the background worker."""
+        try:
+            self.flush()
+        finally:
+            if self._queue is not None and self._worker is not None:
+                self._queue.put(None)
+                self._worker.join()
+                self._queue = None
+                self._worker = None
+
+    def __enter__(self) -> "ChromaBatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _submit(self) -> None:
+        batch = self._take_batch()
+        if self._queue is None:
+            self._write(batch)
+        else:
+            self._raise_pending_error()
+            self._queue.put(batch)
+
+    def _take_batch(self) -> Dict[str, Any]:
+        batch: Dict[str, Any] = {"ids": self._ids}
+        # 배치 내 레코드는 모두 같은 필드를 가짐 (add에서 보장)
+        has_embedding, has_document, has_metadata = self._fields or (False, False, False)
+        if has_embedding:
+            batch["embeddings"] = self._embeddings
+        if has_document:
+            batch["documents"] = self._documents
+        if has_metadata:
+            batch["metadatas"] = self._metadatas
+        self._ids, self._embeddings, self._documents, self._metadatas = [], [], [], []
+        self._positions = {}
+        return batch
+
+    def _write(self, batch: Dict[str, Any]) -> None:
+        self.collection.upsert(**batch)
+        self.written += len(batch["ids"])
+        logger.debug("Upserted %d records to Chroma", len(batch["ids"]))
+
+    def _drain(self, pending: queue.Queue) -> None:
+        while True:
+            batch = pending.get()
+            try:
+                if batch is None:
+                    return
+                if self._error is None:
+                    self._write(batch)
+            except BaseException as e:  # noqa: BLE001 - surfaced on flush
+                self._error = e
+            finally:
+                pending.task_done()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background Chroma write failed") from error
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Micro-benchmark: per-object cost of rebuilding stored ontology objects.
+
+Compares full validation (``Model(**data)``, what ``get_object`` used to do)
+with the trusted fast path (``trusted_loader``), for a few models and for
+``OntologyRepository.get_object`` with the LRU cache disabled.
+
+    python scripts/bench_hydration.py [--n 20000]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from palantir.ontology.objects import Customer, Order, Product  # noqa: E402
+from palantir.ontology.repository import OntologyRepository  # noqa: E402
+from palantir.ontology.validation import trusted_loader  # noqa: E402
+
+
+def samples():
+    customer = Customer(email="kim@example.com", name="Kim", phone="010-0000-0000")
+    product = Product(name="Lamp", price=Decimal("19.90"), sku="L-1",
+                      category="home", tags=["light", "desk"])
+    order = Order(customer_id=customer.id, total_amount=Decimal("39.80"),
+                  items=[{"product_id": str(product.id), "quantity": 2,
+                          "price": Decimal("19.90")}],
+                  shipping_address="Seoul", order_date=datetime(2024, 1, 1))
+    return [customer, product, order]
+
+
+def per_object_us(fn, n: int) -> float:
+    return min(timeit.repeat(fn, number=n, repeat=3)) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'validate (us)':>14}{'trusted (us)':>14}{'speedup':>9}")
+    for obj in samples():
+        cls, data = type(obj), obj.model_dump()
+        load = trusted_loader(cls)
+        assert load(data) == cls(**data)
+        before = per_object_us(lambda: cls(**data), args.n)
+        after = per_object_us(lambda: load(data), args.n)
+        print(f"{cls.__name__:<28}{before:>14.2f}{after:>14.2f}{before / after:>8.1f}x")
+
+    repo = OntologyRepository(cache_size=0)
+    objects = samples()
+    for obj in objects:
+        repo.add_object(obj)
+    ids = [obj.id for obj in objects]
+    node_data = [(type(o), repo.store.get_node(o.id)["data"]) for o in objects]
+    before = per_object_us(
+        lambda: [cls(**data) for cls, data in node_data], args.n // 3
+    ) / len(ids)
+    after = per_object_us(lambda: [repo.get_object(i) for i in ids], args.n // 3) / len(ids)
+    print(f"{'repo.get_object (no cache)':<28}{before:>14.2f}{after:>14.2f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import polars as pl
+
+from palantir.ontology.base import OntologyLink, OntologyObject
+from palantir.ontology.objects import Customer, Order, Product
+from palantir.ontology.repository import OntologyRepository
+
+
+def build_shop():
+    repo = OntologyRepository()
+    customer = Customer(email='kim@example.com', name='Kim')
+    product = Product(name='Lamp', price=Decimal('19.90'), sku='L-1',
+                      category='home', tags=['light'])
+    order = Order(customer_id=customer.id, total_amount=Decimal('19.90'),
+                  status='shipped', shipping_address='Seoul',
+                  items=[{'product_id': product.id, 'quantity': 2,
+                          'price': Decimal('19.90')}])
+    loose = OntologyObject(type='Note', properties={'text': 'unlinked'})
+    repo.add_objects([customer, product, order, loose], validate=False)
+    repo.add_link(OntologyLink(source_id=customer.id, target_id=order.id,
+                               relationship_type='PLACED'))
+    repo.add_link(OntologyLink(source_id=order.id, target_id=product.id,
+                               relationship_type='CONTAINS', properties={'qty': 1}))
+    return repo, customer, product, order
+
+
+def test_round_trip_rebuilds_store_and_indexes(tmp_path):
+    repo, customer, product, order = build_shop()
+    manifest = repo.export_arrow(str(tmp_path / 'snap'))
+    assert {t: info['rows'] for t, info in manifest['types'].items()} == {
+        'Customer': 1, 'Product': 1, 'Order': 1, 'Note': 1}
+    assert manifest['links']['rows'] == 2
+
+    # 분석 도구에서 바로 읽을 수 있는 평평한 테이블
+    orders = pl.read_ipc(tmp_path / 'snap' / manifest['types']['Order']['file'])
+    assert orders['customer_id'].to_list() == [str(customer.id)]
+    assert orders['total_amount'].to_list() == [Decimal('19.90')]
+    links = pl.read_ipc(tmp_path / 'snap' / 'links.arrow')
+    assert sorted(links['_type'].to_list()) == ['CONTAINS', 'PLACED']
+
+    copy = OntologyRepository.open(str(tmp_path / 'db'))
+    copy.add_object(OntologyObject(type='Stale'))
+    copy.import_arrow(str(tmp_path / 'snap'))
+    assert copy.search_objects('Stale') == []
+    assert copy.get_object(order.id) == order
+    assert copy.get_object(order.id).calculate_total() == Decimal('39.80')
+    assert copy.get_object(product.id).tags == ['light']
+    assert [n['id'] for n in copy.search_objects('Order', {'status': 'shipped'})] == [order.id]
+    assert [other for other, _ in copy.store.neighbors(order.id, 'out')] == [product.id]
+    copy.close()
+
+    reopened = OntologyRepository.open(str(tmp_path / 'db'))
+    assert reopened.get_object(customer.id) == customer
+    assert reopened.store.number_of_edges() == 2
+    reopened.close()
+
+
+def test_filtered_export_keeps_only_internal_links(tmp_path):
+    repo, customer, product, order = build_shop()
+    manifest = repo.export_arrow(str(tmp_path), node_ids=[customer.id, order.id])
+    assert set(manifest['types']) == {'Customer', 'Order'}
+    assert manifest['links']['rows'] == 1
+
+    copy = OntologyRepository(backend='compact')
+    copy.import_arrow(str(tmp_path))
+    assert copy.get_object(order.id) == order
+    assert [other for other, _ in copy.store.neighbors(customer.id, 'out')] == [order.id]
+
+    typed = repo.export_arrow(str(tmp_path / 'products'), types=['Product'],
+                              compression='zstd')
+    assert set(typed['types']) == {'Product'} and typed['links']['rows'] == 0
+
+
+def test_nested_values_keep_their_types(tmp_path):
+    repo = OntologyRepository()
+    note = OntologyObject(type='Note', properties={
+        'refs': [uuid4()], 'when': {'at': datetime(2024, 6, 10, 12, 0)},
+        'labels': {'a'}, 'plain': {'$date': 'not a date'}})
+    repo.add_object(note)
+    repo.export_arrow(str(tmp_path))
+    copy = OntologyRepository()
+    copy.import_arrow(str(tmp_path))
+    assert copy.get_object(note.id).properties == note.properties
@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from palantir.ontology.base import OntologyLink, OntologyObject
+from palantir.ontology.changes import Change, ChangeFeed, ChangeGap, RedisStreamBridge
+from palantir.ontology.repository import OntologyRepository
+
+
+def test_repository_publishes_sequenced_changes(tmp_path):
+    repo = OntologyRepository()
+    orders = repo.changes.subscribe(types=['Order'])
+    seen = []
+    repo.changes.subscribe(callback=seen.append)
+
+    customer = OntologyObject(type='Customer')
+    order = OntologyObject(type='Order')
+    repo.add_objects([customer, order])
+    repo.add_link(OntologyLink(source_id=customer.id, target_id=order.id,
+                               relationship_type='PLACED'))
+    repo.delete_object(order.id)
+
+    assert [(c.seq, c.op) for c in seen] == [(1, 'add_nodes'), (2, 'add_edge'),
+                                           (3, 'remove_node')]
+    assert seen[0].types == ('Customer', 'Order')
+    assert seen[2].deleted and seen[2].types == ('Order',)
+    # 타입 필터: 링크 변경은 타입이 없으므로 전달됨
+    assert [c.seq for c in orders.poll()] == [1, 2, 3]
+    assert orders.get(timeout=0) is None
+    assert [c.seq for c in repo.changes.since(1)] == [2, 3]
+
+    durable = OntologyRepository.open(str(tmp_path))
+    durable.add_object(OntologyObject(type='Customer'))
+    durable.close()
+    reopened = OntologyRepository.open(str(tmp_path))
+    assert reopened.changes.head == 1 and reopened.changes.since(1) == []
+    with pytest.raises(ChangeGap):
+        reopened.changes.since(0)
+    reopened.close()
+
+
+def test_ring_buffers_drop_oldest_and_history_reports_gaps():
+    feed = ChangeFeed(history=2)
+    slow = feed.subscribe(capacity=2)
+    for seq in range(1, 5):
+        feed.publish(Change(seq, 'add_node', objects=(seq,), types=('Order',)))
+
+    assert [c.seq for c in slow.poll()] == [3, 4] and slow.dropped == 2
+    assert [c.seq for c in feed.since(2)] == [3, 4]
+    with pytest.raises(ChangeGap):
+        feed.since(1)
+    slow.close()
+    feed.publish(Change(5, 'add_node'))
+    assert slow.poll() == []
+
+
+class FakeRedis:
+    def __init__(self):
+        self.entries = []
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        self.entries.append((f'{len(self.entries) + 1}-0', fields))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def xread(self, streams, count=None, block=None):
+        (stream, last_id), = streams.items()
+        after = int(last_id.split('-')[0])
+        return [(stream, self.entries[after:after + count])]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client, self.queued = client, []
+
+    def xadd(self, *args, **kwargs):
+        self.queued.append((args, kwargs))
+
+    def execute(self):
+        self.client.round_trips = getattr(self.client, 'round_trips', 0) + 1
+        for args, kwargs in self.queued:
+            self.client.xadd(*args, **kwargs)
+
+
+def test_redis_bridge_round_trips_changes():
+    feed = ChangeFeed()
+    client = FakeRedis()
+    bridge = RedisStreamBridge(feed, client=client)
+    feed.publish(Change(1, 'add_edge', objects=('a', 'b'), links=('k',)))
+    assert bridge.flush(timeout=5)
+
+    consumer = RedisStreamBridge(client=client)
+    [(entry_id, change)] = consumer.read()
+    assert entry_id == '1-0'
+    assert change.seq == 1 and change.objects == ('a', 'b') and change.links == ('k',)
+    assert consumer.read(last_id=entry_id) == []
+
+
+def test_redis_bridge_does_not_block_writers():
+    import threading
+
+    class SlowRedis(FakeRedis):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+
+        def xadd(self, *args, **kwargs):
+            self.release.wait(5)
+            super().xadd(*args, **kwargs)
+
+    feed = ChangeFeed()
+    client = SlowRedis()
+    bridge = RedisStreamBridge(feed, client=client, batch_size=100)
+    for seq in range(1, 51):
+        feed.publish(Change(seq, 'add_node'))  # Redis가 멈춰 있어도 바로 반환
+    assert client.entries == []
+    client.release.set()
+    assert bridge.flush(timeout=5)
+    assert [json.loads(f['change'])['seq'] for _, f in client.entries] == list(range(1, 51))
+    assert client.round_trips <= 2
+    bridge.close()
+    feed.publish(Change(51, 'add_node'))
+    assert len(client.entries) == 50
+
+
+def test_redis_bridge_counts_failed_writes():
+    class DownPipeline(FakePipeline):
+        def execute(self):
+            raise ConnectionError('down')
+
+    class DownRedis(FakeRedis):
+        down = True
+
+        def pipeline(self, transaction=True):
+            return DownPipeline(self) if self.down else FakePipeline(self)
+
+    feed = ChangeFeed()
+    client = DownRedis()
+    bridge = RedisStreamBridge(feed, client=client)
+    feed.publish(Change(1, 'add_node'))
+    assert bridge.flush(timeout=5)
+    assert bridge.forwarded == 0 and bridge.failed == 1
+
+    client.down = False
+    feed.publish(Change(2, 'add_node'))
+    assert bridge.flush(timeout=5)
+    assert bridge.forwarded == 2 and bridge.failed == 1
+    bridge.close()
@@ -0,0 +1,56 @@
+import pytest
+
+from palantir.utils.chroma_writer import ChromaBatchWriter
+
+
+class FakeCollection:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.batches = []
+        self.records = {}
+        self.fail = fail
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        if self.fail:
+            raise ValueError("boom")
+        assert len(set(ids)) == len(ids)
+        self.calls.append(len(ids))
+        self.batches.append({"ids": ids, "embeddings": embeddings})
+        for i, record_id in enumerate(ids):
+            self.records[record_id] = documents[i] if documents else None
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_writer_batches_and_upserts(background):
+    coll = FakeCollection()
+    with ChromaBatchWriter(coll, batch_size=3, background=background) as writer:
+        writer.add_many(
+            list(range(7)), documents=[f"d{i}" for i in range(7)], metadatas=None
+        )
+        writer.add(0, document="again")
+
+    assert coll.calls == [3, 3, 2]
+    assert writer.written == 8
+    assert len(coll.records) == 7
+    assert coll.records["0"] == "again"
+
+
+def test_background_error_surfaces_on_close():
+    writer = ChromaBatchWriter(FakeCollection(fail=True), batch_size=1, background=True)
+    writer.add("a", document="x")
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_mixed_fields_split_batches_and_duplicates_keep_last():
+    coll = FakeCollection()
+    with ChromaBatchWriter(coll, batch_size=10) as writer:
+        writer.add("a", embedding=[1.0], document="a")
+        writer.add("b", embedding=[2.0], document="b")
+        writer.add("a", embedding=[3.0], document="a2")
+        writer.add("c", document="c")
+
+    assert coll.calls == [2, 1]
+    assert coll.batches[0]["embeddings"] == [[3.0], [2.0]]
+    assert coll.batches[1]["embeddings"] is None
+    assert coll.records == {"a": "a2", "b": "b", "c": "c"}
@@ -0,0 +1,64 @@
+import numpy as np
+
+from palantir.process.clustering import (IncrementalClusterer, cluster_ids,
+                                         cluster_stored_embeddings)
+
+
+class FakeCollection:
+    def __init__(self, embeddings):
+        self.ids = [f"c{i}" for i in range(len(embeddings))]
+        self.embeddings = embeddings
+
+    def get(self, ids=None, include=None, limit=None, offset=0):
+        if ids is not None:
+            found = [i for i in ids if i in self.ids]
+            return {"ids": found,
+                    "embeddings": [self.embeddings[self.ids.index(i)] for i in found]}
+        end = offset + limit
+        return {
+            "ids": self.ids[offset:end],
+            "embeddings": self.embeddings[offset:end],
+        }
+
+
+def _blobs():
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0], [10.0, 10.0]])
+    return np.vstack([c + rng.normal(size=(50, 2)) for c in centers])
+
+
+def test_cluster_stored_embeddings_pages_and_events():
+    coll = FakeCollection(_blobs())
+    clusterer, events = cluster_stored_embeddings(coll, n_clusters=2, page_size=7)
+
+    assert events.height == 100
+    assert set(events.columns) >= {"id", "type", "related_id", "description"}
+    first, second = events["cluster"][:50], events["cluster"][50:]
+    assert first.n_unique() == 1 and second.n_unique() == 1
+    assert first[0] != second[0]
+    assert clusterer.is_fitted
+
+
+def test_incremental_clusterer_save_and_resume(tmp_path):
+    clusterer = IncrementalClusterer(n_clusters=2).partial_fit(_blobs())
+    path = tmp_path / "model.pkl"
+    clusterer.save(str(path))
+
+    resumed = IncrementalClusterer.load(str(path)).partial_fit(_blobs()[:10])
+    assert resumed.model.n_steps_ > clusterer.model.n_steps_
+
+
+def test_cluster_ids_labels_requested_ids_and_updates_with_new_only():
+    blobs = _blobs()
+    coll = FakeCollection(blobs[:80])
+    clusterer, events = cluster_ids(coll, ["c0", "c60", "missing"], n_clusters=2)
+    assert events["related_id"].to_list() == ["c0", "c60"]
+    assert events["cluster"][0] != events["cluster"][1]
+    steps = clusterer.model.n_steps_
+
+    coll.ids += [f"c{i}" for i in range(80, 100)]
+    coll.embeddings = blobs
+    clusterer, events = cluster_ids(coll, ["c90"], new_ids=coll.ids[80:],
+                                    clusterer=clusterer)
+    assert clusterer.model.n_steps_ == steps + 1
+    assert events["related_id"].to_list() == ["c90"]
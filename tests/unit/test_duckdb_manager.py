@@ -0,0 +1,107 @@
+import threading
+
+import duckdb
+import pytest
+
+from palantir.process import db as db_module
+from palantir.process.db import DuckDBConnectionManager, get_duckdb_connection, read_table
+
+
+def test_shared_instance_and_per_thread_cursors(tmp_path):
+    manager = DuckDBConnectionManager(threads=2, memory_limit="256MB")
+    db = str(tmp_path / "warm.duckdb")
+
+    cur = manager.cursor(db)
+    assert manager.cursor(db) is cur
+    cur.execute("CREATE TABLE t AS SELECT 42 AS x")
+
+    seen = {}
+
+    def reader():
+        other = manager.cursor(db, read_only=True)
+        seen["cursor"] = other
+        seen["value"] = other.execute("SELECT x FROM t").fetchone()[0]
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join()
+
+    assert seen["value"] == 42
+    assert seen["cursor"] is not cur
+    assert manager.database(db) is manager.database(db, read_only=True)
+    manager.close_all()
+
+
+def test_read_only_instance_upgrades_for_writers(tmp_path):
+    db = str(tmp_path / "ro.duckdb")
+    setup = DuckDBConnectionManager()
+    setup.cursor(db).execute("CREATE TABLE t (x INTEGER)")
+    setup.close_all()
+
+    manager = DuckDBConnectionManager()
+    reader = manager.database(db, read_only=True)
+    writer = manager.database(db)
+    assert writer is not reader
+    manager.cursor(db).execute("INSERT INTO t VALUES (1)")
+    assert manager.cursor(db, read_only=True).execute(
+        "SELECT count(*) FROM t"
+    ).fetchone() == (1,)
+    manager.close_all()
+
+
+def test_upgrade_waits_for_leases_on_read_only_instance(tmp_path):
+    db = str(tmp_path / "lease.duckdb")
+    setup = DuckDBConnectionManager()
+    setup.cursor(db).execute("CREATE TABLE t AS SELECT 1 AS x")
+    setup.close_all()
+
+    manager = DuckDBConnectionManager()
+    leased, release, done = threading.Event(), threading.Event(), []
+
+    def reader():
+        with manager.lease(db, read_only=True) as (cur, writable):
+            assert not writable
+            leased.set()
+            release.wait(5)
+            done.append(cur.execute("SELECT x FROM t").fetchone()[0])
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    leased.wait(5)
+    upgraded = []
+    writer = threading.Thread(target=lambda: upgraded.append(manager.database(db)))
+    writer.start()
+    writer.join(0.2)
+    assert upgraded == []  # 읽기 lease가 끝날 때까지 대기
+    release.set()
+    thread.join()
+    writer.join()
+    assert done == [1] and upgraded
+
+    manager.close_all()
+
+    manager.database(db, read_only=True)
+    with manager.lease(db, read_only=True):
+        with pytest.raises(RuntimeError):
+            manager.database(db)
+    manager.close_all()
+
+
+def test_connection_restores_schema_and_guards_read_only(tmp_path, monkeypatch):
+    db = str(tmp_path / "schema.duckdb")
+    monkeypatch.setattr(db_module, "connection_manager", DuckDBConnectionManager())
+    with get_duckdb_connection(db) as conn:
+        conn.execute("CREATE SCHEMA staging")
+        conn.execute("CREATE TABLE staging.t AS SELECT 7 AS x")
+    with get_duckdb_connection(db, schema="staging") as conn:
+        assert conn.execute("SELECT x FROM t").fetchone() == (7,)
+    with get_duckdb_connection(db) as conn:
+        assert conn.execute("SELECT current_schema()").fetchone() == ("main",)
+
+    with pytest.raises(duckdb.Error):
+        with get_duckdb_connection(db, read_only=True) as conn:
+            conn.execute("CREATE TABLE main.u (x INTEGER)")
+    assert read_table("t", db_path=db, schema="staging")["x"].to_list() == [7]
+    with pytest.raises(ValueError):
+        read_table("t; DROP TABLE t", db_path=db)
+    db_module.connection_manager.close_all()
@@ -0,0 +1,124 @@
+import threading
+
+from palantir.ontology.embedding_refresh import EmbeddingRefreshWorker, embedding_text
+from palantir.ontology.objects import Customer
+from palantir.ontology.repository import OntologyRepository
+
+
+class FakeCollection:
+    def __init__(self):
+        self.records = {}
+        self.upserts = 0
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self.upserts += 1
+        for i, record_id in enumerate(ids):
+            self.records[record_id] = (embeddings[i], documents[i], metadatas[i])
+
+    def delete(self, ids):
+        for record_id in ids:
+            self.records.pop(record_id, None)
+
+    def get(self, ids, include=None):
+        found = [i for i in ids if i in self.records]
+        return {'ids': found, 'metadatas': [self.records[i][2] for i in found]}
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+def test_only_changed_text_is_re_embedded_in_batches():
+    repo = OntologyRepository()
+    collection, embed = FakeCollection(), FakeEmbedder()
+    worker = EmbeddingRefreshWorker(repo.embeddings, embed=embed,
+                                    collection=collection, batch_size=2)
+    customers = [Customer(email=f'c{i}@example.com', name=f'C{i}') for i in range(3)]
+    repo.add_objects(customers)
+    assert len(repo.embeddings) == 3
+
+    assert worker.run_once() == {'embedded': 3, 'deleted': 0, 'skipped': 0}
+    assert [len(c) for c in embed.calls] == [2, 1]
+    assert collection.records[str(customers[0].id)][1] == 'C0'
+    assert len(repo.embeddings) == 0
+
+    # 텍스트가 아닌 필드 변경은 재임베딩 대상이 아님
+    repo.update_object(customers[0].model_copy(update={'phone': '010'}))
+    assert len(repo.embeddings) == 0
+    repo.update_object(customers[1].model_copy(update={'name': 'Renamed'}))
+    repo.delete_object(customers[2].id)
+    assert worker.run_once() == {'embedded': 1, 'deleted': 1, 'skipped': 0}
+    assert embed.calls[-1] == ['Renamed']
+    assert str(customers[2].id) not in collection.records
+
+
+def test_restart_skips_vectors_that_are_already_current():
+    collection, embed = FakeCollection(), FakeEmbedder()
+    customer = Customer(email='a@example.com', name='A')
+    first = OntologyRepository()
+    first.add_object(customer)
+    EmbeddingRefreshWorker(first.embeddings, embed=embed, collection=collection).run_once()
+
+    second = OntologyRepository()
+    second.add_object(customer)
+    worker = EmbeddingRefreshWorker(second.embeddings, embed=embed, collection=collection)
+    assert worker.run_once() == {'embedded': 0, 'deleted': 0, 'skipped': 1}
+    assert len(embed.calls) == 1
+
+
+def test_background_worker_refreshes_when_threshold_is_hit():
+    repo = OntologyRepository()
+    collection = FakeCollection()
+    done = threading.Event()
+
+    def embed(texts):
+        done.set()
+        return [[0.0] for _ in texts]
+
+    worker = repo.start_embedding_refresh(embed=embed, collection=collection,
+                                          threshold=2, interval=60)
+    try:
+        repo.add_object(Customer(email='a@example.com', name='A'))
+        repo.add_object(Customer(email='b@example.com', name='B'))
+        assert done.wait(5)
+    finally:
+        worker.stop(timeout=5)
+    assert len(collection.records) == 2
+    assert embedding_text({'properties': {'description': 'x'}}) == 'x'
+    assert embedding_text({'type': 'Order'}) is None
+
+
+def test_refresh_options_apply_even_with_a_background_worker():
+    repo = OntologyRepository()
+    collection, embed = FakeCollection(), FakeEmbedder()
+    repo.start_embedding_refresh(embed=embed, collection=collection, interval=60)
+    repo.embedding_worker.stop(timeout=5)
+    repo.add_objects([Customer(email=f'c{i}@example.com', name=f'C{i}') for i in range(3)])
+
+    # 옵션이 있으면 일회성 워커로, 임베더·컬렉션은 백그라운드 워커 것을 재사용
+    assert repo.refresh_embeddings(limit=2, batch_size=1)['embedded'] == 2
+    assert [len(c) for c in embed.calls] == [1, 1]
+    assert repo.refresh_embeddings() == {'embedded': 1, 'deleted': 0, 'skipped': 0}
+    assert len(collection.records) == 3 and len(repo.embeddings) == 0
+
+
+def test_tracking_starts_on_first_use_and_reads_text_at_refresh():
+    repo = OntologyRepository()
+    customers = [Customer(email=f'c{i}@example.com', name=f'C{i}') for i in range(2)]
+    repo.add_objects(customers)
+    assert repo._embeddings is None  # 새로고침을 쓰지 않으면 추적 비용 없음
+
+    collection, embed = FakeCollection(), FakeEmbedder()
+    worker = EmbeddingRefreshWorker(repo.embeddings, embed=embed, collection=collection)
+    assert len(repo.embeddings) == 2 and not worker.trigger()
+    assert all(len(entry) == 3 for _, entry in repo.embeddings.pending())
+
+    repo.update_object(customers[0].model_copy(update={'name': 'Late'}))
+    assert worker.run_once() == {'embedded': 2, 'deleted': 0, 'skipped': 0}
+    assert sorted(embed.calls[0]) == ['C1', 'Late']
+    assert len(repo.embeddings) == 0
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from palantir.ontology.events import EventIndex
+
+
+def _event(related, kind, ts):
+    return {"id": f"{related}-{kind}-{ts:%H%M}", "type": kind,
+            "related_id": related, "timestamp": ts}
+
+
+def test_event_index_range_and_last_n():
+    base = datetime(2024, 6, 1, 12, 0)
+    index = EventIndex()
+    events = [
+        _event("o1", "created", base + timedelta(minutes=2)),
+        _event("o1", "paid", base + timedelta(minutes=1)),  # out of order
+        _event("o1", "shipped", base + timedelta(minutes=5)),
+        _event("o2", "paid", base + timedelta(minutes=3)),
+        _event("o2", "paid", base),  # ts must not be parsed from this id
+    ]
+    for i, event in enumerate(events):
+        index.add(f"e{i}", event, "Event")
+    index.add("x", events[0], "Order")  # other types are ignored
+
+    assert index.scan("o1") == ["e1", "e0", "e2"]
+    assert index.scan("o1", start=base + timedelta(minutes=2),
+                      end=(base + timedelta(minutes=5)).isoformat()) == ["e0", "e2"]
+    assert index.scan(event_type="paid", limit=2, reverse=True) == ["e3", "e1"]
+    assert index.scan("o2", "paid", limit=1) == ["e4"]
+    assert index.scan(limit=2) == ["e4", "e1"]
+    assert index.recent(days=1, now=base + timedelta(hours=1), related_id="o2") == ["e4", "e3"]
+
+    index.remove("e1", events[1], "Event")
+    assert index.scan("o1") == ["e0", "e2"]
+    assert index.scan(event_type="paid") == ["e4", "e3"]
+    assert index.scan("missing") == []
@@ -0,0 +1,62 @@
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from palantir.analytics.graph_metrics import calculate_graph_metrics, type_pair_metrics
+from palantir.ontology.analytics import betweenness, connected_components, undirected
+from palantir.ontology.base import OntologyLink, OntologyObject
+from palantir.ontology.repository import OntologyRepository
+
+
+def test_betweenness_matches_networkx():
+    graph = nx.gnm_random_graph(40, 90, seed=3, directed=True)
+    matrix = sp.csr_matrix(nx.to_scipy_sparse_array(graph, nodelist=range(40)))
+
+    expected = expected_directed = nx.betweenness_centrality(graph)
+    np.testing.assert_allclose(
+        betweenness(matrix, batch=7), [expected[i] for i in range(40)], atol=1e-12
+    )
+    expected = nx.betweenness_centrality(graph.to_undirected())
+    np.testing.assert_allclose(
+        betweenness(undirected(matrix)), [expected[i] for i in range(40)], atol=1e-12
+    )
+    assert betweenness(undirected(matrix), samples=10).shape == (40,)
+    # 메모리 한도가 작으면 배치가 줄어들 뿐 결과는 같음
+    np.testing.assert_allclose(
+        betweenness(matrix, max_bytes=1), [expected_directed[i] for i in range(40)],
+        atol=1e-12,
+    )
+
+    count, labels = connected_components(matrix)
+    assert count == nx.number_weakly_connected_components(graph)
+    assert len(set(labels)) == count
+
+
+def test_graph_metrics_are_cached_per_graph_version():
+    repo = OntologyRepository(backend='compact')
+    customers = [OntologyObject(type='Customer') for _ in range(2)]
+    orders = [OntologyObject(type='Order') for _ in range(3)]
+    repo.add_objects([*customers, *orders])
+    repo.add_links([
+        OntologyLink(source_id=customers[0].id, target_id=orders[0].id, relationship_type='PLACED'),
+        OntologyLink(source_id=customers[0].id, target_id=orders[1].id, relationship_type='PLACED'),
+        OntologyLink(source_id=customers[1].id, target_id=orders[2].id, relationship_type='PLACED'),
+    ])
+
+    metrics = repo.graph_metrics()
+    assert repo.graph_metrics() is metrics
+    assert metrics.n_components == 2 and metrics.n_edges == 3
+    assert metrics.top('degree', 1) == [(customers[0].id, 2.0)]
+    assert {n for n, _ in metrics.top('pagerank', 3, 'Customer')} == {c.id for c in customers}
+
+    pair = type_pair_metrics(metrics, 'Customer', 'Order')
+    assert pair['relationships'] == 3 and sorted(pair['degrees']) == [1, 1, 1, 1, 2]
+
+    repo.add_link(OntologyLink(source_id=orders[1].id, target_id=customers[1].id,
+                               relationship_type='REFERRED'))
+    updated = repo.graph_metrics()
+    assert updated is not metrics and updated.n_components == 1
+
+    summary = calculate_graph_metrics(repo, top_k=2)
+    assert summary['nodes'] == 5 and summary['edges'] == 4
+    assert summary['top']['betweenness'][0]['type'] in ('Customer', 'Order')
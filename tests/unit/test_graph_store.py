@@ -0,0 +1,98 @@
+import uuid
+
+import pytest
+
+from palantir.ontology.graph_store import CompactStore, NetworkXStore
+
+
+def _node(obj_type, **data):
+    return {"type": obj_type, "model": obj_type, "data": data,
+            "created_at": None, "updated_at": None}
+
+
+def _edge(rel, key, source, target):
+    data = {"id": key, "source_id": source, "target_id": target,
+            "relationship_type": rel, "properties": {}, "created_at": None}
+    return {"type": rel, "data": data, "created_at": None}
+
+
+@pytest.mark.parametrize("store_cls", [NetworkXStore, CompactStore])
+def test_stores_agree_on_nodes_and_edges(store_cls):
+    store = store_cls()
+    if isinstance(store, CompactStore):
+        store.min_rebuild = 2  # exercise CSR rebuilds alongside the delta
+    ids = [uuid.uuid4() for _ in range(4)]
+    for i, node_id in enumerate(ids):
+        store.add_node(node_id, _node("Order", id=node_id, n=i))
+    keys = []
+    for source, target in [(0, 1), (0, 2), (1, 2), (2, 2), (3, 0)]:
+        key = uuid.uuid4()
+        keys.append(key)
+        store.add_edge(ids[source], ids[target], key,
+                       _edge("NEXT", key, ids[source], ids[target]))
+
+    assert store.get_node(ids[1])["data"]["n"] == 1
+    assert [t for t, _, _ in store.out_edges(ids[0])] == [ids[1], ids[2]]
+    assert sorted(map(str, (s for s, _, _ in store.in_edges(ids[2])))) == sorted(
+        map(str, [ids[0], ids[1], ids[2]])
+    )
+    _, key, attrs = next(iter(store.out_edges(ids[3])))
+    assert key == keys[4] and attrs["data"]["target_id"] == ids[0]
+
+    store.update_node(ids[1], _node("Order", id=ids[1], n=10))
+    assert store.get_node(ids[1])["data"]["n"] == 10
+    store.remove_node(ids[2])
+    assert not store.has_node(ids[2])
+    assert store.number_of_nodes() == 3 and store.number_of_edges() == 2
+    assert [t for t, _, _ in store.out_edges(ids[0])] == [ids[1]]
+    assert store.to_networkx().number_of_edges() == 2
+
+
+def test_compact_store_csr_and_interning():
+    store = CompactStore()
+    ids = [str(i) for i in range(3)]
+    for node_id in ids:
+        store.add_node(node_id, _node("Product", id=node_id, category="a"))
+    store.add_edge("0", "2", "k1", _edge("SIMILAR", "k1", "0", "2"))
+    store.add_edge("1", "2", "k2", _edge("SIMILAR", "k2", "1", "2"))
+
+    indptr, neighbours, _ = store.csr("in")
+    assert indptr.tolist() == [0, 0, 0, 2]
+    assert sorted(neighbours.tolist()) == [0, 1]
+    assert len(store._types.values) == 1 and len(store._rels.values) == 1
+    assert store.node_type("1") == "Product"
+
+
+def test_compact_store_reads_stay_consistent_during_rebuilds():
+    import threading
+
+    store = CompactStore(rebuild_ratio=0.0, min_rebuild=1)
+    hub = uuid.uuid4()
+    store.add_node(hub, _node("Customer"))
+    leaves = [uuid.uuid4() for _ in range(300)]
+    for leaf in leaves:
+        store.add_node(leaf, _node("Order"))
+    errors, seen = [], []
+    done = threading.Event()
+
+    def reader():
+        try:
+            while not done.is_set():
+                out = [other for other, _ in store.neighbors(hub)]
+                # 읽는 도중 재구성이 일어나도 중복/누락 없이 앞부분 그대로
+                assert out == leaves[:len(out)]
+                seen.append(len(out))
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for leaf in leaves:
+        store.add_edge(hub, leaf, uuid.uuid4(), _edge("PLACED", None, hub, leaf))
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == [] and seen
+    assert [other for other, _ in store.neighbors(hub)] == leaves
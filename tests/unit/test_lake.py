@@ -0,0 +1,35 @@
+from datetime import date
+
+import duckdb
+import polars as pl
+
+from palantir.process.lake import register_lake_view, write_partitioned
+
+
+def test_append_only_partitioned_writes_and_view(tmp_path):
+    day1 = pl.DataFrame(
+        {"order_date": [date(2024, 1, 1)] * 2, "region": ["kr", "us"], "v": [1, 2]}
+    )
+    day2 = pl.DataFrame(
+        {"order_date": [date(2024, 1, 2)], "region": ["kr"], "v": [3]}
+    )
+    first = write_partitioned(
+        day1, "orders", str(tmp_path), partition_by=["region"], date_column="order_date"
+    )
+    second = write_partitioned(
+        day2, "orders", str(tmp_path), partition_by=["region"], date_column="order_date"
+    )
+
+    assert len(first) == 2 and len(second) == 1
+    assert "dt=2024-01-02" in second[0] and "region=kr" in second[0]
+    assert all(p.endswith(".parquet") for p in first + second)
+
+    conn = duckdb.connect()
+    register_lake_view(conn, "orders", str(tmp_path))
+    assert conn.execute("SELECT sum(v) FROM orders").fetchone()[0] == 6
+    assert (
+        conn.execute(
+            "SELECT sum(v) FROM orders WHERE dt = '2024-01-01' AND region = 'kr'"
+        ).fetchone()[0]
+        == 1
+    )
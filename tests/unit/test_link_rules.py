@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import polars as pl
+
+from palantir.ontology.objects import (Delivery, Order, Payment, link_order_delivery,
+                                       link_order_payment)
+from palantir.ontology.rules import (ORDER_DELIVERY_RULES, ORDER_PAYMENT_RULES,
+                                     link_violations, validate_links)
+
+
+def _order(status='paid', total='10.50'):
+    return Order(customer_id=uuid.uuid4(), total_amount=Decimal(total), items=[],
+                 shipping_address='Seoul', status=status)
+
+
+def _payment(order, amount=10.5, order_id=None):
+    return Payment(id=str(uuid.uuid4()), order_id=order_id or str(order.id), amount=amount,
+                   method='card', status='completed', timestamp=datetime(2024, 1, 1))
+
+
+def _delivery(order):
+    return Delivery(id=str(uuid.uuid4()), order_id=str(order.id), address='Seoul',
+                    status='shipped', shipped_at=None, delivered_at=None)
+
+
+def test_object_methods_use_shared_rules():
+    order = _order()
+    payment = _payment(order)
+    assert order.link_payment(payment) and payment.is_valid_for_order(order)
+    assert link_order_payment(order, payment)
+    assert not order.link_payment(_payment(order, amount=9.0))
+    assert not order.link_payment(None)
+    assert not link_order_payment(_order('cancelled'), payment)
+
+    shipped = _order('shipped')
+    delivery = _delivery(shipped)
+    assert shipped.link_delivery(delivery) and link_order_delivery(shipped, delivery)
+    assert delivery.is_valid_for_order(shipped) and not delivery.is_valid_for_order(order)
+    assert link_violations(ORDER_DELIVERY_RULES, order=order, delivery=_delivery(order)) == [
+        'ORDER_NOT_SHIPPED'
+    ]
+
+
+def test_frame_validation_matches_object_rules():
+    orders = [_order(), _order('cancelled'), _order('shipped', '5'), _order()]
+    payments = [_payment(orders[0]), _payment(orders[1]), _payment(orders[2], amount=4.0),
+                _payment(orders[0], order_id='missing-order')]
+    deliveries = [_delivery(orders[2]), _delivery(orders[0])]
+
+    frame = lambda objs: pl.DataFrame([o.model_dump() for o in objs])
+    result = validate_links(frame(orders), frame(payments), frame(deliveries))
+    by_payment = {row['payment_id']: set(row['violations'])
+                  for row in result.iter_rows(named=True) if row['payment_id']}
+
+    by_delivery = {row['delivery_id']: set(row['violations'])
+                   for row in result.iter_rows(named=True) if row['delivery_id']}
+
+    for payment in payments[:3]:
+        order = next(o for o in orders if str(o.id) == payment.order_id)
+        expected = link_violations(ORDER_PAYMENT_RULES, order=order, payment=payment)
+        assert by_payment[payment.id] == set(expected)
+    for delivery in deliveries:
+        order = next(o for o in orders if str(o.id) == delivery.order_id)
+        expected = link_violations(ORDER_DELIVERY_RULES, order=order, delivery=delivery)
+        assert by_delivery[delivery.id] == set(expected)
+    assert by_payment[payments[1].id] == {'ORDER_CANCELLED'}
+    assert by_payment[payments[3].id] >= {'ORDER_MISSING'}
+    unpaid = result.filter(pl.col('order_id') == str(orders[3].id))
+    assert {(row['link'], tuple(row['violations'])) for row in unpaid.iter_rows(named=True)} == {
+        ('payment', ('PAYMENT_MISSING',)), ('delivery', ('DELIVERY_MISSING',))}
+    missing_delivery = result.filter((pl.col('order_id') == str(orders[1].id))
+                                     & (pl.col('link') == 'delivery'))
+    assert missing_delivery['violations'].to_list() == [['DELIVERY_MISSING']]
+
+
+def test_frame_validation_does_not_pair_payments_with_deliveries():
+    order = _order('shipped', '5')
+    payments = [_payment(order, amount=1.0) for _ in range(3)]
+    deliveries = [_delivery(order) for _ in range(2)]
+    frame = lambda objs: pl.DataFrame([o.model_dump() for o in objs])
+    result = validate_links(frame([order]), frame(payments), frame(deliveries))
+    assert result.height == 5  # 3 + 2, not 3 x 2
+    assert result['violations'].list.len().sum() == 3  # 결제별 금액 불일치 한 번씩
@@ -0,0 +1,74 @@
+import uuid
+
+from palantir.ontology.events import EventIndex
+from palantir.ontology.indexes import OntologyIndexes, SortedIndex
+
+
+def test_sorted_index_range_and_prefix():
+    index = SortedIndex()
+    for i, value in enumerate([5, 1, 3, "apple", "apricot", "banana", 3]):
+        index.add(value, f"id{i}")
+
+    assert list(index.range(2, 5)) == ["id2", "id6", "id0"]
+    assert list(index.range(3, include_low=False)) == ["id0"]
+    assert list(index.range(high=3, include_high=False)) == ["id1"]
+    assert list(index.range(1, 5, reverse=True))[0] == "id0"
+    assert list(index.range(1, "z")) == []
+    assert list(index.prefix("ap")) == ["id3", "id4"]
+
+    index.remove(3, "id2")
+    assert list(index.range(3, 3)) == ["id6"]
+
+
+def test_planner_picks_smallest_index():
+    indexes = OntologyIndexes(["category"])
+    for i in range(10):
+        indexes.add(uuid.uuid4(), {"type": "Product", "category": "a" if i else "b"})
+
+    plan = indexes.plan("Product", {"category": "b", "stock": 1})
+    assert plan.index == "category"
+    assert plan.estimated_rows == 1
+    assert plan.residual == {"stock": 1}
+    assert indexes.plan("Product").index == "type"
+
+
+def test_clear_keeps_attached_indexes():
+    indexes = OntologyIndexes(["category"])
+    events = indexes.attach(EventIndex())
+    indexes.add("p1", {"type": "Product", "category": "a"})
+    indexes.add("e1", {"type": "Event", "related_id": "p1",
+                       "timestamp": "2024-06-01T12:00:00"})
+    lock = events._lock
+
+    indexes.clear()
+    assert indexes.by_type == {} and indexes.plan("Product").estimated_rows == 0
+    assert indexes.attached == [events] and events._lock is lock
+    assert len(events) == 0 and events.scan("p1") == []
+
+    indexes.add("e2", {"type": "Event", "related_id": "p1",
+                       "timestamp": "2024-06-01T13:00:00"})
+    assert events.scan("p1") == ["e2"]
+
+
+def test_bulk_load_matches_incremental_adds():
+    items = [
+        (f"o{i}", {"type": "Order", "customer_id": f"c{i % 3}", "category": str(9 - i)}, "Order")
+        for i in range(10)
+    ] + [
+        (f"e{i}", {"type": "Event", "related_id": "o1",
+                   "timestamp": f"2024-06-01T{12 - i:02d}:00:00"}, "Event")
+        for i in range(3)
+    ]
+    incremental = OntologyIndexes(["customer_id", "category"])
+    incremental_events = incremental.attach(EventIndex())
+    for item in items:
+        incremental.add(*item)
+    bulk = OntologyIndexes(["customer_id", "category"])
+    bulk_events = bulk.attach(EventIndex())
+    bulk.add("stale", {"type": "Order", "category": "x"})
+    bulk.load(items)
+
+    assert bulk.by_type == incremental.by_type
+    assert list(bulk.sorted["category"].range()) == list(incremental.sorted["category"].range())
+    assert list(bulk.hash["customer_id"].get("c1")) == ["o1", "o4", "o7"]
+    assert bulk_events.scan("o1") == incremental_events.scan("o1") == ["e2", "e1", "e0"]
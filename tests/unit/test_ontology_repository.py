@@ -2,6 +2,8 @@ import sys
 import types
 import uuid
 
+import pytest
+
 sys.modules.setdefault('chromadb', types.ModuleType('chromadb'))
 sys.modules.setdefault('chromadb.utils', types.ModuleType('chromadb.utils'))
 class DummyClient:
@@ -48,3 +50,363 @@ def test_ontology_crud_cycle():
 
     repo.delete_object(obj.id)
     assert repo.get_object(obj.id, OntologyObject) is None
+
+
+def test_search_objects_uses_secondary_indexes():
+    repo = OntologyRepository()
+    customer = uuid.uuid4()
+    objs = [
+        OntologyObject(type='Order', properties={'customer_id': str(customer), 'n': i})
+        for i in range(3)
+    ] + [OntologyObject(type='Order', properties={'customer_id': 'other'})]
+    for obj in objs:
+        repo.add_object(obj)
+
+    plan = repo.plan_search('Order', {'customer_id': customer})
+    assert plan.index == 'customer_id' and plan.estimated_rows == 3
+    assert len(repo.search_objects('Order', {'customer_id': customer})) == 3
+    assert len(repo.search_objects('Order', {'customer_id': customer, 'n': 1})) == 1
+
+    objs[0].properties['customer_id'] = 'other'
+    repo.update_object(objs[0])
+    repo.delete_object(objs[1].id)
+    assert len(repo.search_objects(properties={'customer_id': customer})) == 1
+    assert len(repo.search_objects(properties={'customer_id': 'other'})) == 2
+    assert repo.plan_search(properties={'n': 1}).candidates is None
+
+
+def test_get_object_uses_stored_type_and_lru_cache():
+    from datetime import datetime
+
+    from palantir.ontology.objects import Customer, Event
+
+    repo = OntologyRepository(cache_size=1)
+    customer = Customer(email='a@example.com', name='A')
+    event = Event(id='e1', type='clicked', related_id=str(customer.id),
+                  timestamp=datetime.utcnow())
+    repo.add_object(customer)
+    repo.add_object(event)
+
+    fetched = repo.get_object(customer.id)
+    assert isinstance(fetched, Customer)
+    assert repo.get_object(customer.id) is fetched
+    assert repo.get_object_type('e1') == 'Event'
+    assert isinstance(repo.get_object('e1'), Event)
+    assert repo.get_object(customer.id) is not fetched  # evicted by size 1
+
+    renamed = customer.model_copy(update={'name': 'B'})
+    repo.update_object(renamed)
+    assert repo.get_object(customer.id).name == 'B'
+    assert len(repo.search_objects(obj_type='Event')) == 1
+
+
+def test_hydrated_cache_is_safe_under_concurrent_reads_and_writes():
+    import threading
+
+    repo = OntologyRepository(cache_size=4)
+    objs = [OntologyObject(type='Item', properties={'n': i}) for i in range(16)]
+    repo.add_objects(objs)
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(200):
+                for obj in objs:
+                    repo.get_object(obj.id)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(50):
+        repo.update_object(objs[0].model_copy(update={'properties': {'n': -i}}))
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(repo._hydrated) <= 4
+    assert repo.get_object(objs[0].id).properties == {'n': -49}
+
+
+def test_persistent_repository_recovers_from_snapshot_and_log(tmp_path):
+    repo = OntologyRepository.open(str(tmp_path), sync='always', snapshot_every=3)
+    objs = [OntologyObject(type='Order', properties={'order_id': str(i)}) for i in range(5)]
+    for obj in objs:
+        repo.add_object(obj)
+    repo.add_link(OntologyLink(source_id=objs[0].id, target_id=objs[1].id,
+                               relationship_type='NEXT'))
+    repo.delete_object(objs[4].id)
+    repo.close()
+
+    wal_files = list(tmp_path.glob('wal-*.log'))
+    assert len(list(tmp_path.glob('snapshot-*.bin'))) == 1 and len(wal_files) == 1
+    with open(wal_files[0], 'ab') as f:
+        f.write(b'\x10\x00\x00\x00torn')  # simulated crash mid-append
+
+    reopened = OntologyRepository.open(str(tmp_path))
+    assert reopened.seq == 7
+    assert reopened.get_object(objs[4].id) is None
+    assert len(reopened.search_objects('Order', {'order_id': '2'})) == 1
+    assert reopened.get_linked_objects(objs[0].id)[0]['relationship']['type'] == 'NEXT'
+    reopened.add_object(OntologyObject(type='Order'))
+    reopened.close()
+    final = OntologyRepository.open(str(tmp_path))
+    assert final.seq == 8
+    final.close()
+
+
+def test_failed_mutation_is_not_logged(tmp_path):
+    repo = OntologyRepository.open(str(tmp_path), sync='always', backend='compact')
+    obj = OntologyObject(type='Order')
+    repo.add_object(obj)
+    with pytest.raises(ValueError):
+        repo.add_link(OntologyLink(source_id=obj.id, target_id=uuid.uuid4(),
+                                   relationship_type='NEXT'))
+    assert repo.seq == 1
+    # 이전 버전이 남긴 잘못된 레코드(같은 seq를 다음 변경이 재사용)도 재생 시 건너뛴다
+    repo.wal.append(2, 'remove_node', {'id': uuid.uuid4()})
+    repo.add_object(OntologyObject(type='Order'))
+    repo.close()
+
+    reopened = OntologyRepository.open(str(tmp_path), backend='compact')
+    assert reopened.seq == 2
+    assert reopened.get_object(obj.id) == obj
+    assert len(reopened.search_objects('Order')) == 2
+    assert reopened.store.number_of_edges() == 0
+
+
+def test_compact_backend_matches_networkx_backend(tmp_path):
+    repo = OntologyRepository.open(str(tmp_path), sync='none', backend='compact')
+    a = OntologyObject(type='Customer', properties={'name': 'A'})
+    b = OntologyObject(type='Order', properties={'customer_id': str(a.id)})
+    repo.add_object(a)
+    repo.add_object(b)
+    repo.add_link(OntologyLink(source_id=a.id, target_id=b.id, relationship_type='PLACED'))
+
+    assert repo.get_linked_objects(b.id, direction='in')[0]['object']['id'] == a.id
+    assert repo.search_objects('Order', {'customer_id': a.id})[0]['id'] == b.id
+    assert repo.graph.number_of_edges() == 1
+    repo.snapshot()
+    repo.close()
+
+    reopened = OntologyRepository.open(str(tmp_path), backend='compact')
+    assert reopened.get_object(a.id).properties == {'name': 'A'}
+    assert reopened.get_linked_objects(a.id, 'PLACED')[0]['object']['id'] == b.id
+    reopened.close()
+
+
+def test_bulk_add_reports_row_errors_without_aborting(tmp_path):
+    from palantir.ontology.objects import Customer
+
+    repo = OntologyRepository.open(str(tmp_path), sync='none')
+    result = repo.add_objects([
+        {'email': 'a@example.com', 'name': 'A'},
+        {'email': 'not-an-email', 'name': 'B'},
+        Customer(email='c@example.com', name='C'),
+        {'name': 'D'},
+    ], Customer)
+    assert len(result.inserted) == 2
+    assert [e['index'] for e in result.errors] == [1, 3]
+    assert 'email' in result.errors[0]['error']
+    assert repo.seq == 1  # one logged mutation for the whole batch
+
+    a, c = result.inserted
+    links = repo.add_links([
+        {'source_id': str(a), 'target_id': str(c), 'relationship_type': 'KNOWS'},
+        {'source_id': str(a), 'target_id': str(uuid.uuid4()), 'relationship_type': 'KNOWS'},
+        {'source_id': 'bad'},
+    ])
+    assert len(links.inserted) == 1
+    assert [e['index'] for e in links.errors] == [1, 2]
+    repo.close()
+
+    reopened = OntologyRepository.open(str(tmp_path))
+    assert reopened.get_object(a).name == 'A'
+    assert reopened.get_linked_objects(a, 'KNOWS')[0]['object']['name'] == 'C'
+    reopened.close()
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'compact'])
+def test_traverse_multi_hop_pattern(backend):
+    from palantir.ontology.traversal import HopSpec, TraversalQuery
+
+    repo = OntologyRepository(backend=backend)
+    customer = OntologyObject(type='Customer')
+    orders = [OntologyObject(type='Order', properties={'status': s})
+              for s in ('paid', 'cancelled')]
+    payments = [OntologyObject(type='Payment') for _ in orders]
+    event = OntologyObject(type='Event')
+    repo.add_objects([customer, *orders, *payments, event])
+    repo.add_links(
+        [OntologyLink(source_id=customer.id, target_id=o.id, relationship_type='PLACED')
+         for o in orders]
+        + [OntologyLink(source_id=o.id, target_id=p.id, relationship_type='PAID_BY')
+           for o, p in zip(orders, payments)]
+        + [OntologyLink(source_id=p.id, target_id=event.id, relationship_type='EMITTED')
+           for p in payments]
+    )
+
+    query = TraversalQuery(
+        start_type='Customer',
+        hops=[HopSpec(relationship_types=['PLACED'], where={'status': 'paid'}),
+              HopSpec(relationship_types=['PAID_BY']),
+              HopSpec(relationship_types=['EMITTED'])],
+        include_paths=True,
+    )
+    results = list(repo.traverse(query))
+    assert [r['type'] for r in results] == ['Order', 'Payment', 'Event']
+    assert results[-1]['path'] == [customer.id, orders[0].id, payments[0].id, event.id]
+
+    reverse = TraversalQuery(start_ids=[str(event.id)], direction='in', max_depth=3)
+    depths = [r['depth'] for r in repo.traverse(reverse)]
+    assert depths == [1, 1, 2, 2, 3]  # the event is visited once, the customer once
+    assert len(list(repo.traverse(reverse.model_copy(update={'limit': 2})))) == 2
+
+
+@pytest.mark.parametrize('order_by', [None, 'category'])
+def test_query_operators_relations_and_cursor_pages(order_by):
+    repo = OntologyRepository()
+    customer = OntologyObject(type='Customer', properties={'tier': 'gold'})
+    products = [
+        OntologyObject(type='Product',
+                       properties={'category': f'cat-{i:02d}', 'price': i * 10})
+        for i in range(20)
+    ]
+    repo.add_objects([customer, *products])
+    repo.add_links([
+        OntologyLink(source_id=customer.id, target_id=p.id, relationship_type='BOUGHT')
+        for p in products[:10]
+    ])
+
+    page = repo.query({'type': 'Product',
+                       'properties': {'price': {'$gte': 50, '$lt': 150},
+                                      'category': {'$prefix': 'cat-'}}})
+    assert page.plan == 'type' and len(page.items) == 10
+    # 접미사가 연산자처럼 보여도 속성 이름 그대로 동등 비교
+    flagged = OntologyObject(type='User', properties={'opt_in': True, 'price_gt': 5})
+    repo.add_object(flagged)
+    assert [n['id'] for n in repo.query(
+        properties={'opt_in': True, 'price_gt': 5}).items] == [flagged.id]
+    assert repo.query(properties={'category': {'$in': ['cat-01', 'cat-03']}}).plan == 'category:in'
+
+    bought = {'type': 'BOUGHT', 'direction': 'in', 'target_type': 'Customer',
+              'where': {'tier': 'gold'}}
+    seen, cursor = [], None
+    while True:
+        page = repo.query(obj_type='Product', relations=[bought], limit=3,
+                          order_by=order_by, descending=True, cursor=cursor)
+        seen += [p['properties']['price'] for p in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert sorted(seen) == [i * 10 for i in range(10)]
+    if order_by:
+        assert seen == sorted(seen, reverse=True)
+
+    not_bought = dict(bought, exists=False)
+    assert len(repo.query(obj_type='Product', relations=[not_bought], limit=50).items) == 10
+
+    ordered = repo.query(obj_type='Product', order_by='category', limit=2, offset=1)
+    assert ordered.plan == 'category:ordered'
+    assert [p['properties']['category'] for p in ordered.items] == ['cat-01', 'cat-02']
+    following = repo.query(obj_type='Product', order_by='category', limit=2,
+                           cursor=ordered.next_cursor)
+    assert following.items[0]['properties']['category'] == 'cat-03'
+
+
+def test_recommend_products_follows_order_inserts_and_deletes():
+    repo = OntologyRepository()
+    products = [OntologyObject(type='Product', properties={'name': n}) for n in 'abc']
+    customers = [OntologyObject(type='Customer') for _ in range(3)]
+    repo.add_objects(products + customers)
+
+    def order(customer, *items):
+        return OntologyObject(type='Order', properties={
+            'customer_id': str(customer.id),
+            'items': [{'product_id': str(p.id), 'quantity': 1} for p in items],
+        })
+
+    orders = [order(customers[0], products[0], products[1]),
+              order(customers[1], products[0], products[2]),
+              order(customers[2], products[0])]
+    repo.add_objects(orders)
+    names = lambda recs: sorted(r['properties']['name'] for r in recs)
+    assert names(repo.recommend_products(customers[2].id)) == ['b', 'c']
+
+    repo.delete_object(orders[1].id)
+    assert names(repo.recommend_products(str(customers[2].id))) == ['b']
+
+
+def test_model_recommend_products_delegates_to_repository():
+    from decimal import Decimal
+
+    from palantir.ontology.objects import Customer, Order, Product
+
+    lamp, bulb = (Product(name=n, price=Decimal('1'), sku=n) for n in ('lamp', 'bulb'))
+    kim, lee = Customer(email='kim@example.com', name='Kim'), Customer(
+        email='lee@example.com', name='Lee')
+    repo = OntologyRepository()
+    repo.add_objects([lamp, bulb, kim, lee])
+    repo.add_objects([
+        Order(customer_id=c.id, total_amount=Decimal('1'), shipping_address='Seoul',
+              items=[{'product_id': str(p.id), 'quantity': 1} for p in items])
+        for c, items in ((kim, [lamp, bulb]), (lee, [lamp]))
+    ])
+    assert lee.recommend_products(repo=repo) == [bulb]
+    assert kim.recommend_products(repo=repo) == []
+
+
+def test_similar_products_use_tag_index():
+    from decimal import Decimal
+
+    from palantir.ontology.objects import Product
+
+    def product(name, category, tags):
+        return Product(name=name, price=Decimal('1'), sku=name, category=category, tags=tags)
+
+    target = product('a', 'shoes', ['red'])
+    repo = OntologyRepository()
+    repo.add_objects([target, product('b', 'shoes', ['red']),
+                      product('c', 'hats', ['red']), product('d', 'hats', [])])
+    assert [p['name'] for p in repo.similar_products(str(target.id))] == ['b', 'c']
+    assert [p.name for p in target.similar_products(repo=repo, k=1)] == ['b']
+
+
+def test_event_timeline_uses_time_index():
+    from datetime import datetime, timedelta
+
+    repo = OntologyRepository()
+    start = datetime(2024, 1, 1)
+    result = repo.add_events([
+        {'id': f'e{i}', 'type': 'status', 'related_id': 'order-1',
+         'timestamp': start + timedelta(hours=5 - i)}
+        for i in range(5)
+    ] + [{'id': 'bad', 'type': 'status'}])
+    assert [e['index'] for e in result.errors] == [5]
+
+    timeline = repo.event_timeline('order-1')
+    assert [e['id'] for e in timeline] == ['e4', 'e3', 'e2', 'e1', 'e0']
+    assert [e['id'] for e in repo.event_timeline('order-1', limit=2, reverse=True)] == ['e0', 'e1']
+    repo.delete_object('e2')
+    assert len(repo.event_timeline('order-1', start=start + timedelta(hours=1),
+                                   end=start + timedelta(hours=4))) == 3
+
+    from palantir.ontology.objects import Event
+
+    assert [e.id for e in Event.timeline(repo=repo, related_id='order-1')] == [
+        'e4', 'e3', 'e1', 'e0']
+    assert [e.id for e in Event.filter_events(event_type='status', repo=repo)] == [
+        'e4', 'e3', 'e1', 'e0']
+    assert Event.filter_events(related_id='order-2', repo=repo) == []
+
+
+def test_repository_import_defers_scipy_and_networkx():
+    import subprocess
+
+    code = ("import sys, palantir.ontology.repository as r; "
+            "repo = r.OntologyRepository(backend='compact'); "
+            "print(sorted(m for m in ('scipy', 'networkx') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         check=True).stdout
+    assert out.strip() == '[]'
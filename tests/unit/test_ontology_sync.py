@@ -30,3 +30,95 @@ def test_sync_ontology_to_neo4j(monkeypatch):
         with open(fpath, "w", encoding="utf-8") as f:
             yaml.dump({"a": 1}, f)
         sync_ontology_to_neo4j("bolt://localhost:7687", "neo4j", "test", ontology_dir=d)
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.transactions = []
+        self.statements = []
+
+    def session(self, database=None):
+        driver = self
+
+        class Session:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *a):
+                pass
+
+            def run(self, cypher, **params):
+                driver.statements.append((cypher, params))
+
+            def execute_write(self, work):
+                tx = []
+
+                class Tx:
+                    def run(self, cypher, **params):
+                        tx.append((cypher, params['rows']))
+
+                work(Tx())
+                driver.transactions.append(tx)
+
+        return Session()
+
+
+def test_incremental_sync_batches_changes():
+    from palantir.core.ontology_sync import Neo4jSync
+    from palantir.ontology.base import OntologyLink, OntologyObject
+    from palantir.ontology.repository import OntologyRepository
+
+    repo = OntologyRepository()
+    driver = RecordingDriver()
+    syncer = Neo4jSync(driver, repo=repo, batch_size=2, tx_size=4)
+
+    customers = [OntologyObject(type='Customer') for _ in range(3)]
+    order = OntologyObject(type='Order', properties={'tags': ['a'], 'meta': {'x': 1}})
+    repo.add_objects([*customers, order])
+    repo.add_links([OntologyLink(source_id=c.id, target_id=order.id, relationship_type='PLACED')
+                    for c in customers])
+    repo.delete_object(customers[2].id)
+
+    summary = syncer.sync()
+    assert summary['mode'] == 'incremental' and summary['pending_changes'] == 0
+    statements = [s for tx in driver.transactions for s in tx]
+    assert 'DETACH DELETE' in statements[0][0]
+    node_rows = [r for c, rows in statements if 'MERGE (n:' in c for r in rows]
+    assert len(node_rows) == 3 and max(len(rows) for _, rows in statements) <= 2
+    order_row = next(r for r in node_rows if r['id'] == str(order.id))
+    assert order_row['props']['tags'] == ['a'] and order_row['props']['meta'] == '{"x": 1}'
+    assert sum(len(rows) for c, rows in statements if '`PLACED`' in c) == 2
+
+    driver.transactions.clear()
+    assert syncer.sync()['mode'] == 'noop' and not driver.transactions
+    repo.update_object(OntologyObject(id=order.id, type='Order'))
+    assert syncer.lag()['pending_changes'] == 1
+    assert syncer.sync()['rows'] == 1
+
+
+def test_checkpoint_from_another_repository_forces_full_sync(tmp_path):
+    from palantir.core.ontology_sync import Neo4jSync
+    from palantir.ontology.base import OntologyObject
+    from palantir.ontology.repository import OntologyRepository
+
+    state = str(tmp_path / 'state.json')
+    before = OntologyRepository()
+    before.add_objects([OntologyObject(type='Customer') for _ in range(3)])
+    Neo4jSync(RecordingDriver(), repo=before, state_path=state).sync()
+
+    # 재시작한 메모리 저장소: seq가 다시 0부터 시작
+    after = OntologyRepository()
+    after.add_object(OntologyObject(type='Customer'))
+    for _ in range(3):
+        after.add_object(OntologyObject(type='Order'))
+    driver = RecordingDriver()
+    syncer = Neo4jSync(driver, repo=after, state_path=state)
+    assert syncer.sync()['mode'] == 'full'
+    runs = {r['props']['_sync_run'] for tx in driver.transactions for _, rows in tx
+            for r in rows}
+    [(cleanup, params)] = [s for s in driver.statements if 'DELETE' in s[0]]
+    assert runs == {params['run']} and '_sync_run <> $run' in cleanup
+
+    after.add_object(OntologyObject(type='Order'))
+    reloaded = Neo4jSync(RecordingDriver(), repo=after, state_path=state)
+    assert reloaded.sync()['mode'] == 'incremental'
@@ -0,0 +1,48 @@
+import os
+import time
+
+import numpy as np
+import polars as pl
+
+from palantir.process.cache import ResultCache, content_cached, fingerprint
+
+
+def test_fingerprint_is_content_based():
+    a = pl.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+    b = pl.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+    c = pl.DataFrame({"x": [1, 2, 4], "y": ["a", "b", "c"]})
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint(c)
+    assert fingerprint(["ab", "c"]) != fingerprint(["a", "bc"])
+
+
+def test_result_cache_round_trip_and_expiry(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl=60)
+    df = pl.DataFrame({"x": [1, 2]})
+    cache.set("t", "k1", df)
+    cache.set("t", "k2", np.arange(4, dtype=np.float32))
+    cache.set("t", "k3", {"accuracy": 0.5})
+
+    assert cache.get("t", "k1").equals(df)
+    assert cache.get("t", "k2").tolist() == [0, 1, 2, 3]
+    assert cache.get("t", "k3") == {"accuracy": 0.5}
+
+    old = time.time() - 120
+    os.utime(tmp_path / "t" / "k1.parquet", (old, old))
+    assert cache.get("t", "k1") is None
+
+
+def test_content_cached_skips_recompute(tmp_path):
+    calls = []
+
+    @content_cached(cache=ResultCache(str(tmp_path), ttl=0))
+    def encode(texts, model_name="m"):
+        calls.append(texts)
+        return np.ones((len(texts), 2))
+
+    first = encode(["a", "b"])
+    second = encode(["a", "b"])
+    encode(["a", "c"])
+
+    assert len(calls) == 2
+    assert np.array_equal(first, second)
@@ -0,0 +1,40 @@
+from palantir.ontology.recommend import CoPurchaseIndex, GrowableSparse
+
+
+def test_growable_sparse_row_sum_merges_pending_and_base():
+    matrix = GrowableSparse(min_merge=3)
+    matrix.add(0, 1, 1.0)
+    matrix.add(0, 2, 2.0)
+    matrix.add(1, 2, 1.0)  # triggers a merge into the CSR base
+    matrix.add(1, 5, 4.0)
+    cols, vals = matrix.row_sum([0, 1], [1.0, 2.0])
+    assert dict(zip(cols.tolist(), vals.tolist())) == {1: 1.0, 2: 4.0, 5: 8.0}
+    assert matrix.merge().shape == (2, 6)
+
+
+def test_copurchase_recommendations_are_incremental():
+    index = CoPurchaseIndex()
+    index.add_order("alice", ["p1", "p2"])
+    index.add_order("bob", ["p1", "p3"])
+    index.add_order("carol", ["p1", "p3", "p4"])
+    index.add_order("dave", ["p1"])
+
+    assert [p for p, _ in index.recommend("dave", k=2)] == ["p3", "p2"]
+    assert index.recommend("dave", k=1) == [("p3", 2.0)]
+    assert index.recommend("unknown") == []
+
+    index.remove_order("carol", ["p1", "p3", "p4"])
+    index.add_order("alice", ["p2"])  # repeat purchase does not add co-occurrence
+    assert dict(index.recommend("dave")) == {"p2": 1.0, "p3": 1.0}
+    assert dict(index.similar("p1")) == {"p2": 1.0, "p3": 1.0}
+
+
+def test_clear_keeps_the_lock():
+    index = CoPurchaseIndex()
+    index.add_order("alice", ["p1", "p2"])
+    lock = index._lock
+    index.clear()
+    assert index._lock is lock and index.recommend("alice") == []
+    index.add_order("bob", ["p1", "p3"])
+    index.add_order("carol", ["p1"])
+    assert index.recommend("carol") == [("p3", 1.0)]
@@ -0,0 +1,41 @@
+from palantir.ontology.similar import TagIndex
+
+
+def _product(category=None, tags=()):
+    return {"properties": {"category": category, "tags": list(tags)}}
+
+
+def test_tag_index_scores_only_shared_candidates():
+    index = TagIndex()
+    index.add("p1", _product("shoes", ["red", "running"]), "Product")
+    index.add("p2", _product("shoes", ["red"]), "Product")
+    index.add("p3", _product("hats", ["running"]), "Product")
+    index.add("p4", _product("hats", ["blue"]), "Product")
+    index.add("c1", _product("shoes", ["red"]), "Customer")  # other types ignored
+
+    assert index.similar("p1") == [("p2", 2.0), ("p3", 1.0)]
+    assert index.similar("p1", k=1) == [("p2", 2.0)]
+
+    index.remove("p2", {}, "Product")
+    index.add("p3", _product("shoes", ["running", "red"]), "Product")
+    assert index.similar("p1") == [("p3", 3.0)]
+    assert index.similar("missing") == []
+
+
+def test_tag_index_tfidf_prefers_rare_tags():
+    index = TagIndex()
+    index.add("q", _product(tags=["common", "rare"]), "Product")
+    index.add("a", _product(tags=["rare"]), "Product")
+    index.add("b", _product(tags=["common"]), "Product")
+    for i in range(5):
+        index.add(f"x{i}", _product(tags=["common"]), "Product")
+
+    assert index.similar("q", k=1, tfidf=True)[0][0] == "a"
+
+
+def test_clear_keeps_the_lock():
+    index = TagIndex()
+    index.add("p1", _product("shoes"), "Product")
+    lock = index._lock
+    index.clear()
+    assert index._lock is lock and len(index) == 0 and index.similar("p1") == []
@@ -0,0 +1,86 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from palantir.ontology.analytics import adjacency_matrix, pagerank
+from palantir.ontology.base import OntologyLink, OntologyObject
+from palantir.ontology.repository import OntologyRepository
+from palantir.ontology.subgraph import extract_subgraph
+
+
+def _star_repo(backend, leaves=6):
+    repo = OntologyRepository(backend=backend)
+    hub = OntologyObject(type='Customer', properties={'name': 'hub'})
+    orders = [OntologyObject(type='Order') for _ in range(leaves)]
+    products = [OntologyObject(type='Product') for _ in range(leaves)]
+    repo.add_objects([hub, *orders, *products])
+    repo.add_links(
+        [OntologyLink(source_id=hub.id, target_id=o.id, relationship_type='PLACED')
+         for o in orders]
+        + [OntologyLink(source_id=o.id, target_id=p.id, relationship_type='CONTAINS')
+           for o, p in zip(orders, products)]
+    )
+    return repo, hub, orders, products
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'compact'])
+def test_neighbourhood_is_nearest_first(backend):
+    repo, hub, orders, products = _star_repo(backend)
+
+    sub = extract_subgraph(repo, seeds=[str(hub.id)], radius=2, max_nodes=100)
+    assert sub.ids[0] == str(hub.id) and sub.labels[0] == 'Customer: hub'
+    assert sub.total_nodes == 13 and not sub.truncated
+    assert len(sub.edges) == 12 and set(sub.edge_types) == {'PLACED', 'CONTAINS'}
+
+    one_hop = extract_subgraph(repo, seeds=[hub.id], radius=1, aggregate=False)
+    assert set(one_hop.ids) == {str(hub.id), *(str(o.id) for o in orders)}
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'compact'])
+def test_overview_folds_overflow_into_type_clusters(backend):
+    repo, hub, orders, products = _star_repo(backend)
+
+    sub = extract_subgraph(repo, max_nodes=8)
+    assert len(sub.ids) <= 8 and sub.truncated
+    assert sub.ids[0] == str(hub.id)  # highest degree first
+    clusters = {i: s for i, s, c in zip(sub.ids, sub.sizes, sub.clusters) if c}
+    assert sum(clusters.values()) + sub.clusters.count(False) == 13
+    weights = dict(zip(zip(sub.edges, sub.edge_types), sub.edge_weights))
+    assert sum(weights.values()) == 12  # edges into clusters are merged, not lost
+
+    only_products = extract_subgraph(repo, types=['Product'])
+    assert only_products.types == ['Product'] * 6 and not only_products.edges
+
+
+def test_sparse_pagerank_matches_networkx():
+    repo, *_ = _star_repo('compact')
+    node_ids, matrix = adjacency_matrix(repo.store)
+    expected = nx.pagerank(nx.DiGraph(repo.graph), tol=1e-10)
+    np.testing.assert_allclose(
+        pagerank(matrix, tol=1e-12), [expected[n] for n in node_ids], atol=1e-6
+    )
+
+    ranked = extract_subgraph(repo, max_nodes=3, rank='pagerank', aggregate=False)
+    assert ranked.types == ['Product'] * 3
+    with pytest.raises(ValueError):
+        extract_subgraph(repo, rank='betweenness')
+
+
+def test_pagerank_rank_is_cached_per_repository_version(monkeypatch):
+    from palantir.ontology import analytics
+
+    calls = []
+    real = analytics.pagerank
+    monkeypatch.setattr(analytics, 'pagerank', lambda m, **kw: calls.append(1) or real(m, **kw))
+    repo, hub, orders, _ = _star_repo('compact')
+
+    first = extract_subgraph(repo, max_nodes=3, rank='pagerank', aggregate=False)
+    assert extract_subgraph(repo, max_nodes=3, rank='pagerank', aggregate=False) == first
+    assert len(calls) == 1
+
+    repo.add_object(OntologyObject(type='Order'))
+    extract_subgraph(repo, max_nodes=3, rank='pagerank', aggregate=False)
+    assert len(calls) == 2
+    repo.graph_metrics()  # 전체 지표 계산 후에는 그 PageRank를 재사용
+    extract_subgraph(repo, max_nodes=3, rank='pagerank', aggregate=False)
+    assert len(calls) == 3
@@ -0,0 +1,72 @@
+import uuid
+from decimal import Decimal
+from typing import List
+
+from pydantic import BaseModel
+
+from palantir.ontology.objects import Customer, Order, Payment, Product
+from palantir.ontology.repository import OntologyRepository
+from palantir.ontology.validation import hydrate_many, trusted_loader, validate_many
+
+
+def test_trusted_loader_rebuilds_stored_models_without_validation(monkeypatch):
+    customer = Customer(email='kim@example.com', name='Kim')
+    order = Order(customer_id=customer.id, total_amount=Decimal('9.90'), items=[],
+                  shipping_address='Seoul')
+    repo = OntologyRepository(cache_size=0)
+    repo.add_objects([customer, order], Customer)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('stored data must not be validated again')
+
+    monkeypatch.setattr(Customer, '__init__', fail)
+    loaded = repo.get_object(customer.id)
+    assert loaded == customer and loaded.model_fields_set == set(Customer.model_fields)
+    assert repo.find_objects('Order') == [order]
+    assert hydrate_many(Order, [order.model_dump()]) == [order]
+
+    partial = trusted_loader(Order)({'customer_id': customer.id, 'total_amount': 1,
+                                     'items': [], 'shipping_address': 'x'})
+    assert partial.status == 'pending'  # missing fields fall back to defaults
+
+
+def test_editing_a_loaded_object_keeps_indexes_in_step():
+    from palantir.ontology.base import OntologyObject
+
+    repo = OntologyRepository()
+    obj = OntologyObject(type='Item', properties={'category': 'a', 'sizes': [1]})
+    repo.add_object(obj)
+
+    loaded = repo.get_object(obj.id)
+    loaded.properties['category'] = 'b'
+    loaded.properties['sizes'].append(2)
+    assert repo.search_objects('Item', {'category': 'a'})[0]['properties']['sizes'] == [1]
+
+    repo.update_object(loaded)
+    assert len(repo.search_objects('Item', {'category': 'b'})) == 1
+    assert repo.search_objects('Item', {'category': 'a'}) == []
+
+    product = Product(name='Lamp', price=Decimal('1'), sku='L', category='home',
+                      tags=['light'])
+    uncached = OntologyRepository(cache_size=0)
+    uncached.add_object(product)
+    uncached.get_object(product.id).tags.append('desk')
+    assert uncached.get_object(product.id).tags == ['light']
+
+
+def test_nested_models_keep_validating_loader():
+    class Basket(BaseModel):
+        orders: List[Order]
+
+    order = Order(customer_id=uuid.uuid4(), total_amount=1, items=[], shipping_address='x')
+    basket = trusted_loader(Basket)(Basket(orders=[order]).model_dump())
+    assert isinstance(basket.orders[0], Order)
+
+
+def test_validate_many_reports_untrusted_rows():
+    rows = [{'id': 'p1', 'order_id': 'o1', 'amount': 5, 'method': 'card',
+             'status': 'ok', 'timestamp': '2024-01-01T00:00:00'},
+            {'id': 'p2', 'order_id': 'o1', 'amount': -1, 'method': 'card',
+             'status': 'ok', 'timestamp': '2024-01-01T00:00:00'}]
+    valid, errors = validate_many(rows, Payment)
+    assert [i for i, _ in valid] == [0] and errors[0]['index'] == 1
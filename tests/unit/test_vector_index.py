@@ -0,0 +1,48 @@
+import sys
+import types
+
+from palantir.ontology.vector_index import VectorIndexService
+
+
+def _fake_chromadb(monkeypatch, calls):
+    class Client:
+        def __init__(self, path):
+            calls.append(('client', path))
+
+        def get_or_create_collection(self, name, embedding_function):
+            calls.append(('collection', name))
+            return types.SimpleNamespace(
+                query=lambda **kw: {'ids': [['n1']], 'kw': kw}
+            )
+
+    class EmbeddingFunction:
+        def __init__(self, model_name):
+            calls.append(('model', model_name))
+
+        def __call__(self, texts):
+            calls.append(('embed', tuple(texts)))
+            return [[0.0] for _ in texts]
+
+    chromadb = types.ModuleType('chromadb')
+    chromadb.PersistentClient = Client
+    utils = types.ModuleType('chromadb.utils')
+    utils.embedding_functions = types.SimpleNamespace(
+        SentenceTransformerEmbeddingFunction=EmbeddingFunction
+    )
+    monkeypatch.setitem(sys.modules, 'chromadb', chromadb)
+    monkeypatch.setitem(sys.modules, 'chromadb.utils', utils)
+
+
+def test_vector_index_is_lazy_and_opens_once(monkeypatch, tmp_path):
+    calls = []
+    _fake_chromadb(monkeypatch, calls)
+    service = VectorIndexService(str(tmp_path), 'nodes', 'tiny-model')
+    assert calls == [] and not service.ready
+
+    assert service.query(['hello'], n_results=2)['kw']['n_results'] == 2
+    service.collection
+    assert calls == [('client', str(tmp_path)), ('model', 'tiny-model'),
+                     ('collection', 'nodes')]
+
+    service.warm_up(background=True).join()
+    assert calls[-1] == ('embed', ('warm-up',))
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from palantir.ontology.base import OntologyLink, OntologyObject
+from palantir.ontology.repository import OntologyRepository
+from palantir.ontology.traversal import HopSpec, TraversalQuery
+from palantir.ontology.vector_search import SimilarityQuery
+
+
+class MemoryCollection:
+    """Brute-force stand-in for a Chroma collection (l2 space)."""
+
+    metadata = None
+
+    def __init__(self):
+        self.vectors = {}
+        self.queried = []
+
+    def count(self):
+        return len(self.vectors)
+
+    def get(self, ids, include=None):
+        found = [i for i in ids if i in self.vectors]
+        return {'ids': found, 'embeddings': [self.vectors[i] for i in found]}
+
+    def query(self, query_embeddings, n_results, include=None):
+        self.queried.append(n_results)
+        q = np.asarray(query_embeddings[0])
+        ranked = sorted(self.vectors, key=lambda i: float(((self.vectors[i] - q) ** 2).sum()))
+        ranked = ranked[:n_results]
+        return {'ids': [ranked],
+                'distances': [[float(((self.vectors[i] - q) ** 2).sum()) for i in ranked]]}
+
+
+@pytest.fixture
+def shop():
+    repo = OntologyRepository()
+    collection = MemoryCollection()
+    vip = OntologyObject(type='Customer', properties={'segment': 3})
+    other = OntologyObject(type='Customer', properties={'segment': 1})
+    products = [OntologyObject(type='Product', properties={'name': f'p{i}'})
+                for i in range(6)]
+    repo.add_objects([vip, other, *products])
+    for i, product in enumerate(products):
+        collection.vectors[str(product.id)] = np.array([float(i), 0.0])
+        buyer = vip if i % 2 == 0 else other
+        repo.add_link(OntologyLink(source_id=buyer.id, target_id=product.id,
+                                   relationship_type='BOUGHT'))
+    return repo, collection, products
+
+
+def bought_by_segment(segment):
+    return TraversalQuery(start_type='Customer', start_properties={'segment': segment},
+                          hops=[HopSpec(relationship_types=['BOUGHT'],
+                                        target_type='Product')],
+                          limit=10_000)
+
+
+def test_exact_and_ann_agree_on_filtered_top_k(shop):
+    repo, collection, products = shop
+    embed = lambda texts: [[4.2, 0.0] for _ in texts]  # noqa: E731
+
+    exact = repo.similar_objects(
+        SimilarityQuery(text='x', traversal=bought_by_segment(3), k=2),
+        collection=collection, embed=embed,
+    )
+    assert exact.strategy == 'exact' and exact.candidates == 3
+    assert [node_id for node_id, _ in exact.hits] == [products[4].id, products[2].id]
+
+    ann = repo.similar_objects(
+        SimilarityQuery(text='x', traversal=bought_by_segment(3), k=2, strategy='ann',
+                        oversample=1.0),
+        collection=collection, embed=embed,
+    )
+    assert ann.hits == exact.hits
+    assert collection.queried == [4]  # k / 선택도(3/6)
+
+
+def test_like_id_excludes_the_reference_and_auto_picks_ann_for_large_sets(shop):
+    repo, collection, products = shop
+    result = repo.similar_objects(
+        SimilarityQuery(like_id=str(products[0].id), obj_type='Product', k=2,
+                        exact_limit=0, oversample=1.0),
+        collection=collection,
+    )
+    assert result.strategy == 'ann' and result.candidates == 5
+    assert [node_id for node_id, _ in result.hits] == [products[1].id, products[2].id]
+
+    none = repo.similar_objects(
+        SimilarityQuery(like_id=products[0].id, traversal=bought_by_segment(9)),
+        collection=collection,
+    )
+    assert none.hits == [] and none.candidates == 0
+    with pytest.raises(ValueError):
+        SimilarityQuery(text='x', like_id=products[0].id)